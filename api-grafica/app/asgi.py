@@ -5,6 +5,9 @@ It exposes the ASGI callable as a module-level variable named ``application``.
 
 For more information on this file, see
 https://docs.djangoproject.com/en/5.2/howto/deployment/asgi/
+
+Em produção é servido pelo serviço 'api-async' (gunicorn + UvicornWorker),
+que atende as views assíncronas como a consulta de CNPJ.
 """
 
 import os
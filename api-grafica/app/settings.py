@@ -99,6 +99,12 @@ DATABASES = {
         'HOST': os.environ.get('DB_HOST', 'db'), 
 
         'PORT': 5432, # A porta padrão do Postgres
+
+        # Conexões persistentes: cada thread reaproveita sua conexão por até
+        # DB_CONN_MAX_AGE segundos, testando-a antes de usar (health check).
+        # No worker ASGI use DB_CONN_MAX_AGE=0.
+        'CONN_MAX_AGE': int(os.environ.get('DB_CONN_MAX_AGE', 60)),
+        'CONN_HEALTH_CHECKS': True,
     }
 }
 
@@ -149,7 +155,7 @@ CORS_ALLOWED_ORIGINS = [
 
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': (
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'core.authentication.JWTVersionadoAuthentication',
     ),
     'DEFAULT_PERMISSION_CLASSES': (
         'rest_framework.permissions.IsAuthenticated',
@@ -166,6 +172,31 @@ REST_FRAMEWORK = {
 SIMPLE_JWT = {
     "ACCESS_TOKEN_LIFETIME": timedelta(minutes=60), # Duração do token de acesso
     "REFRESH_TOKEN_LIFETIME": timedelta(days=1),    # Duração do token de atualização
+    # Tokens carregam username, grupos, is_superuser e a versão ('ver') do usuário
+    "TOKEN_OBTAIN_SERIALIZER": "core.authentication.TokenComClaimsSerializer",
+    "TOKEN_REFRESH_SERIALIZER": "core.authentication.TokenRefreshVersionadoSerializer",
+}
+
+# Endpoints de leitura (Kanban, dashboard, relatórios) autenticam só pelas
+# claims do token, sem carregar o User do banco a cada requisição.
+JWT_STATELESS_LEITURA = os.environ.get('JWT_STATELESS_LEITURA', 'True') == 'True'
+
+# Cache compartilhado entre os workers do gunicorn. Guarda a versão dos
+# tokens (revogação) e da Empresa: todos os serviços que atendem a API
+# (api e api-async) precisam apontar DJANGO_CACHE_DIR para o mesmo volume
+# (ver docker-compose.prod.yml), senão um token revogado continua valendo
+# por até VERSAO_TOKEN_CACHE_TIMEOUT no serviço que não viu a revogação.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get('DJANGO_CACHE_DIR', '/tmp/grafica_cache'),
+    },
+    # Fragmentos dos documentos (linhas de item), em memória do processo
+    'documentos': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'documentos',
+        'OPTIONS': {'MAX_ENTRIES': 5000},
+    },
 }
 # Configurações de mídia
 STATIC_URL = '/static/'
@@ -174,4 +205,75 @@ MEDIA_URL = '/media/'
 
 STATIC_ROOT = BASE_DIR / 'staticfiles'
 
-MEDIA_ROOT = BASE_DIR / 'media'
\ No newline at end of file
+MEDIA_ROOT = BASE_DIR / 'media'
+
+# Onde a mídia fica (ver core/armazenamento.py): 'local' (MEDIA_ROOT, volume
+# compartilhado com o nginx) ou 's3' (bucket S3/MinIO, com URLs
+# pré-assinadas para download e envio direto). Com 's3' a API pode rodar em
+# vários nós sem volume compartilhado. As URLs assinadas apontam para o
+# endpoint público, que precisa ser acessível pelo navegador.
+MEDIA_STORAGE = os.environ.get('MEDIA_STORAGE', 'local')
+AWS_STORAGE_BUCKET_NAME = os.environ.get('AWS_STORAGE_BUCKET_NAME', '')
+AWS_S3_ENDPOINT_URL = os.environ.get('AWS_S3_ENDPOINT_URL') or None  # MinIO: http://minio:9000
+AWS_S3_ENDPOINT_URL_PUBLICO = os.environ.get('AWS_S3_ENDPOINT_URL_PUBLICO') or None  # usado nas URLs assinadas
+AWS_S3_REGION_NAME = os.environ.get('AWS_S3_REGION_NAME', 'us-east-1')
+AWS_ACCESS_KEY_ID = os.environ.get('AWS_ACCESS_KEY_ID')
+AWS_SECRET_ACCESS_KEY = os.environ.get('AWS_SECRET_ACCESS_KEY')
+AWS_S3_ADDRESSING_STYLE = os.environ.get('AWS_S3_ADDRESSING_STYLE', 'path')
+AWS_S3_SIGNATURE_VERSION = 's3v4'
+AWS_QUERYSTRING_AUTH = True                    # url() devolve URLs pré-assinadas
+AWS_QUERYSTRING_EXPIRE = int(os.environ.get('AWS_QUERYSTRING_EXPIRE', 60 * 60))
+AWS_DEFAULT_ACL = None
+AWS_S3_FILE_OVERWRITE = True                   # chave por conteúdo: mesmo nome, mesmos bytes
+
+# Location interna do nginx que serve o MEDIA_ROOT (ver nginx.conf). Vazio:
+# o próprio Django entrega os arquivos (desenvolvimento).
+MEDIA_ACCEL_REDIRECT = os.environ.get('MEDIA_ACCEL_REDIRECT', '')
+
+# Consulta de CNPJ (ver core/cnpj.py). A URL base pode apontar para um
+# servidor local nos testes; o backend pode ser trocado por outra classe.
+CNPJ_BACKEND = os.environ.get('CNPJ_BACKEND', 'core.cnpj_backends.BrasilAPIBackend')
+CNPJ_API_BASE_URL = os.environ.get('CNPJ_API_BASE_URL', 'https://brasilapi.com.br/api/cnpj/v1/')
+CNPJ_API_TIMEOUT = 5
+CNPJ_API_MAX_CONCORRENCIA = 10                # consultas simultâneas por worker ASGI
+CNPJ_CACHE_TTL = 60 * 60 * 24 * 30            # 30 dias para CNPJs encontrados
+CNPJ_CACHE_TTL_NAO_ENCONTRADO = 60 * 60 * 24  # 1 dia para 404
+
+# Relatórios (ver core/relatorios.py).
+# Sub-consultas simultâneas por processo (cada worker do gunicorn tem o seu
+# pool). Cada thread do pool usa uma conexão própria: conte
+# workers x (threads + este valor) no max_connections do Postgres. Sob o
+# gunicorn o padrão vem de gunicorn.conf.py (RELATORIOS_CONEXOES dividido
+# pelos workers); o 4 daqui vale para o runserver. Use 1 para executar em sequência.
+RELATORIOS_MAX_CONCORRENCIA = int(os.environ.get('RELATORIOS_MAX_CONCORRENCIA', 4))
+RELATORIOS_TIMEOUT = int(os.environ.get('RELATORIOS_TIMEOUT', 30))  # segundos
+
+# PDFs (ver core/pdf.py): imagens reduzidas para PDF_DPI no tamanho em que
+# aparecem na página. 150 dpi basta para impressora de escritório.
+PDF_DPI = int(os.environ.get('PDF_DPI', 150))
+PDF_JPEG_QUALIDADE = 80
+PDF_IMAGENS_DIR = os.environ.get('PDF_IMAGENS_DIR', '/tmp/grafica_pdf_imagens')
+# Imagens sem uso há mais que isso saem no limpar_uploads_arte
+PDF_IMAGENS_EXPIRACAO_DIAS = int(os.environ.get('PDF_IMAGENS_EXPIRACAO_DIAS', 30))
+# Etiqueta da portaria desenhada direto com pydyf (core/etiquetas.py), sem
+# WeasyPrint. False volta para o template HTML.
+ETIQUETA_PDF_DIRETO = os.environ.get('ETIQUETA_PDF_DIRETO', 'True') == 'True'
+# Etiqueta em impressora térmica (core/termica.py): resolução da cabeça de
+# impressão, tamanho da etiqueta ZPL e colunas da fonte A no ESC/POS
+# (48 na bobina de 80mm, 32 na de 58mm).
+ETIQUETA_TERMICA_DPI = int(os.environ.get('ETIQUETA_TERMICA_DPI', 203))
+ETIQUETA_ZPL_LARGURA_MM = int(os.environ.get('ETIQUETA_ZPL_LARGURA_MM', 100))
+ETIQUETA_ZPL_ALTURA_MM = int(os.environ.get('ETIQUETA_ZPL_ALTURA_MM', 150))
+ESCPOS_COLUNAS = int(os.environ.get('ESCPOS_COLUNAS', 48))
+
+# Derivados das artes (ver core/imagens.py): threads por processo que geram
+# miniatura/prévia/imagem do PDF após o upload. 0 = gera na própria requisição.
+ARTES_DERIVADOS_WORKERS = int(os.environ.get('ARTES_DERIVADOS_WORKERS', 1))
+
+# Upload de arte em partes (ver core/uploads.py). A pasta temporária fica
+# fora do MEDIA_ROOT (o nginx serve /media/), mas no mesmo disco, para o
+# arquivo final ser só movido.
+UPLOADS_ARTE_DIR = os.environ.get('UPLOADS_ARTE_DIR', str(BASE_DIR / 'uploads_tmp'))
+UPLOADS_ARTE_TAMANHO_MAX = int(os.environ.get('UPLOADS_ARTE_TAMANHO_MAX', 200 * 1024 * 1024))
+UPLOADS_ARTE_PARTE_MAX = 8 * 1024 * 1024  # abaixo do client_max_body_size do nginx
+UPLOADS_ARTE_EXPIRACAO_HORAS = 24
@@ -2,6 +2,10 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
 from django.contrib.auth.models import User
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+from django.utils.html import format_html
 
 from .models import (
     Cliente,
@@ -21,6 +25,42 @@ from .models import (
     Profile
 )
 
+# --- Tabelas grandes ---
+
+class ContagemEstimadaPaginator(Paginator):
+    """
+    Paginação das listas grandes: sem filtro nem busca, usa a estimativa de
+    linhas do Postgres (pg_class.reltuples, mantida pelo autovacuum) em vez
+    de um COUNT(*) que percorre a tabela inteira. Abaixo de LIMIAR linhas,
+    ou com filtro, a contagem é exata.
+    """
+    LIMIAR = 10000
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        conexao = connections[queryset.db]
+        if conexao.vendor == 'postgresql' and not queryset.query.where:
+            with conexao.cursor() as cursor:
+                cursor.execute(
+                    'SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass',
+                    [queryset.model._meta.db_table]
+                )
+                linha = cursor.fetchone()
+            if linha and linha[0] >= self.LIMIAR:
+                return linha[0]
+        return super().count
+
+
+class TabelaGrandeAdmin(admin.ModelAdmin):
+    """
+    Base dos admins de tabelas que crescem sem limite (pedidos, orçamentos,
+    movimentações...). Em vez de date_hierarchy, que varre as datas da lista
+    a cada página, o período fica no list_filter.
+    """
+    paginator = ContagemEstimadaPaginator
+    show_full_result_count = False  # evita um segundo COUNT ao filtrar
+
 # --- Inlines (para mostrar modelos relacionados dentro de outros) ---
 
 class ItemOrcamentoInline(admin.TabularInline):
@@ -28,23 +68,42 @@ class ItemOrcamentoInline(admin.TabularInline):
     fields = ('produto', 'descricao_customizada', 'quantidade', 'largura', 'altura', 'subtotal')
     extra = 1
     readonly_fields = ('subtotal',) # O subtotal é calculado no 'save'
+    autocomplete_fields = ('produto',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('produto')
 
 class ItemPedidoInline(admin.TabularInline):
     model = ItemPedido
     fields = ('produto', 'descricao_customizada', 'quantidade', 'largura', 'altura', 'subtotal', 'observacoes_producao')
     extra = 1
     readonly_fields = ('subtotal',)
+    autocomplete_fields = ('produto',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('produto')
 
 class ArtePedidoInline(admin.StackedInline): # 'Stacked' é melhor para imagens
     model = ArtePedido
-    fields = ('layout', 'comentarios_admin', 'comentarios_cliente', 'data_upload')
-    readonly_fields = ('data_upload',)
+    fields = ('previa_miniatura', 'layout', 'comentarios_admin', 'comentarios_cliente', 'data_upload')
+    readonly_fields = ('previa_miniatura', 'data_upload',)
     extra = 0
 
+    @admin.display(description='Miniatura')
+    def previa_miniatura(self, obj):
+        # Só a miniatura: o original pode ter dezenas de MB
+        if obj.miniatura:
+            return format_html('<a href="{}" target="_blank"><img src="{}" style="max-height:160px"></a>', obj.layout.url, obj.miniatura.url)
+        return 'Gerando miniatura...' if obj.layout else '-'
+
 class CustoFornecedorPedidoInline(admin.TabularInline):
     model = CustoFornecedorPedido
     fields = ('fornecedor', 'descricao', 'custo', 'status', 'data_vencimento', 'data_pagamento')
     extra = 0
+    autocomplete_fields = ('fornecedor',)
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).select_related('fornecedor')
 
 class PagamentoInline(admin.TabularInline):
     model = Pagamento
@@ -70,6 +129,7 @@ class ProdutoAdmin(admin.ModelAdmin):
     list_display = ('nome', 'tipo_precificacao', 'preco', 'custo', 'estoque_atual', 'estoque_minimo')
     list_filter = ('tipo_precificacao',)
     search_fields = ('nome',)
+    ordering = ('nome',)  # paginação estável no autocomplete
     list_editable = ('preco', 'custo', 'estoque_atual', 'estoque_minimo')
     list_per_page = 25
 
@@ -79,17 +139,18 @@ class FornecedorAdmin(admin.ModelAdmin):
     search_fields = ('nome', 'cnpj', 'contato_nome')
 
 @admin.register(Orcamento)
-class OrcamentoAdmin(admin.ModelAdmin):
+class OrcamentoAdmin(TabelaGrandeAdmin):
     inlines = [ItemOrcamentoInline]
     list_display = ('id', 'cliente', 'data_criacao', 'valor_total', 'status', 'data_validade')
     list_filter = ('status', 'data_criacao', 'data_validade')
+    list_select_related = ('cliente',)
     search_fields = ('cliente__nome', 'id')
     readonly_fields = ('valor_total',) # Calculado pela função do modelo
-    date_hierarchy = 'data_criacao'
+    autocomplete_fields = ('cliente',)
     list_per_page = 20
 
 @admin.register(Pedido)
-class PedidoAdmin(admin.ModelAdmin):
+class PedidoAdmin(TabelaGrandeAdmin):
     inlines = [
         ItemPedidoInline, 
         PagamentoInline, 
@@ -98,9 +159,10 @@ class PedidoAdmin(admin.ModelAdmin):
     ]
     list_display = ('id', 'cliente', 'data_criacao', 'valor_total', 'status_producao', 'status_pagamento', 'status_arte', 'previsto_entrega')
     list_filter = ('status_producao', 'status_pagamento', 'status_arte', 'data_criacao', 'previsto_entrega')
+    list_select_related = ('cliente',)
     search_fields = ('cliente__nome', 'id')
     readonly_fields = ('valor_total', 'custo_producao', 'token_aprovacao')
-    date_hierarchy = 'data_criacao'
+    autocomplete_fields = ('cliente', 'orcamento_origem')
     list_per_page = 20
 
 @admin.register(Despesa)
@@ -111,23 +173,26 @@ class DespesaAdmin(admin.ModelAdmin):
     list_editable = ('status', 'data_pagamento')
 
 @admin.register(CustoFornecedorPedido)
-class CustoFornecedorPedidoAdmin(admin.ModelAdmin):
+class CustoFornecedorPedidoAdmin(TabelaGrandeAdmin):
     list_display = ('get_pedido_id', 'fornecedor', 'descricao', 'custo', 'status', 'data_vencimento', 'data_pagamento')
     list_filter = ('status', 'fornecedor', 'data_vencimento')
+    list_select_related = ('fornecedor',)
     search_fields = ('descricao', 'pedido__id', 'fornecedor__nome')
     list_editable = ('status', 'data_pagamento')
+    autocomplete_fields = ('pedido', 'fornecedor')
 
-    @admin.display(description='Pedido #', ordering='pedido__id')
+    @admin.display(description='Pedido #', ordering='pedido_id')
     def get_pedido_id(self, obj):
-        return obj.pedido.id
+        return obj.pedido_id  # sem carregar o pedido
 
 @admin.register(MovimentacaoEstoque)
-class MovimentacaoEstoqueAdmin(admin.ModelAdmin):
+class MovimentacaoEstoqueAdmin(TabelaGrandeAdmin):
     list_display = ('produto', 'quantidade', 'tipo', 'data', 'observacao')
     list_filter = ('tipo', 'data', 'produto')
+    list_select_related = ('produto',)
     search_fields = ('produto__nome', 'observacao')
     readonly_fields = ('data',)
-    date_hierarchy = 'data'
+    autocomplete_fields = ('produto', 'pedido')
 
 @admin.register(EtiquetaPortaria)
 class EtiquetaPortariaAdmin(admin.ModelAdmin):
@@ -7,4 +7,10 @@ class CoreConfig(AppConfig):
     # --- Adicione o método ready abaixo ---
     def ready(self):
         # Importa os sinais para que eles sejam registrados
-        import core.signals
\ No newline at end of file
+        import core.signals
+
+        # Views SQL: removidas antes das migrações e recriadas no final
+        from django.db.models.signals import pre_migrate, post_migrate
+        from .views_sql import criar_views, remover_views
+        pre_migrate.connect(remover_views, sender=self)
+        post_migrate.connect(criar_views, sender=self)
@@ -0,0 +1,118 @@
+import hashlib
+import os
+
+from django.conf import settings
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import F
+
+PASTA_CONTEUDO = 'conteudo'
+
+
+# --- Mídia endereçada por conteúdo ---
+# Artes, logos e fotos de perfil são gravadas pelo SHA-256 do conteúdo:
+#   conteudo/ab/cd/abcd...ef.png
+# Um upload idêntico a um arquivo já existente não grava nada, só reaproveita
+# o arquivo. A tabela BlobMidia conta quantos campos apontam para cada
+# arquivo; delete() só apaga do disco quando a contagem chega a zero.
+# Arquivos antigos (fora de conteudo/) são migrados com:
+#   python manage.py deduplicar_midia
+# MEDIA_STORAGE escolhe onde os arquivos ficam: 'local' (MEDIA_ROOT) ou
+# 's3' (S3/MinIO, ver core/armazenamento_s3.py).
+
+def sha256_conteudo(conteudo):
+    hash_conteudo = hashlib.sha256()
+    if hasattr(conteudo, 'seek'):
+        conteudo.seek(0)
+    for bloco in conteudo.chunks():
+        hash_conteudo.update(bloco)
+    if hasattr(conteudo, 'seek'):
+        conteudo.seek(0)
+    return hash_conteudo.hexdigest()
+
+
+def nome_por_conteudo(sha256, nome_original):
+    extensao = os.path.splitext(nome_original)[1].lower()
+    return f'{PASTA_CONTEUDO}/{sha256[:2]}/{sha256[2:4]}/{sha256}{extensao}'
+
+
+class ConteudoMixin:
+    """
+    Nomes por conteúdo + contagem de referências, sobre qualquer Storage
+    do Django (FileSystemStorage, S3Storage).
+    """
+
+    def _save(self, name, content):
+        sha256 = sha256_conteudo(content)
+        nome = nome_por_conteudo(sha256, name)
+        if not self.exists(nome):
+            gravado = super()._save(nome, content)
+            if gravado != nome:
+                # Outro processo gravou o mesmo conteúdo ao mesmo tempo
+                super().delete(gravado)
+        self.adicionar_referencia(nome, sha256, content.size)
+        return nome
+
+    def adicionar_referencia(self, nome, sha256, tamanho):
+        from .models import BlobMidia
+
+        with transaction.atomic():
+            BlobMidia.objects.get_or_create(nome=nome, defaults={'sha256': sha256, 'tamanho': tamanho})
+            BlobMidia.objects.filter(nome=nome).update(referencias=F('referencias') + 1)
+
+    def delete(self, name):
+        """
+        Remove uma referência. O arquivo só sai do disco (depois do commit)
+        quando ninguém mais aponta para ele. Arquivos sem BlobMidia (antigos,
+        ainda não migrados) são apagados direto, como no FileSystemStorage.
+        """
+        from .models import BlobMidia
+
+        if not name:
+            return
+        with transaction.atomic():
+            blob = BlobMidia.objects.select_for_update().filter(nome=name).first()
+            if blob is None:
+                apagar = True
+            elif blob.referencias > 1:
+                BlobMidia.objects.filter(pk=blob.pk).update(referencias=F('referencias') - 1)
+                apagar = False
+            else:
+                blob.delete()
+                apagar = True
+        if apagar:
+            transaction.on_commit(lambda: self._apagar_se_livre(name))
+
+    def _apagar_se_livre(self, name):
+        from .models import BlobMidia
+
+        # Um upload idêntico pode ter voltado a usar o arquivo nesse meio tempo
+        if not BlobMidia.objects.filter(nome=name).exists():
+            super().delete(name)
+
+
+class ArmazenamentoPorConteudo(ConteudoMixin, FileSystemStorage):
+    pass
+
+
+def armazenamento_remoto():
+    return settings.MEDIA_STORAGE == 's3'
+
+
+_armazenamento = None
+
+
+def armazenamento_midia():
+    """
+    Storage dos ImageFields de mídia (callable: as migrações guardam só a
+    referência a esta função).
+    """
+    global _armazenamento
+    if _armazenamento is None:
+        if armazenamento_remoto():
+            # boto3/django-storages só são importados quando usados
+            from .armazenamento_s3 import ArmazenamentoPorConteudoS3
+            _armazenamento = ArmazenamentoPorConteudoS3()
+        else:
+            _armazenamento = ArmazenamentoPorConteudo()
+    return _armazenamento
@@ -0,0 +1,92 @@
+import base64
+
+from botocore.exceptions import ClientError
+from django.conf import settings
+from storages.backends.s3 import S3Storage
+from storages.utils import clean_name
+
+from .armazenamento import ConteudoMixin, sha256_conteudo
+
+
+# --- Mídia num bucket S3 (ou MinIO) ---
+# Usado com MEDIA_STORAGE = 's3' (configuração AWS_* em app/settings.py).
+# url() devolve URLs pré-assinadas: o navegador baixa direto do bucket.
+# O envio de artes também vai direto: a API assina um PUT para a chave
+# por conteúdo (conteudo/ab/cd/<sha256>.ext) com o SHA-256 declarado, e o
+# bucket recusa um corpo com outro hash.
+
+class ArmazenamentoPorConteudoS3(ConteudoMixin, S3Storage):
+
+    def _chave(self, nome):
+        return self._normalize_name(clean_name(nome))
+
+    def _cliente_assinatura(self):
+        """
+        Cliente boto3 que assina as URLs entregues ao navegador. Usa
+        AWS_S3_ENDPOINT_URL_PUBLICO quando a API fala com o bucket por um
+        endereço interno (ex.: http://minio:9000 dentro do Docker).
+        """
+        publico = settings.AWS_S3_ENDPOINT_URL_PUBLICO
+        if not publico:
+            return self.bucket.meta.client
+        cliente = getattr(self._connections, 'assinatura', None)
+        if cliente is None:
+            cliente = self._create_session().client(
+                's3', region_name=self.region_name, use_ssl=self.use_ssl,
+                endpoint_url=publico, config=self.client_config, verify=self.verify,
+            )
+            self._connections.assinatura = cliente
+        return cliente
+
+    def url(self, name, parameters=None, expire=None, http_method=None):
+        params = dict(parameters or {}, Bucket=self.bucket_name, Key=self._chave(name))
+        return self._cliente_assinatura().generate_presigned_url(
+            'get_object', Params=params,
+            ExpiresIn=expire or self.querystring_expire, HttpMethod=http_method,
+        )
+
+    def url_envio(self, nome, sha256, content_type, expira):
+        """
+        URL pré-assinada para o cliente enviar o arquivo com PUT, e os
+        headers que ele precisa mandar junto.
+        """
+        checksum = base64.b64encode(bytes.fromhex(sha256)).decode()
+        url = self._cliente_assinatura().generate_presigned_url(
+            'put_object',
+            Params={
+                'Bucket': self.bucket_name,
+                'Key': self._chave(nome),
+                'ContentType': content_type,
+                'ChecksumSHA256': checksum,
+            },
+            ExpiresIn=expira,
+            HttpMethod='PUT',
+        )
+        return url, {'Content-Type': content_type, 'x-amz-checksum-sha256': checksum}
+
+    def conferir_envio(self, nome, tamanho, sha256):
+        """
+        True se o objeto existe com o tamanho e o SHA-256 esperados.
+        """
+        from .models import BlobMidia
+
+        try:
+            info = self.bucket.meta.client.head_object(
+                Bucket=self.bucket_name, Key=self._chave(nome), ChecksumMode='ENABLED'
+            )
+        except ClientError:
+            return False
+        if info.get('ChecksumSHA256'):
+            confere = base64.b64decode(info['ChecksumSHA256']).hex() == sha256
+        else:
+            # Provedor que não guarda o checksum: confere lendo o objeto
+            with self.open(nome, 'rb') as arquivo:
+                confere = sha256_conteudo(arquivo) == sha256
+        if not confere or info['ContentLength'] != tamanho:
+            # Corpo diferente do hash declarado não pode ficar na chave por
+            # conteúdo. Se a chave já tem BlobMidia, o objeto é de uma mídia
+            # em uso (gravada e conferida antes): não se apaga.
+            if not BlobMidia.objects.filter(nome=nome).exists():
+                self.bucket.meta.client.delete_object(Bucket=self.bucket_name, Key=self._chave(nome))
+            return False
+        return True
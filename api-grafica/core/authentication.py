@@ -0,0 +1,176 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import F
+from django.utils.functional import cached_property
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.models import TokenUser
+from rest_framework_simplejwt.serializers import (
+    TokenObtainPairSerializer,
+    TokenRefreshSerializer,
+)
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import Profile
+
+# Métodos que nunca alteram dados: podem ser servidos só com as claims do token
+METODOS_LEITURA = ('GET', 'HEAD', 'OPTIONS')
+
+# Cookie em que o frontend guarda o access token (ver AuthContext.tsx)
+COOKIE_ACCESS_TOKEN = 'access_token'
+
+# Por quanto tempo (segundos) a versão do token de cada usuário fica em cache
+VERSAO_TOKEN_CACHE_TIMEOUT = 300
+
+# Versão guardada no cache para usuário sem Profile (excluído): nenhum token a tem
+SEM_PERFIL = -1
+
+
+def _chave_versao(user_id):
+    return f"auth:versao_token:{user_id}"
+
+
+def obter_versao_token(user_id):
+    """
+    Retorna a versão atual dos tokens do usuário, consultando o banco
+    apenas quando ela não estiver no cache. Sem Profile (usuário excluído),
+    retorna SEM_PERFIL, que não confere com a versão de nenhum token.
+    """
+    chave = _chave_versao(user_id)
+    versao = cache.get(chave)
+    if versao is None:
+        versao = Profile.objects.filter(user_id=user_id).values_list('versao_token', flat=True).first()
+        if versao is None:
+            versao = SEM_PERFIL
+        cache.set(chave, versao, VERSAO_TOKEN_CACHE_TIMEOUT)
+    return versao
+
+
+def revogar_tokens_usuario(user_id):
+    """
+    Invalida todos os tokens já emitidos para o usuário, incrementando
+    a versão gravada no perfil (e descartando a versão em cache).
+    O cache só é limpo depois do commit: antes disso, uma requisição
+    concorrente ainda leria a versão antiga do banco e a guardaria de novo.
+    """
+    Profile.objects.filter(user_id=user_id).update(versao_token=F('versao_token') + 1)
+    transaction.on_commit(lambda: cache.delete(_chave_versao(user_id)))
+
+
+def verificar_versao_token(token):
+    """
+    Rejeita o token se a claim 'ver' não bater com a versão atual do usuário.
+    Tokens emitidos antes da claim existir continuam aceitos.
+    """
+    if 'ver' not in token:
+        return
+    user_id = token.get(api_settings.USER_ID_CLAIM)
+    if token['ver'] != obter_versao_token(user_id):
+        raise InvalidToken("Token revogado. Faça login novamente.")
+
+
+class UsuarioToken(TokenUser):
+    """
+    Usuário leve montado só a partir das claims do token (sem consulta ao banco).
+    """
+
+    @cached_property
+    def nomes_grupos(self):
+        return frozenset(self.token.get('grupos', []))
+
+
+class TokenComClaimsSerializer(TokenObtainPairSerializer):
+    """
+    Inclui no token as claims necessárias para autenticar sem carregar o User.
+    """
+
+    @classmethod
+    def get_token(cls, user):
+        token = super().get_token(user)
+        token['username'] = user.username
+        token['is_superuser'] = user.is_superuser
+        token['grupos'] = list(user.groups.values_list('name', flat=True))
+        # Usuário antigo, criado antes do Profile, ganha o perfil no login
+        perfil, criado = Profile.objects.get_or_create(user=user)
+        if criado:
+            cache.delete(_chave_versao(user.id))
+        token['ver'] = perfil.versao_token
+        return token
+
+
+class TokenRefreshVersionadoSerializer(TokenRefreshSerializer):
+    """
+    Não renova tokens que foram revogados (versão desatualizada).
+    """
+
+    def validate(self, attrs):
+        verificar_versao_token(self.token_class(attrs['refresh']))
+        return super().validate(attrs)
+
+
+class JWTVersionadoAuthentication(JWTAuthentication):
+    """
+    Autenticação JWT padrão (carrega o User do banco) que também
+    respeita a revogação por versão do token.
+    """
+
+    def get_user(self, validated_token):
+        user = super().get_user(validated_token)
+        verificar_versao_token(validated_token)
+        return user
+
+
+class JWTStatelessAuthentication(JWTVersionadoAuthentication):
+    """
+    Para endpoints de leitura intensa (Kanban, dashboard, relatórios).
+
+    Em requisições de leitura, monta o usuário a partir das claims do token
+    sem buscar o User no banco; a única verificação é a versão do token,
+    que vem do cache. Escritas e tokens sem as claims caem no fluxo normal.
+    """
+
+    def authenticate(self, request):
+        header = self.get_header(request)
+        if header is None:
+            return None
+
+        raw_token = self.get_raw_token(header)
+        if raw_token is None:
+            return None
+
+        validated_token = self.get_validated_token(raw_token)
+
+        if (
+            getattr(settings, 'JWT_STATELESS_LEITURA', False)
+            and request.method in METODOS_LEITURA
+            and 'ver' in validated_token
+            and 'grupos' in validated_token
+        ):
+            verificar_versao_token(validated_token)
+            return UsuarioToken(validated_token), validated_token
+
+        return self.get_user(validated_token), validated_token
+
+
+class JWTCookieAuthentication(JWTVersionadoAuthentication):
+    """
+    Lê o token do cookie 'access_token' gravado pelo frontend. Usada na
+    entrega de mídia: imagens carregadas por <img> não enviam o header
+    Authorization.
+
+    O cookie dura mais que o token: vencido, revogado ou inválido, a
+    requisição segue anônima (arquivos públicos e ?token= continuam
+    valendo) em vez de responder 401.
+    """
+
+    def authenticate(self, request):
+        raw_token = request.COOKIES.get(COOKIE_ACCESS_TOKEN)
+        if not raw_token:
+            return None
+        try:
+            validated_token = self.get_validated_token(raw_token.encode())
+            return self.get_user(validated_token), validated_token
+        except AuthenticationFailed:  # InvalidToken é subclasse
+            return None
@@ -0,0 +1,153 @@
+import asyncio
+import datetime
+import threading
+import weakref
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import ConsultaCNPJ
+
+
+class ErroConsultaCNPJ(Exception):
+    """
+    Falha ao consultar a API externa de CNPJ (conexão ou resposta inesperada).
+    """
+
+
+class TimeoutConsultaCNPJ(ErroConsultaCNPJ):
+    """
+    A API externa de CNPJ não respondeu dentro do timeout.
+    """
+
+
+_backend = None
+_backend_lock = threading.Lock()
+
+
+def get_backend():
+    """
+    Instancia (uma vez por processo) o backend definido em settings.CNPJ_BACKEND.
+    O módulo do backend (e os clientes HTTP que ele usa) só é importado aqui,
+    na primeira consulta.
+    """
+    global _backend
+    if _backend is None:
+        with _backend_lock:
+            if _backend is None:
+                classe = import_string(settings.CNPJ_BACKEND)
+                _backend = classe(settings.CNPJ_API_BASE_URL, settings.CNPJ_API_TIMEOUT)
+    return _backend
+
+
+def _validade(status_code):
+    if status_code == 404:
+        return datetime.timedelta(seconds=settings.CNPJ_CACHE_TTL_NAO_ENCONTRADO)
+    return datetime.timedelta(seconds=settings.CNPJ_CACHE_TTL)
+
+
+def buscar_em_cache(cnpj):
+    """
+    Retorna (status_code, dados) se houver consulta ainda válida no banco, senão None.
+    """
+    consulta = ConsultaCNPJ.objects.filter(cnpj=cnpj).first()
+    if consulta and consulta.data_consulta + _validade(consulta.status_code) > timezone.now():
+        return consulta.status_code, consulta.dados
+    return None
+
+
+def gravar_em_cache(cnpj, status_code, dados):
+    ConsultaCNPJ.objects.update_or_create(
+        cnpj=cnpj,
+        defaults={'status_code': status_code, 'dados': dados, 'data_consulta': timezone.now()}
+    )
+
+
+# --- Consulta (assíncrona, servida via ASGI, ver app/asgi.py) ---
+
+class _EstadoLoop:
+    """
+    Recursos ligados a um event loop: cliente HTTP com pool, semáforo que
+    limita as consultas simultâneas à API e as consultas em andamento.
+    """
+
+    def __init__(self, backend):
+        self.cliente = None
+        if hasattr(backend, 'criar_cliente_async'):
+            self.cliente = backend.criar_cliente_async(settings.CNPJ_API_MAX_CONCORRENCIA)
+        self.semaforo = asyncio.Semaphore(settings.CNPJ_API_MAX_CONCORRENCIA)
+        self.em_andamento = {}
+
+
+_estado_por_loop = weakref.WeakKeyDictionary()
+
+
+def _estado_loop():
+    loop = asyncio.get_running_loop()
+    estado = _estado_por_loop.get(loop)
+    if estado is None:
+        estado = _EstadoLoop(get_backend())
+        _estado_por_loop[loop] = estado
+    return estado
+
+
+async def _consultar_backend_async(cnpj, estado):
+    backend = get_backend()
+
+    async def consultar():
+        async with estado.semaforo:
+            if hasattr(backend, 'consultar_async'):
+                return await backend.consultar_async(cnpj, estado.cliente)
+            return await sync_to_async(backend.consultar, thread_sensitive=False)(cnpj)
+
+    try:
+        # O tempo de espera na fila do semáforo conta dentro do timeout
+        return await asyncio.wait_for(consultar(), settings.CNPJ_API_TIMEOUT + 1)
+    except asyncio.TimeoutError as e:
+        raise TimeoutConsultaCNPJ("Tempo esgotado consultando o CNPJ.") from e
+
+
+async def consultar_cnpj_async(cnpj):
+    """
+    Consulta um CNPJ (somente dígitos) e retorna (status_code, dados, do_cache).
+
+    Usa o cache em banco quando possível e não prende um worker enquanto a
+    API externa responde. Consultas simultâneas ao mesmo CNPJ no mesmo
+    event loop são agrupadas: só a primeira vai à API e as demais esperam
+    pelo resultado dela (no máximo o timeout da consulta).
+    """
+    em_cache = await sync_to_async(buscar_em_cache)(cnpj)
+    if em_cache:
+        return em_cache + (True,)
+
+    estado = _estado_loop()
+    futuro = estado.em_andamento.get(cnpj)
+    if futuro is not None:
+        try:
+            status_code, dados = await asyncio.wait_for(
+                asyncio.shield(futuro), settings.CNPJ_API_TIMEOUT + 2
+            )
+        except asyncio.TimeoutError as e:
+            raise TimeoutConsultaCNPJ("Tempo esgotado aguardando consulta em andamento.") from e
+        return status_code, dados, False
+
+    futuro = asyncio.get_running_loop().create_future()
+    estado.em_andamento[cnpj] = futuro
+    try:
+        status_code, dados = await _consultar_backend_async(cnpj, estado)
+        await sync_to_async(gravar_em_cache)(cnpj, status_code, dados)
+        futuro.set_result((status_code, dados))
+        return status_code, dados, False
+    except Exception as e:
+        futuro.set_exception(e)
+        raise
+    finally:
+        estado.em_andamento.pop(cnpj, None)
+        if not futuro.done():
+            # Requisição responsável cancelada (ex.: cliente desconectou):
+            # quem esperava por ela recebe um erro em vez de ficar preso
+            futuro.set_exception(ErroConsultaCNPJ("Consulta ao CNPJ interrompida. Tente novamente."))
+        # Marca a exceção como lida: evita o aviso quando ninguém mais esperava
+        futuro.exception()
@@ -0,0 +1,67 @@
+# Backends da consulta de CNPJ (ver core/cnpj.py). Fica num módulo separado
+# para que requests/httpx só sejam importados na primeira consulta.
+
+import httpx
+import requests
+from requests.adapters import HTTPAdapter
+
+from .cnpj import ErroConsultaCNPJ, TimeoutConsultaCNPJ
+
+
+class BrasilAPIBackend:
+    """
+    Backend padrão: consulta a BrasilAPI reaproveitando as conexões
+    (keep-alive) através de uma requests.Session com pool.
+
+    A URL base vem de settings.CNPJ_API_BASE_URL, o que permite apontar
+    para um servidor local nos testes.
+    """
+
+    def __init__(self, base_url, timeout):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=10)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def consultar(self, cnpj):
+        """
+        Retorna (status_code, dados). Levanta ErroConsultaCNPJ em falhas.
+        """
+        try:
+            response = self.session.get(f"{self.base_url}/{cnpj}", timeout=self.timeout)
+        except requests.exceptions.Timeout as e:
+            raise TimeoutConsultaCNPJ(str(e)) from e
+        except requests.exceptions.RequestException as e:
+            raise ErroConsultaCNPJ(str(e)) from e
+
+        return self._interpretar(response.status_code, response.json)
+
+    def criar_cliente_async(self, max_conexoes):
+        """
+        Cria o httpx.AsyncClient (com pool) usado pelas consultas de um event loop.
+        """
+        return httpx.AsyncClient(
+            limits=httpx.Limits(max_connections=max_conexoes, max_keepalive_connections=max_conexoes)
+        )
+
+    async def consultar_async(self, cnpj, cliente):
+        """
+        Versão assíncrona de consultar(), usando o httpx.AsyncClient do event loop.
+        """
+        try:
+            response = await cliente.get(f"{self.base_url}/{cnpj}", timeout=self.timeout)
+        except httpx.TimeoutException as e:
+            raise TimeoutConsultaCNPJ(str(e)) from e
+        except httpx.HTTPError as e:
+            raise ErroConsultaCNPJ(str(e)) from e
+
+        return self._interpretar(response.status_code, response.json)
+
+    def _interpretar(self, status_code, ler_json):
+        if status_code == 200:
+            return 200, ler_json()
+        if status_code == 404:
+            return 404, None
+        raise ErroConsultaCNPJ(f"Status inesperado da API de CNPJ: {status_code}")
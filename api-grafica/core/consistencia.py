@@ -0,0 +1,158 @@
+from django.db.models import (
+    Case, CharField, DecimalField, F, Max, Min, OuterRef, Q, Subquery, Sum, Value, When
+)
+from django.db.models.functions import Coalesce, Greatest
+from django.db.models.lookups import GreaterThanOrEqual, LessThanOrEqual
+
+from .estoque import expressao_saldo_livro
+from .models import (
+    Orcamento, ItemOrcamento, Pedido, ItemPedido, Pagamento, CustoFornecedorPedido, Produto
+)
+
+
+# --- Verificação dos valores calculados (denormalizados) ---
+# Cada verificação diz qual campo é guardado e a expressão SQL que o
+# recalcula a partir das tabelas de origem. A mesma expressão é usada para
+# achar as divergências (annotate) e para corrigi-las (update), sempre em
+# lotes de ids: python manage.py verificar_consistencia
+
+def _dinheiro():
+    return DecimalField(max_digits=12, decimal_places=2)
+
+
+def _soma(modelo, campo, fk):
+    soma = modelo.objects.filter(**{fk: OuterRef('pk')}).values(fk).annotate(total=Sum(campo)).values('total')
+    return Coalesce(Subquery(soma), Value(0), output_field=_dinheiro())
+
+
+def _total_orcamento():
+    # Igual a Orcamento.recalcular_total: itens - desconto + frete, nunca negativo
+    return Greatest(
+        _soma(ItemOrcamento, 'subtotal', 'orcamento') - F('valor_desconto') + F('valor_frete'),
+        Value(0), output_field=_dinheiro()
+    )
+
+
+def _total_pedido():
+    return _soma(ItemPedido, 'subtotal', 'pedido')
+
+
+def _status_pagamento():
+    # Igual a PagamentoViewSet.perform_create: pago x Pedido.valor_total
+    # guardado. Com --corrigir num processo só, pedido_total roda antes.
+    pago = _soma(Pagamento, 'valor', 'pedido')
+    return Case(
+        When(LessThanOrEqual(pago, Value(0)), then=Value(Pedido.StatusPagamento.PENDENTE)),
+        When(GreaterThanOrEqual(pago, F('valor_total')), then=Value(Pedido.StatusPagamento.PAGO)),
+        default=Value(Pedido.StatusPagamento.PARCIAL),
+        output_field=CharField(),
+    )
+
+
+class Verificacao:
+    def __init__(self, modelo, campo, esperado, atual=None, filtro=None, descricao=''):
+        self.modelo = modelo
+        self.campo = campo
+        self.esperado = esperado  # função que devolve a expressão
+        self.atual = atual or (lambda: F(campo))
+        self.filtro = filtro or Q()  # linhas que a verificação cobre
+        self.descricao = descricao
+
+    def linhas(self):
+        return self.modelo.objects.filter(self.filtro)
+
+
+VERIFICACOES = {
+    'orcamento_total': Verificacao(
+        Orcamento, 'valor_total', _total_orcamento,
+        descricao='Orcamento.valor_total = itens - desconto + frete'
+    ),
+    # Pedido convertido de orçamento nasce com o total do orçamento (com
+    # desconto e frete, ver core/conversao.py), que não sai dos itens: fica de fora
+    'pedido_total': Verificacao(
+        Pedido, 'valor_total', _total_pedido, filtro=Q(orcamento_origem__isnull=True),
+        descricao='Pedido.valor_total = soma dos itens (pedidos sem orçamento de origem)'
+    ),
+    'pedido_custo': Verificacao(
+        Pedido, 'custo_producao', lambda: _soma(CustoFornecedorPedido, 'custo', 'pedido'),
+        descricao='Pedido.custo_producao = soma dos custos de fornecedores'
+    ),
+    'pedido_status_pagamento': Verificacao(
+        Pedido, 'status_pagamento', _status_pagamento,
+        descricao='Pedido.status_pagamento pelos pagamentos registrados'
+    ),
+    'produto_estoque': Verificacao(
+        Produto, 'estoque_atual', expressao_saldo_livro,
+        atual=lambda: Coalesce(F('estoque_atual'), Value(0)),
+        descricao='Produto.estoque_atual = saldo do livro de estoque'
+    ),
+}
+
+
+def faixas_de_id(modelo, partes):
+    """
+    Divide [menor id, maior id] da tabela em até `partes` faixas contíguas
+    (para os workers paralelos). Tabela vazia: nenhuma faixa.
+    """
+    limites = modelo.objects.aggregate(menor=Min('id'), maior=Max('id'))
+    if limites['menor'] is None:
+        return []
+    menor, maior = limites['menor'], limites['maior']
+    tamanho = max((maior - menor + 1) // partes, 1)
+    faixas = []
+    inicio = menor
+    while inicio <= maior:
+        fim = maior if len(faixas) == partes - 1 else min(inicio + tamanho - 1, maior)
+        faixas.append((inicio, fim))
+        inicio = fim + 1
+    return faixas
+
+
+def verificar_faixa(nome, inicio=None, fim=None, chunk_size=2000, corrigir=False, exemplos=20):
+    """
+    Percorre os ids da tabela (cursor no servidor, via iterator) em lotes de
+    `chunk_size`; para cada lote, uma consulta traz só as linhas divergentes
+    e, se `corrigir`, um UPDATE recalcula o campo delas.
+    Retorna {'verificacao', 'verificados', 'divergentes', 'corrigidos', 'exemplos'}.
+    """
+    verificacao = VERIFICACOES[nome]
+    ids = verificacao.linhas().order_by('id')
+    if inicio is not None:
+        ids = ids.filter(id__gte=inicio)
+    if fim is not None:
+        ids = ids.filter(id__lte=fim)
+
+    resultado = {'verificacao': nome, 'verificados': 0, 'divergentes': 0, 'corrigidos': 0, 'exemplos': []}
+    lote = []
+    for pk in ids.values_list('id', flat=True).iterator(chunk_size=chunk_size):
+        lote.append(pk)
+        if len(lote) >= chunk_size:
+            _verificar_lote(verificacao, lote[0], lote[-1], resultado, corrigir, exemplos)
+            resultado['verificados'] += len(lote)
+            lote = []
+    if lote:
+        _verificar_lote(verificacao, lote[0], lote[-1], resultado, corrigir, exemplos)
+        resultado['verificados'] += len(lote)
+    return resultado
+
+
+def _verificar_lote(verificacao, primeiro, ultimo, resultado, corrigir, exemplos):
+    modelo = verificacao.modelo
+    divergentes = list(
+        verificacao.linhas().filter(id__gte=primeiro, id__lte=ultimo)
+        .annotate(valor_atual=verificacao.atual(), valor_esperado=verificacao.esperado())
+        .exclude(valor_atual=F('valor_esperado'))
+        .order_by('id')
+        .values_list('id', verificacao.campo, 'valor_esperado')
+    )
+    if not divergentes:
+        return
+    resultado['divergentes'] += len(divergentes)
+    for pk, atual, esperado in divergentes[:max(exemplos - len(resultado['exemplos']), 0)]:
+        resultado['exemplos'].append({'id': pk, 'atual': str(atual), 'esperado': str(esperado)})
+
+    if corrigir:
+        # Recalcula no próprio UPDATE: vale o estado das tabelas nesse momento
+        resultado['corrigidos'] += modelo.objects.filter(
+            id__in=[pk for pk, _, _ in divergentes]
+        ).update(**{verificacao.campo: verificacao.esperado()})
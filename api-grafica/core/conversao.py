@@ -0,0 +1,95 @@
+from collections import defaultdict
+
+from django.db import transaction
+from django.utils import timezone
+
+from .estoque import registrar_movimentacoes
+from .models import Pedido, ItemPedido, ItemOrcamento, MovimentacaoEstoque
+from .vendas import mes_referencia, contribuicao_item_pedido, aplicar_vendas_em_lote
+
+
+# --- Conversão de Orçamentos em Pedidos ---
+# Os itens são copiados com bulk_create, que não dispara os signals de
+# ItemPedido; por isso o estoque (livro + estoque_atual) e o rollup de
+# vendas são atualizados aqui, agregados por produto.
+
+def criar_pedidos_de_orcamentos(orcamentos):
+    """
+    Cria um Pedido (com os itens copiados) para cada orçamento, numa única
+    transação. Não confere se o orçamento já foi convertido nem muda o
+    status dele: isso fica com quem chama (ver OrcamentoViewSet.converter_em_lote).
+    Retorna os pedidos na mesma ordem dos orçamentos.
+    """
+    orcamentos = list(orcamentos)
+    if not orcamentos:
+        return []
+
+    with transaction.atomic():
+        agora = timezone.now()
+        pedidos = Pedido.objects.bulk_create([
+            Pedido(
+                cliente_id=orcamento.cliente_id,
+                orcamento_origem=orcamento,
+                valor_total=orcamento.valor_total,
+                status_producao='Aguardando',
+                status_pagamento=Pedido.StatusPagamento.PENDENTE,
+                data_criacao=agora,
+            )
+            for orcamento in orcamentos
+        ])
+        pedido_por_orcamento = {pedido.orcamento_origem_id: pedido for pedido in pedidos}
+
+        itens = []
+        for io in ItemOrcamento.objects.filter(
+            orcamento_id__in=pedido_por_orcamento
+        ).select_related('produto').order_by('orcamento_id', 'id'):
+            item = ItemPedido(
+                pedido=pedido_por_orcamento[io.orcamento_id],
+                produto=io.produto,
+                quantidade=io.quantidade,
+                largura=io.largura,
+                altura=io.altura,
+                descricao_customizada=io.descricao_customizada,
+                subtotal=io.subtotal,
+            )
+            item.preencher_valores()
+            itens.append(item)
+        ItemPedido.objects.bulk_create(itens, batch_size=500)
+
+        _baixar_estoque(itens)
+        _aplicar_vendas(itens, agora)
+    return pedidos
+
+
+def _baixar_estoque(itens):
+    # Mesmo critério do signal: só produtos com estoque controlado.
+    # Uma movimentação por pedido/produto e um UPDATE por produto.
+    saidas = defaultdict(int)
+    for item in itens:
+        if item.produto and item.produto.estoque_atual is not None:
+            saidas[(item.pedido_id, item.produto_id)] += item.quantidade
+    registrar_movimentacoes([
+        MovimentacaoEstoque(
+            produto_id=produto_id, quantidade=-quantidade, tipo='SAIDA_VENDA',
+            pedido_id=pedido_id, observacao=f"Pedido #{pedido_id}",
+        )
+        for (pedido_id, produto_id), quantidade in saidas.items() if quantidade
+    ])
+
+
+def _aplicar_vendas(itens, data_criacao):
+    mes = mes_referencia(data_criacao)
+    por_produto = {}
+    for item in itens:
+        if not item.produto:
+            continue
+        por_m2 = item.produto.tipo_precificacao == 'M2' and bool(item.largura and item.altura)
+        contribuicao = contribuicao_item_pedido(
+            item.produto_id, item.quantidade, item.largura, item.altura,
+            item.subtotal, item.custo_unitario, por_m2
+        )
+        anterior = por_produto.get(item.produto_id)
+        por_produto[item.produto_id] = (
+            tuple(a + b for a, b in zip(anterior, contribuicao)) if anterior else contribuicao
+        )
+    aplicar_vendas_em_lote(mes, por_produto, timezone.localtime(data_criacao).date())
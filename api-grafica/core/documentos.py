@@ -0,0 +1,108 @@
+from collections import namedtuple
+
+from django.template.loader import render_to_string
+
+from .empresa import obter_empresa, url_logo_pdf
+from .models import Orcamento, Pedido, EtiquetaPortaria
+from .pdf import imagem_para_pdf, uri_arquivo_pdf
+
+
+# --- Documentos em PDF (core/templates/documentos) ---
+# Cada documento monta o contexto do seu template. Com otimizar=False as
+# imagens vão no tamanho original (comparação em: manage.py medir_pdfs).
+# Orçamento e OS também têm pré-visualização em HTML (html_previa).
+
+# Caixa da arte na OS de produção, em px CSS: largura útil do A4 com 1cm
+# de margem x max-height do template
+CAIXA_ARTE_PRODUCAO = (718, 500)
+
+
+def _com_valor_unitario(itens):
+    itens = list(itens)
+    for item in itens:
+        item.valor_unitario = item.subtotal / item.quantidade if item.quantidade > 0 else 0
+    return itens
+
+
+def contexto_orcamento(orcamento, request, otimizar=True):
+    return {
+        'orcamento': orcamento,
+        'itens': _com_valor_unitario(orcamento.itens.select_related('produto')),
+        'empresa': obter_empresa(),
+        'logo_url': url_logo_pdf(request, otimizar=otimizar),
+    }
+
+
+def contexto_pedido(pedido, request, otimizar=True):
+    return {
+        'pedido': pedido,
+        'itens': _com_valor_unitario(pedido.itens.select_related('produto')),
+        'empresa': obter_empresa(),
+        'logo_url': url_logo_pdf(request, otimizar=otimizar),
+        'is_paid': pedido.status_pagamento == 'PAGO',
+    }
+
+
+def contexto_producao(pedido, request, otimizar=True):
+    arte_url = None
+    if pedido.status_arte == Pedido.StatusArte.APROVADO:
+        arte = pedido.artes.order_by('-data_upload').first()
+        if arte and arte.layout:
+            if not otimizar:
+                arte_url = uri_arquivo_pdf(request, arte.layout)
+            elif arte.imagem_pdf:
+                # Derivado já reduzido (core/imagens.py)
+                arte_url = uri_arquivo_pdf(request, arte.imagem_pdf)
+            else:
+                arte_url = (
+                    imagem_para_pdf(arte.layout, *CAIXA_ARTE_PRODUCAO)
+                    or uri_arquivo_pdf(request, arte.layout)
+                )
+    return {
+        'pedido': pedido,
+        'itens': pedido.itens.all(),
+        'empresa': obter_empresa(),
+        'logo_url': url_logo_pdf(request, otimizar=otimizar),
+        'arte_url': arte_url,
+    }
+
+
+def contexto_etiqueta(etiqueta, request, otimizar=True):
+    return {
+        'etiqueta': etiqueta,
+        'empresa': obter_empresa(),
+        'logo_url': url_logo_pdf(request, otimizar=otimizar),
+    }
+
+
+Documento = namedtuple('Documento', ['template', 'modelo', 'contexto', 'nome_arquivo'])
+
+DOCUMENTOS = {
+    'orcamento': Documento('documentos/orcamento_pdf.html', Orcamento, contexto_orcamento, 'orcamento_{pk}.pdf'),
+    'pedido': Documento('documentos/pedido_os_pdf.html', Pedido, contexto_pedido, 'pedido_os_{pk}.pdf'),
+    'producao': Documento('documentos/pedido_os_producao.html', Pedido, contexto_producao, 'os_producao_{pk}.pdf'),
+    'etiqueta': Documento('documentos/etiqueta_a6.html', EtiquetaPortaria, contexto_etiqueta, 'etiqueta_{pk}.pdf'),
+}
+
+
+def html_documento(nome, objeto, request, otimizar=True):
+    documento = DOCUMENTOS[nome]
+    return render_to_string(documento.template, documento.contexto(objeto, request, otimizar))
+
+
+DOCUMENTOS_PREVIA = ('orcamento', 'pedido')
+
+
+def html_previa(nome, objeto, request):
+    """
+    O documento como página HTML, para conferir no navegador sem gerar o
+    PDF. O template é o mesmo (com o CSS de impressão); a logo vai pela
+    URL pública em vez do arquivo local (sem otimizar: a cópia reduzida
+    para o PDF não seria usada).
+    """
+    documento = DOCUMENTOS[nome]
+    contexto = documento.contexto(objeto, request, otimizar=False)
+    logo = contexto['empresa'].logo_orcamento_pdf
+    contexto['logo_url'] = request.build_absolute_uri(logo.url) if logo else None
+    contexto['previa'] = True
+    return render_to_string(documento.template, contexto)
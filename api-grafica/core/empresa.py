@@ -0,0 +1,108 @@
+import os
+import threading
+import uuid
+from pathlib import Path
+
+from django.core.cache import cache
+from django.db import transaction
+
+from .models import Empresa
+from .pdf import imagem_para_pdf
+
+# Maior caixa da logo nos documentos, em px CSS (core/templates/documentos)
+CAIXA_LOGO_PDF = (200, 80)
+
+# Carimbo de versão no cache compartilhado: muda a cada save da Empresa,
+# avisando todos os workers que a cópia local ficou velha.
+CHAVE_VERSAO_EMPRESA = 'empresa:versao'
+
+_lock = threading.Lock()
+_cache_local = {
+    'versao': None,
+    'empresa': None,
+    'logos': {},
+}
+
+
+def versao_empresa():
+    """
+    Retorna o carimbo de versão atual da Empresa (criando um se não existir).
+    """
+    versao = cache.get(CHAVE_VERSAO_EMPRESA)
+    if versao is None:
+        cache.add(CHAVE_VERSAO_EMPRESA, uuid.uuid4().hex, None)
+        versao = cache.get(CHAVE_VERSAO_EMPRESA)
+    return versao
+
+
+def invalidar_empresa():
+    """
+    Gera um novo carimbo de versão; cada worker recarrega a Empresa
+    no próximo acesso. O carimbo só muda depois do commit: antes disso
+    outro worker recarregaria a linha antiga sob o carimbo novo e ficaria
+    com ela até a próxima edição.
+    """
+    transaction.on_commit(lambda: cache.set(CHAVE_VERSAO_EMPRESA, uuid.uuid4().hex, None))
+
+
+def obter_empresa():
+    """
+    Retorna o singleton Empresa a partir da cópia em memória do processo,
+    indo ao banco só quando o carimbo de versão mudou.
+
+    A instância é compartilhada entre requisições: use apenas para leitura.
+    Para editar, busque uma instância nova com Empresa.objects.get_or_create(pk=1).
+    """
+    versao = versao_empresa()
+    if _cache_local['versao'] == versao and _cache_local['empresa'] is not None:
+        return _cache_local['empresa']
+
+    with _lock:
+        if _cache_local['versao'] != versao or _cache_local['empresa'] is None:
+            empresa, created = Empresa.objects.get_or_create(pk=1)
+            _cache_local['empresa'] = empresa
+            _cache_local['logos'] = {}
+            _cache_local['versao'] = versao
+        return _cache_local['empresa']
+
+
+def caminho_logo(campo, otimizar=False):
+    """
+    Retorna a URI file:// da logo indicada ('logo_orcamento_pdf', ...) ou
+    None se ela não existir no disco. Com otimizar, a URI é de uma cópia
+    reduzida para a caixa da logo nos documentos (ver pdf.imagem_para_pdf).
+    O resultado fica em cache junto com a Empresa, evitando consultar o
+    storage a cada PDF.
+    """
+    empresa = obter_empresa()
+    logos = _cache_local['logos']
+    chave = (campo, otimizar)
+    if chave not in logos:
+        arquivo = getattr(empresa, campo)
+        uri = None
+        if arquivo and otimizar:
+            uri = imagem_para_pdf(arquivo, *CAIXA_LOGO_PDF)
+        elif arquivo:
+            try:
+                caminho = arquivo.path
+            except NotImplementedError:
+                # Storage remoto: não há caminho local
+                caminho = None
+            if caminho and os.path.exists(caminho):
+                uri = Path(caminho).as_uri()
+        logos[chave] = uri
+    return logos[chave]
+
+
+def url_logo_pdf(request, campo='logo_orcamento_pdf', otimizar=True):
+    """
+    URL da logo para o WeasyPrint: lê direto do disco quando possível,
+    evitando que o PDF faça uma requisição HTTP de volta ao servidor.
+    """
+    uri = caminho_logo(campo, otimizar)
+    if uri:
+        return uri
+    arquivo = getattr(obter_empresa(), campo)
+    if arquivo:
+        return request.build_absolute_uri(arquivo.url)
+    return None
@@ -0,0 +1,184 @@
+import threading
+from collections import defaultdict
+from contextlib import contextmanager
+import datetime
+
+from django.db import transaction
+from django.db.models import F, IntegerField, Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+
+from .models import Produto, MovimentacaoEstoque, SaldoEstoque
+
+
+# --- Livro de estoque ---
+# Toda alteração de Produto.estoque_atual vira uma linha em
+# MovimentacaoEstoque; estoque_atual é só o saldo em cache do livro.
+# SaldoEstoque guarda fotos periódicas do saldo (gerar_saldos_estoque),
+# assim o saldo de qualquer data só soma as movimentações posteriores
+# à última foto. Conferência: manage.py conciliar_estoque.
+
+_local = threading.local()
+
+
+def _lote_atual():
+    pilha = getattr(_local, 'lotes', None)
+    return pilha[-1] if pilha else None
+
+
+@contextmanager
+def lote_estoque():
+    """
+    Agrupa as movimentações de estoque geradas dentro do bloco (ex: pelos
+    signals de ItemPedido ao salvar um pedido) e grava tudo no final, na
+    mesma transação: uma linha por produto com a quantidade líquida
+    (bulk_create) e um UPDATE por produto. Apagar e recriar os itens de
+    um pedido sem mudar quantidades não gera movimentação.
+    """
+    if not hasattr(_local, 'lotes'):
+        _local.lotes = []
+    lote = {'saldos': defaultdict(int), 'pedidos': {}, 'observacoes': {}}
+    _local.lotes.append(lote)
+    try:
+        with transaction.atomic():
+            yield lote
+            _local.lotes.pop()
+            registrar_movimentacoes([
+                MovimentacaoEstoque(
+                    produto_id=produto_id,
+                    quantidade=quantidade,
+                    tipo=_tipo_pedido(quantidade),
+                    pedido_id=lote['pedidos'].get(produto_id),
+                    observacao=lote['observacoes'].get(produto_id),
+                )
+                for produto_id, quantidade in lote['saldos'].items() if quantidade
+            ])
+    finally:
+        if _local.lotes and _local.lotes[-1] is lote:
+            _local.lotes.pop()
+
+
+def _tipo_pedido(quantidade):
+    return 'SAIDA_VENDA' if quantidade < 0 else 'ENTRADA_DEVOLUCAO'
+
+
+def movimentar_por_pedido(produto_id, quantidade, pedido_id, vincular=True):
+    """
+    Movimentação causada por item de pedido (quantidade negativa = saída).
+    Dentro de lote_estoque() só acumula; fora dele grava na hora.
+    `vincular=False` só cita o pedido na observação, sem a FK (usado quando
+    o pedido pode estar sendo excluído na mesma operação).
+    """
+    if not quantidade:
+        return
+    observacao = f"Pedido #{pedido_id}" if pedido_id else None
+    if not vincular:
+        pedido_id = None
+    lote = _lote_atual()
+    if lote is not None:
+        lote['saldos'][produto_id] += quantidade
+        lote['observacoes'].setdefault(produto_id, observacao)
+        if pedido_id:
+            lote['pedidos'].setdefault(produto_id, pedido_id)
+        return
+    registrar_movimentacoes([MovimentacaoEstoque(
+        produto_id=produto_id, quantidade=quantidade, tipo=_tipo_pedido(quantidade),
+        pedido_id=pedido_id, observacao=observacao,
+    )])
+
+
+def registrar_movimentacoes(movimentacoes, aplicar=True):
+    """
+    Grava as movimentações em bulk (sem disparar o post_save) e, se `aplicar`,
+    atualiza estoque_atual com um UPDATE por produto.
+    `aplicar=False` serve para registrar no livro uma mudança que já foi
+    gravada no produto (ex: edição do estoque no cadastro).
+    """
+    if not movimentacoes:
+        return
+    MovimentacaoEstoque.objects.bulk_create(movimentacoes)
+    if aplicar:
+        por_produto = defaultdict(int)
+        for mov in movimentacoes:
+            por_produto[mov.produto_id] += mov.quantidade
+        aplicar_no_estoque(por_produto)
+
+
+def aplicar_no_estoque(por_produto):
+    """
+    Soma as quantidades em estoque_atual ({produto_id: quantidade}).
+    Produtos sem controle (estoque nulo) passam a começar do zero.
+    """
+    for produto_id, quantidade in por_produto.items():
+        if quantidade:
+            Produto.objects.filter(id=produto_id).update(
+                estoque_atual=Coalesce(F('estoque_atual'), Value(0)) + quantidade
+            )
+
+
+# --- Saldos (fotos) e conferência ---
+
+def ultima_movimentacao_estavel(margem=datetime.timedelta(minutes=1)):
+    """
+    Maior id de movimentação com mais de `margem` de idade. Movimentações
+    mais novas podem ainda estar em transações abertas (ids fora de ordem),
+    então ficam para a próxima foto.
+    """
+    return MovimentacaoEstoque.objects.filter(
+        data__lt=timezone.now() - margem
+    ).aggregate(ultima=Max('id'))['ultima'] or 0
+
+
+def expressao_saldo_livro(ate_movimentacao=None, ate_data=None):
+    """
+    Saldo do produto (OuterRef('pk')) pelo livro: a última foto
+    (SaldoEstoque) mais as movimentações posteriores a ela. Serve tanto
+    em annotate() quanto em update() (ver core/consistencia.py).
+    """
+    def fotos(produto):
+        qs = SaldoEstoque.objects.filter(produto=produto)
+        if ate_data is not None:
+            qs = qs.filter(data__lte=ate_data)
+        return qs.order_by('-ultima_movimentacao_id')
+
+    # A foto é consultada de novo dentro da soma (OuterRef duplo), assim a
+    # expressão não depende de outras anotações e pode ir num UPDATE.
+    foto_movimentacao = Coalesce(
+        Subquery(fotos(OuterRef(OuterRef('pk'))).values('ultima_movimentacao_id')[:1]), Value(0)
+    )
+    movimentacoes = MovimentacaoEstoque.objects.filter(produto=OuterRef('pk'), id__gt=foto_movimentacao)
+    if ate_movimentacao is not None:
+        movimentacoes = movimentacoes.filter(id__lte=ate_movimentacao)
+    if ate_data is not None:
+        movimentacoes = movimentacoes.filter(data__lte=ate_data)
+    soma = movimentacoes.values('produto').annotate(total=Sum('quantidade')).values('total')
+    return (
+        Coalesce(Subquery(fotos(OuterRef('pk')).values('quantidade')[:1]), Value(0))
+        + Coalesce(Subquery(soma, output_field=IntegerField()), Value(0))
+    )
+
+
+def anotar_saldo_livro(produtos, ate_movimentacao=None, ate_data=None):
+    """
+    Anota em cada produto o saldo pelo livro (saldo_livro) e o id da
+    movimentação coberta pela última foto (foto_movimentacao). Uma consulta
+    só, proporcional às movimentações recentes, não ao histórico inteiro.
+    """
+    fotos = SaldoEstoque.objects.filter(produto=OuterRef('pk'))
+    if ate_data is not None:
+        fotos = fotos.filter(data__lte=ate_data)
+    return produtos.annotate(
+        foto_movimentacao=Coalesce(
+            Subquery(fotos.order_by('-ultima_movimentacao_id').values('ultima_movimentacao_id')[:1]), Value(0)
+        ),
+        saldo_livro=expressao_saldo_livro(ate_movimentacao, ate_data),
+    )
+
+
+def saldo_em(produto, data):
+    """
+    Estoque do produto numa data/hora passada, pelo livro.
+    """
+    return anotar_saldo_livro(Produto.objects.filter(pk=produto.pk), ate_data=data).values_list(
+        'saldo_livro', flat=True
+    ).first()
@@ -0,0 +1,280 @@
+import io
+import unicodedata
+import zlib
+from collections import namedtuple
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from .empresa import caminho_logo, obter_empresa
+
+
+# --- Etiqueta da portaria desenhada direto em PDF (pydyf) ---
+# A etiqueta A6 tem layout fixo: em vez de passar pelo WeasyPrint (HTML,
+# CSS, layout), os blocos de LAYOUTS são desenhados de cima para baixo
+# com as medidas de documentos/etiqueta_a6.html. Usa as fontes padrão do
+# PDF (Helvetica, sem embutir) em WinAnsiEncoding, que cobre o português.
+# Comparação com a versão HTML: python manage.py comparar_etiqueta
+
+PT_POR_MM = 72 / 25.4
+PT_POR_PX = 0.75                       # 1px CSS = 0,75pt
+
+LARGURA_A6 = 105 * PT_POR_MM
+ALTURA_A6 = 148 * PT_POR_MM
+MARGEM = 5 * PT_POR_MM                 # @page { margin: 0.5cm }
+ALTURA_CORPO = 0.95                    # body { height: 95% }
+LINHA = 1.15                           # line-height normal da Arial/Helvetica
+ASCENDENTE = 0.905
+
+PRETO = (0, 0, 0)
+CINZA_LABEL = (0x55 / 255,) * 3
+CINZA_RODAPE = (0x33 / 255,) * 3
+CINZA_BORDA = (0xcc / 255,) * 3
+
+CAIXA_LOGO = (150 * PT_POR_PX, 60 * PT_POR_PX)
+
+# texto: str (pode usar {campos} e \n) ou lista de trechos (texto, negrito)
+Bloco = namedtuple('Bloco', ['texto', 'tamanho', 'negrito', 'cor', 'centro', 'antes'])
+
+_P = 5 * PT_POR_PX                     # margem dos <p>
+_SECAO = 15 * PT_POR_PX                # margin-top dos labels seguintes
+
+LAYOUTS = {
+    'CONDOMINIO': [
+        Bloco('ENTREGA PORTARIA', 24, True, PRETO, True, 0),
+        Bloco('Para:', 12, False, CINZA_LABEL, False, _P),
+        Bloco('{nome_responsavel}', 20, True, PRETO, False, _P),
+        Bloco('Bloco:', 12, False, CINZA_LABEL, False, _SECAO),
+        Bloco('{bloco}', 20, True, PRETO, False, _P),
+        Bloco('Apto:', 12, False, CINZA_LABEL, False, _SECAO),
+        Bloco('{apartamento}', 20, True, PRETO, False, _P),
+    ],
+    'RETIRADA': [
+        Bloco('RETIRADA PORTARIA', 24, True, PRETO, True, 0),
+        Bloco('Quem vai retirar:', 12, False, CINZA_LABEL, False, _P),
+        Bloco('{nome_responsavel}', 20, True, PRETO, False, _P),
+        Bloco('Entregue por (Diego/Jamille):', 12, False, CINZA_LABEL, False, _SECAO),
+        Bloco('{nome_empresa}\n(Bloco 24 / Apto 202)', 16, True, PRETO, False, _P),
+    ],
+}
+
+RODAPE = Bloco(
+    [('Instagram:', True), (' {instagram} | ', False), ('WhatsApp:', True), (' {whatsapp}', False)],
+    10, False, CINZA_RODAPE, True, 0
+)
+
+# Larguras (em 1/1000 do corpo) da Helvetica e Helvetica-Bold, ASCII 32-126.
+# Letras acentuadas usam a largura da letra base.
+_LARGURAS = {
+    False: [
+        278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,
+        1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,
+        333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,
+        556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,
+    ],
+    True: [
+        278, 333, 474, 556, 556, 889, 722, 238, 333, 333, 389, 584, 278, 333, 278, 278,
+        556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 333, 333, 584, 584, 584, 611,
+        975, 722, 722, 722, 722, 667, 611, 778, 722, 278, 556, 722, 611, 833, 722, 778,
+        667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 333, 278, 333, 584, 556,
+        333, 556, 611, 556, 611, 556, 333, 611, 611, 278, 278, 556, 278, 889, 611, 611,
+        611, 611, 389, 556, 333, 611, 556, 778, 556, 556, 500, 389, 280, 389, 584,
+    ],
+}
+FONTES = {False: 'F1', True: 'F2'}
+
+
+def largura_texto(texto, tamanho, negrito):
+    larguras = _LARGURAS[negrito]
+    total = 0
+    for caractere in texto:
+        codigo = ord(unicodedata.normalize('NFD', caractere)[0])
+        total += larguras[codigo - 32] if 32 <= codigo <= 126 else 556
+    return total * tamanho / 1000
+
+
+def _quebrar(texto, tamanho, negrito, largura):
+    linhas = []
+    for paragrafo in texto.split('\n'):
+        atual = ''
+        for palavra in paragrafo.split():
+            tentativa = f'{atual} {palavra}' if atual else palavra
+            if atual and largura_texto(tentativa, tamanho, negrito) > largura:
+                linhas.append(atual)
+                atual = palavra
+            else:
+                atual = tentativa
+        linhas.append(atual)
+    return linhas
+
+
+# --- Imagem da logo (XObject) ---
+# Montada uma vez por arquivo e reaproveitada entre etiquetas.
+
+_logos = {}
+
+
+def arquivo_logo():
+    """
+    Caminho local da logo já reduzida (empresa.caminho_logo) ou None.
+    """
+    uri = caminho_logo('logo_orcamento_pdf', otimizar=True)
+    return url2pathname(urlparse(uri).path) if uri else None
+
+
+def _xobject_logo(caminho):
+    if caminho not in _logos:
+        from PIL import Image
+
+        with Image.open(caminho) as imagem:
+            largura, altura = imagem.size
+            if imagem.format == 'JPEG' and imagem.mode in ('RGB', 'L'):
+                # JPEG vai para o PDF como está (DCTDecode), sem decodificar
+                with open(caminho, 'rb') as arquivo:
+                    dados, filtro, alfa = arquivo.read(), '/DCTDecode', None
+                espaco = '/DeviceRGB' if imagem.mode == 'RGB' else '/DeviceGray'
+            else:
+                imagem = imagem.convert('RGBA')
+                dados, filtro, espaco = zlib.compress(imagem.convert('RGB').tobytes()), '/FlateDecode', '/DeviceRGB'
+                alfa = zlib.compress(imagem.getchannel('A').tobytes())
+        _logos[caminho] = (largura, altura, dados, filtro, espaco, alfa)
+    return _logos[caminho]
+
+
+def _adicionar_logo(pdf, caminho):
+    import pydyf
+
+    largura, altura, dados, filtro, espaco, alfa = _xobject_logo(caminho)
+    extra = {
+        'Type': '/XObject', 'Subtype': '/Image', 'Width': largura, 'Height': altura,
+        'ColorSpace': espaco, 'BitsPerComponent': 8, 'Filter': filtro,
+    }
+    if alfa is not None:
+        mascara = pydyf.Stream([alfa], extra={
+            'Type': '/XObject', 'Subtype': '/Image', 'Width': largura, 'Height': altura,
+            'ColorSpace': '/DeviceGray', 'BitsPerComponent': 8, 'Filter': '/FlateDecode',
+        })
+        pdf.add_object(mascara)
+        extra['SMask'] = mascara.reference
+    imagem = pydyf.Stream([dados], extra=extra)
+    pdf.add_object(imagem)
+    return imagem, largura / altura
+
+
+# --- Desenho ---
+
+class _Pagina:
+    def __init__(self, stream):
+        self.stream = stream
+        self.x = MARGEM
+        self.largura = LARGURA_A6 - 2 * MARGEM
+        self.y = ALTURA_A6 - MARGEM
+
+    def texto(self, trechos, tamanho, cor, centro, baseline):
+        largura = sum(largura_texto(t, tamanho, n) for t, n in trechos)
+        x = self.x + (self.largura - largura) / 2 if centro else self.x
+        self.stream.set_color_rgb(*cor)
+        self.stream.begin_text()
+        self.stream.set_text_matrix(1, 0, 0, 1, x, baseline)
+        for trecho, negrito in trechos:
+            self.stream.set_font_size(FONTES[negrito], tamanho)
+            self.stream.show_text_string(trecho.encode('cp1252', 'replace'))
+        self.stream.end_text()
+
+    def bloco(self, bloco, contexto):
+        self.y -= bloco.antes
+        if isinstance(bloco.texto, list):
+            linhas = [[(t.format(**contexto), n) for t, n in bloco.texto]]
+        else:
+            texto = bloco.texto.format(**contexto)
+            linhas = [[(linha, bloco.negrito)] for linha in _quebrar(texto, bloco.tamanho, bloco.negrito, self.largura)]
+        altura_linha = bloco.tamanho * LINHA
+        for trechos in linhas:
+            baseline = self.y - (altura_linha - bloco.tamanho) / 2 - ASCENDENTE * bloco.tamanho
+            self.texto(trechos, bloco.tamanho, bloco.cor, bloco.centro, baseline)
+            self.y -= altura_linha
+
+    def tracejado(self, y):
+        # border: 2px dashed #ccc
+        self.stream.push_state()
+        self.stream.set_color_rgb(*CINZA_BORDA, stroke=True)
+        self.stream.set_line_width(2 * PT_POR_PX)
+        self.stream.set_dash([6 * PT_POR_PX, 6 * PT_POR_PX], 0)
+        self.stream.move_to(self.x, y)
+        self.stream.line_to(self.x + self.largura, y)
+        self.stream.stroke()
+        self.stream.pop_state()
+
+
+def contexto_etiqueta(etiqueta, empresa):
+    return {
+        'nome_responsavel': etiqueta.nome_responsavel or '',
+        'bloco': etiqueta.bloco or '',
+        'apartamento': etiqueta.apartamento or '',
+        'nome_empresa': empresa.nome_empresa or '',
+        'instagram': empresa.instagram or '',
+        'whatsapp': empresa.whatsapp or '',
+    }
+
+
+def renderizar_etiqueta(etiqueta):
+    """
+    Gera o PDF da etiqueta da portaria (A6) e retorna os bytes.
+    """
+    import pydyf
+
+    empresa = obter_empresa()
+    contexto = contexto_etiqueta(etiqueta, empresa)
+
+    pdf = pydyf.PDF()
+    fontes = pydyf.Dictionary()
+    for negrito, nome in FONTES.items():
+        fonte = pydyf.Dictionary({
+            'Type': '/Font', 'Subtype': '/Type1', 'Encoding': '/WinAnsiEncoding',
+            'BaseFont': '/Helvetica-Bold' if negrito else '/Helvetica',
+        })
+        pdf.add_object(fonte)
+        fontes[nome] = fonte.reference
+    recursos = pydyf.Dictionary({'Font': fontes, 'XObject': pydyf.Dictionary()})
+
+    stream = pydyf.Stream(compress=True)
+    pagina = _Pagina(stream)
+
+    # Cabeçalho: logo (ou nome da empresa) e linha tracejada
+    logo = arquivo_logo()
+    if logo:
+        imagem, proporcao = _adicionar_logo(pdf, logo)
+        largura = min(CAIXA_LOGO[0], CAIXA_LOGO[1] * proporcao)
+        altura = largura / proporcao
+        recursos['XObject']['Logo'] = imagem.reference
+        stream.push_state()
+        stream.set_matrix(largura, 0, 0, altura, pagina.x + (pagina.largura - largura) / 2, pagina.y - altura)
+        stream.draw_x_object('Logo')
+        stream.pop_state()
+        pagina.y -= altura
+    else:
+        pagina.bloco(Bloco('{nome_empresa}', 16, True, PRETO, True, 0), contexto)
+    pagina.y -= 10 * PT_POR_PX
+    pagina.tracejado(pagina.y - PT_POR_PX)
+    pagina.y -= 2 * PT_POR_PX + 15 * PT_POR_PX
+
+    layout = LAYOUTS['RETIRADA' if etiqueta.tipo_cliente == 'RETIRADA' else 'CONDOMINIO']
+    for bloco in layout:
+        pagina.bloco(bloco, contexto)
+
+    # Rodapé no fim do corpo (95% da altura útil)
+    base = ALTURA_A6 - MARGEM - ALTURA_CORPO * (ALTURA_A6 - 2 * MARGEM)
+    pagina.y = base + RODAPE.tamanho + RODAPE.tamanho * LINHA
+    pagina.bloco(RODAPE, contexto)
+    pagina.tracejado(base + 2 * RODAPE.tamanho + RODAPE.tamanho * LINHA + 10 * PT_POR_PX + PT_POR_PX)
+
+    pdf.add_object(stream)
+    pdf.add_page(pydyf.Dictionary({
+        'Type': '/Page', 'Parent': pdf.pages.reference,
+        'MediaBox': pydyf.Array([0, 0, LARGURA_A6, ALTURA_A6]),
+        'Contents': stream.reference, 'Resources': recursos,
+    }))
+    saida = io.BytesIO()
+    pdf.write(saida)
+    return saida.getvalue()
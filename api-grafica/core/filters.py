@@ -0,0 +1,17 @@
+import django_filters
+
+from .models import LancamentoFinanceiro
+
+
+class LancamentoFinanceiroFilter(django_filters.FilterSet):
+    """
+    Filtros de Contas a Pagar / Despesas Consolidadas.
+    Ex: ?data_inicio=2025-01-01&data_fim=2025-01-31&status=A PAGAR&categoria=Impostos
+    """
+    data_inicio = django_filters.DateFilter(field_name='data', lookup_expr='gte')
+    data_fim = django_filters.DateFilter(field_name='data', lookup_expr='lte')
+    categoria = django_filters.CharFilter(field_name='categoria', lookup_expr='iexact')
+
+    class Meta:
+        model = LancamentoFinanceiro
+        fields = ['status', 'origem', 'categoria']
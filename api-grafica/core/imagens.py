@@ -0,0 +1,160 @@
+import io
+import logging
+import os
+import threading
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.db import close_old_connections, transaction
+
+logger = logging.getLogger(__name__)
+
+
+# --- Derivados das artes (ArtePedido) ---
+# O original (até 50 MB) fica só para download. Depois do upload, um pool
+# de threads gera versões reduzidas, gravadas ao lado do original:
+#   miniatura  -> listas e admin
+#   previa     -> página pública de aprovação
+#   imagem_pdf -> embutida na OS de produção (WeasyPrint)
+# Artes sem derivados (ainda gerando, ou com erro) usam o original.
+# Para gerar os que faltam: python manage.py gerar_derivados_artes
+
+# campo: (maior lado em px, formato Pillow, extensão, opções do save)
+RENDICOES = {
+    'imagem_pdf': (1800, 'JPEG', 'jpg', {'quality': 85, 'optimize': True, 'progressive': True}),
+    'previa': (1600, 'WEBP', 'webp', {'quality': 80, 'method': 4}),
+    'miniatura': (320, 'JPEG', 'jpg', {'quality': 80, 'optimize': True}),
+}
+
+
+def _pil():
+    """
+    Pillow só é importado quando um derivado é gerado (ver core/pdf.py).
+    """
+    from PIL import Image, ImageOps
+    return Image, ImageOps
+
+
+def _abrir(arquivo):
+    Image, ImageOps = _pil()
+    maior = max(tamanho for tamanho, _, _, _ in RENDICOES.values())
+    imagem = Image.open(arquivo)
+    if imagem.format == 'JPEG':
+        # Decodifica o JPEG já reduzido (1/2, 1/4, 1/8): bem mais rápido em originais grandes
+        imagem.draft('RGB', (maior, maior))
+    imagem = ImageOps.exif_transpose(imagem)
+    imagem.load()
+    return imagem
+
+
+def _para_formato(imagem, formato):
+    Image, _ = _pil()
+    if formato == 'JPEG':
+        if imagem.mode in ('RGBA', 'LA', 'P'):
+            imagem = imagem.convert('RGBA')
+            fundo = Image.new('RGB', imagem.size, (255, 255, 255))
+            fundo.paste(imagem, mask=imagem.getchannel('A'))
+            return fundo
+        return imagem.convert('RGB') if imagem.mode != 'RGB' else imagem
+    if imagem.mode not in ('RGB', 'RGBA'):
+        return imagem.convert('RGBA' if 'A' in imagem.getbands() or imagem.mode == 'P' else 'RGB')
+    return imagem
+
+
+def renderizar(imagem, tamanho, formato, opcoes):
+    """
+    Reduz a imagem no lugar (sem ampliar) para caber em tamanho x tamanho
+    (ou na caixa (largura, altura)) e devolve os bytes no formato pedido.
+    """
+    Image, _ = _pil()
+    caixa = tamanho if isinstance(tamanho, tuple) else (tamanho, tamanho)
+    imagem.thumbnail(caixa, Image.LANCZOS)
+    saida = io.BytesIO()
+    _para_formato(imagem, formato).save(saida, formato, **opcoes)
+    return saida.getvalue()
+
+
+def gerar_derivados(arte_id):
+    """
+    Gera e grava os derivados de uma arte. Se o layout mudar no meio do
+    processo, descarta o resultado (o novo upload agenda outra geração).
+    Retorna True se gravou.
+    """
+    from .models import ArtePedido
+
+    arte = ArtePedido.objects.filter(pk=arte_id).first()
+    if arte is None or not arte.layout:
+        return False
+    nome_original = arte.layout.name
+    base = os.path.splitext(os.path.basename(nome_original))[0]
+
+    with arte.layout.open('rb') as arquivo:
+        imagem = _abrir(arquivo)
+
+    novos = {}
+    # Do maior para o menor: cada rendição parte da anterior, já reduzida
+    for campo, (tamanho, formato, extensao, opcoes) in RENDICOES.items():
+        conteudo = renderizar(imagem, tamanho, formato, opcoes)
+        field = ArtePedido._meta.get_field(campo)
+        nome = field.generate_filename(arte, f"{base}_{campo}.{extensao}")
+        novos[campo] = field.storage.save(nome, ContentFile(conteudo))
+
+    antigos = [getattr(arte, campo).name for campo in RENDICOES if getattr(arte, campo)]
+    gravou = ArtePedido.objects.filter(pk=arte_id, layout=nome_original).update(**novos)
+    remover_arquivos(list(novos.values()) if not gravou else antigos)
+    return bool(gravou)
+
+
+def remover_arquivos(nomes):
+    from .models import ArtePedido
+
+    storage = ArtePedido._meta.get_field('miniatura').storage
+    for nome in nomes:
+        if nome:
+            storage.delete(nome)
+
+
+# --- Execução em segundo plano ---
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                from concurrent.futures import ThreadPoolExecutor
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.ARTES_DERIVADOS_WORKERS,
+                    thread_name_prefix='derivados'
+                )
+    return _executor
+
+
+def _gerar_com_log(arte_id):
+    # Falhar aqui não pode afetar o upload: a arte segue com o original
+    try:
+        gerar_derivados(arte_id)
+    except Exception:
+        logger.exception("Falha ao gerar os derivados da arte #%s", arte_id)
+
+
+def _executar_na_thread(arte_id):
+    close_old_connections()
+    try:
+        _gerar_com_log(arte_id)
+    finally:
+        close_old_connections()
+
+
+def agendar_derivados(arte_id):
+    """
+    Agenda a geração para depois do commit (a thread usa outra conexão e
+    precisa enxergar a arte). Com ARTES_DERIVADOS_WORKERS = 0 gera na hora.
+    """
+    if settings.ARTES_DERIVADOS_WORKERS <= 0:
+        transaction.on_commit(lambda: _gerar_com_log(arte_id))
+    else:
+        transaction.on_commit(lambda: _get_executor().submit(_executar_na_thread, arte_id))
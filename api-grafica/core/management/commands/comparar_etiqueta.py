@@ -0,0 +1,109 @@
+# api-grafica/core/management/commands/comparar_etiqueta.py
+
+import os
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from core.documentos import html_documento
+from core.etiquetas import renderizar_etiqueta
+from core.models import EtiquetaPortaria
+from core.pdf import gerar_pdf, precarregar
+
+
+def _etiquetas_exemplo(pk):
+    if pk:
+        etiqueta = EtiquetaPortaria.objects.filter(pk=pk).first()
+        if etiqueta is None:
+            raise CommandError(f'Etiqueta #{pk} não encontrada.')
+        return [etiqueta]
+    # Sem --id: uma etiqueta de cada tipo, sem gravar no banco
+    return [
+        EtiquetaPortaria(tipo_cliente='CONDOMINIO', nome_responsavel='Maria da Conceição',
+                         bloco='12', apartamento='304'),
+        EtiquetaPortaria(tipo_cliente='RETIRADA', nome_responsavel='João Antônio'),
+    ]
+
+
+def _rasterizar(pdf, dpi):
+    import pypdfium2
+
+    documento = pypdfium2.PdfDocument(pdf)
+    try:
+        return documento[0].render(scale=dpi / 72).to_pil().convert('L')
+    finally:
+        documento.close()
+
+
+def _diferenca(pdf_html, pdf_direto, dpi, destino):
+    """
+    Percentual de pixels que diferem entre as duas versões. Salva a imagem
+    da diferença em destino, se informado.
+    """
+    from PIL import ImageChops
+
+    diferenca = ImageChops.difference(_rasterizar(pdf_html, dpi), _rasterizar(pdf_direto, dpi))
+    # Antialiasing diferente não conta: só diferenças de mais de 25%
+    mascara = diferenca.point(lambda valor: 255 if valor > 64 else 0)
+    histograma = mascara.histogram()
+    if destino:
+        mascara.save(destino)
+    return histograma[255] / sum(histograma) * 100
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara a etiqueta da portaria desenhada direto (core/etiquetas.py) com a versão HTML '
+        '(WeasyPrint): tempo de geração, tamanho e, com o pypdfium2 instalado, a diferença visual.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--id', type=int, help='Etiqueta a usar. Sem ele, usa uma de cada tipo.')
+        parser.add_argument('--repeticoes', type=int, default=5, help='Quantas vezes gerar cada PDF (usa a mediana).')
+        parser.add_argument('--dpi', type=int, default=100, help='Resolução da comparação visual.')
+        parser.add_argument('--saida', help='Pasta para salvar os PDFs e as imagens de diferença.')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        precarregar()
+        saida = options['saida']
+        if saida:
+            os.makedirs(saida, exist_ok=True)
+        try:
+            import pypdfium2  # noqa: F401
+            comparar = True
+        except ImportError:
+            comparar = False
+            self.stderr.write('pypdfium2 não instalado: comparação visual desativada.')
+
+        self.stdout.write(
+            f"{'etiqueta':<12}{'HTML':>10}{'direto':>10}{'tempo HTML':>12}{'tempo direto':>14}{'diferença':>11}"
+        )
+        for etiqueta in _etiquetas_exemplo(options['id']):
+            resultado = {}
+            for nome, gerar in (
+                ('html', lambda: gerar_pdf(html_documento('etiqueta', etiqueta, request))),
+                ('direto', lambda: renderizar_etiqueta(etiqueta)),
+            ):
+                tempos = []
+                for _ in range(options['repeticoes']):
+                    inicio = time.perf_counter()
+                    pdf = gerar()
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                resultado[nome] = (pdf, statistics.median(tempos))
+
+            (pdf_html, ms_html), (pdf_direto, ms_direto) = resultado['html'], resultado['direto']
+            rotulo = f'#{etiqueta.pk}' if etiqueta.pk else etiqueta.tipo_cliente.lower()
+            diferenca = '-'
+            if saida:
+                for nome, pdf in (('html', pdf_html), ('direto', pdf_direto)):
+                    with open(os.path.join(saida, f'etiqueta_{rotulo.strip("#")}_{nome}.pdf'), 'wb') as arquivo:
+                        arquivo.write(pdf)
+            if comparar:
+                destino = os.path.join(saida, f'etiqueta_{rotulo.strip("#")}_diferenca.png') if saida else None
+                diferenca = f'{_diferenca(pdf_html, pdf_direto, options["dpi"], destino):.1f}%'
+            self.stdout.write(
+                f'{rotulo:<12}{len(pdf_html) / 1024:>8.1f}KB{len(pdf_direto) / 1024:>8.1f}KB'
+                f'{ms_html:>10.1f}ms{ms_direto:>12.1f}ms{diferenca:>11}'
+            )
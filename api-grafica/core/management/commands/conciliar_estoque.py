@@ -0,0 +1,58 @@
+# api-grafica/core/management/commands/conciliar_estoque.py
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Coalesce
+from core.models import Produto
+from core.estoque import anotar_saldo_livro
+
+
+class Command(BaseCommand):
+    help = (
+        'Confere o estoque_atual de cada produto com o saldo pelo livro de estoque '
+        '(última foto + movimentações). Com --corrigir, grava o saldo do livro no produto.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Produtos por consulta (padrão: 500).')
+        parser.add_argument(
+            '--corrigir', action='store_true',
+            help='Substitui o estoque_atual divergente pelo saldo do livro.'
+        )
+
+    def handle(self, *args, **options):
+        divergentes = []
+        ultimo_id = 0
+        while True:
+            ids = list(
+                Produto.objects.filter(id__gt=ultimo_id).order_by('id')
+                .values_list('id', flat=True)[:options['lote']]
+            )
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+
+            with transaction.atomic():
+                produtos = Produto.objects.filter(id__in=ids)
+                if options['corrigir']:
+                    # Trava o lote: pedidos salvos no meio não alteram o saldo comparado
+                    list(produtos.select_for_update().values_list('id', flat=True))
+                lote = anotar_saldo_livro(produtos).annotate(
+                    estoque=Coalesce(F('estoque_atual'), Value(0))
+                ).exclude(estoque=F('saldo_livro')).values_list('id', 'nome', 'estoque_atual', 'saldo_livro')
+
+                for produto_id, nome, estoque, saldo in lote:
+                    divergentes.append(produto_id)
+                    self.stdout.write(f'Produto #{produto_id} ({nome}): estoque_atual={estoque}, livro={saldo}')
+                    if options['corrigir']:
+                        Produto.objects.filter(id=produto_id).update(estoque_atual=saldo)
+
+        if not divergentes:
+            self.stdout.write(self.style.SUCCESS('Estoque conciliado: nenhum produto divergente.'))
+        elif options['corrigir']:
+            self.stdout.write(self.style.SUCCESS(f'{len(divergentes)} produto(s) corrigido(s) pelo livro.'))
+        else:
+            raise CommandError(
+                f'{len(divergentes)} produto(s) com estoque divergente do livro. Use --corrigir para ajustar.'
+            )
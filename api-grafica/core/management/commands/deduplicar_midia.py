@@ -0,0 +1,89 @@
+# api-grafica/core/management/commands/deduplicar_midia.py
+
+import os
+import shutil
+
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from django.db.models import FileField
+from core.armazenamento import PASTA_CONTEUDO, ConteudoMixin, armazenamento_remoto, nome_por_conteudo
+from core.empresa import invalidar_empresa
+from core.uploads import sha256_arquivo
+
+
+def campos_deduplicados():
+    for model in apps.get_app_config('core').get_models():
+        for field in model._meta.fields:
+            if isinstance(field, FileField) and isinstance(field.storage, ConteudoMixin):
+                yield model, field
+
+
+class Command(BaseCommand):
+    help = (
+        'Move a mídia antiga (logos/, profile_pics/, artes/derivados/) para o armazenamento por '
+        'conteúdo, no próprio MEDIA_ROOT: arquivos iguais passam a ser um só e os registros são '
+        'atualizados. Pode ser executado de novo se for interrompido.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--dry-run', action='store_true', help='Só mostra quanto seria economizado.')
+
+    def handle(self, *args, **options):
+        if armazenamento_remoto():
+            raise CommandError('deduplicar_midia trabalha no MEDIA_ROOT local (MEDIA_STORAGE=local).')
+        dry_run = options['dry_run']
+        mapa = {}          # nome antigo -> nome por conteúdo
+        antigos = set()    # removidos só no final: outro registro pode usar o mesmo arquivo
+        conteudos = set()
+        migrados, faltando, economia = 0, 0, 0
+
+        for model, field in campos_deduplicados():
+            storage = field.storage
+            registros = (
+                model.objects.exclude(**{field.name: ''})
+                .exclude(**{f'{field.name}__isnull': True})
+                .exclude(**{f'{field.name}__startswith': f'{PASTA_CONTEUDO}/'})
+                .order_by('pk').values_list('pk', field.name)
+            )
+            for pk, antigo in registros.iterator():
+                if antigo not in mapa:
+                    caminho = storage.path(antigo)
+                    if not os.path.exists(caminho):
+                        faltando += 1
+                        self.stderr.write(f'{model.__name__} #{pk}: {antigo} não existe no disco.')
+                        continue
+                    sha256 = sha256_arquivo(caminho)
+                    novo = nome_por_conteudo(sha256, antigo)
+                    tamanho = os.path.getsize(caminho)
+                    if sha256 in conteudos or storage.exists(novo):
+                        economia += tamanho
+                    elif not dry_run:
+                        destino = storage.path(novo)
+                        os.makedirs(os.path.dirname(destino), exist_ok=True)
+                        try:
+                            os.link(caminho, destino)  # mesmo disco: não copia os bytes
+                        except OSError:
+                            shutil.copy2(caminho, destino)
+                    conteudos.add(sha256)
+                    mapa[antigo] = (novo, sha256, tamanho)
+                    antigos.add(caminho)
+
+                novo, sha256, tamanho = mapa[antigo]
+                if not dry_run:
+                    with transaction.atomic():
+                        model.objects.filter(pk=pk).update(**{field.name: novo})
+                        storage.adicionar_referencia(novo, sha256, tamanho)
+                migrados += 1
+
+        if not dry_run:
+            for caminho in antigos:
+                if os.path.exists(caminho):
+                    os.remove(caminho)
+            invalidar_empresa()
+
+        prefixo = '[dry-run] ' if dry_run else ''
+        self.stdout.write(self.style.SUCCESS(
+            f'{prefixo}{migrados} registro(s), {len(mapa)} arquivo(s) antigo(s) -> {len(conteudos)} '
+            f'por conteúdo; {economia / (1024 * 1024):.1f} MB de duplicatas. {faltando} arquivo(s) faltando.'
+        ))
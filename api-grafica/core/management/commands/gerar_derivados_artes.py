@@ -0,0 +1,36 @@
+# api-grafica/core/management/commands/gerar_derivados_artes.py
+
+from django.core.management.base import BaseCommand
+from django.db.models import Q
+from core.models import ArtePedido
+from core.imagens import RENDICOES, gerar_derivados
+
+
+class Command(BaseCommand):
+    help = (
+        'Gera miniatura, prévia e imagem do PDF das artes que ainda não têm (uploads antigos ou '
+        'geração que falhou). Com --todas, refaz os derivados de todas as artes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--todas', action='store_true', help='Refaz os derivados de todas as artes.')
+
+    def handle(self, *args, **options):
+        artes = ArtePedido.objects.exclude(layout='')
+        if not options['todas']:
+            faltando = Q()
+            for campo in RENDICOES:
+                faltando |= Q(**{f'{campo}__isnull': True}) | Q(**{campo: ''})
+            artes = artes.filter(faltando)
+
+        geradas, erros = 0, 0
+        for arte_id in artes.order_by('id').values_list('id', flat=True).iterator():
+            try:
+                if gerar_derivados(arte_id):
+                    geradas += 1
+            except Exception as e:
+                erros += 1
+                self.stderr.write(f'Arte #{arte_id}: {e}')
+
+        estilo = self.style.SUCCESS if not erros else self.style.WARNING
+        self.stdout.write(estilo(f'{geradas} arte(s) processada(s), {erros} com erro.'))
@@ -0,0 +1,52 @@
+# api-grafica/core/management/commands/gerar_saldos_estoque.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Exists, OuterRef
+from core.models import Produto, MovimentacaoEstoque, SaldoEstoque
+from core.estoque import ultima_movimentacao_estavel, anotar_saldo_livro
+
+
+class Command(BaseCommand):
+    help = (
+        'Grava uma foto do saldo (SaldoEstoque) de cada produto que teve movimentações '
+        'desde a última foto. Rodar periodicamente (ex: cron diário) para que o saldo '
+        'pelo livro não precise somar o histórico inteiro.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--lote', type=int, default=500, help='Produtos por consulta (padrão: 500).')
+
+    def handle(self, *args, **options):
+        ate = ultima_movimentacao_estavel()
+        if not ate:
+            self.stdout.write('Nenhuma movimentação de estoque para fotografar.')
+            return
+
+        total = 0
+        ultimo_id = 0
+        while True:
+            ids = list(
+                Produto.objects.filter(id__gt=ultimo_id).order_by('id')
+                .values_list('id', flat=True)[:options['lote']]
+            )
+            if not ids:
+                break
+            ultimo_id = ids[-1]
+
+            produtos = anotar_saldo_livro(Produto.objects.filter(id__in=ids), ate_movimentacao=ate)
+            novas = MovimentacaoEstoque.objects.filter(
+                produto=OuterRef('pk'), id__gt=OuterRef('foto_movimentacao'), id__lte=ate
+            )
+            saldos = produtos.filter(Exists(novas)).values_list('id', 'saldo_livro')
+            fotos = [
+                SaldoEstoque(produto_id=produto_id, quantidade=saldo, ultima_movimentacao_id=ate)
+                for produto_id, saldo in saldos
+            ]
+            with transaction.atomic():
+                SaldoEstoque.objects.bulk_create(fotos)
+            total += len(fotos)
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{total} saldo(s) gravado(s) até a movimentação #{ate}.'
+        ))
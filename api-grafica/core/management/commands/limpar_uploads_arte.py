@@ -0,0 +1,52 @@
+# api-grafica/core/management/commands/limpar_uploads_arte.py
+
+import datetime
+import os
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+from core.models import UploadArte
+from core.pdf import limpar_imagens_pdf
+from core.uploads import cancelar_upload
+
+
+class Command(BaseCommand):
+    help = (
+        'Apaga os uploads de arte em partes abandonados (sem novas partes há mais de '
+        'UPLOADS_ARTE_EXPIRACAO_HORAS), arquivos temporários sem upload correspondente e as '
+        'imagens reduzidas dos PDFs (PDF_IMAGENS_DIR) sem uso há PDF_IMAGENS_EXPIRACAO_DIAS.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--horas', type=int, default=settings.UPLOADS_ARTE_EXPIRACAO_HORAS,
+            help='Idade mínima (sem atividade) para apagar.'
+        )
+        parser.add_argument(
+            '--dias-imagens-pdf', type=int, default=settings.PDF_IMAGENS_EXPIRACAO_DIAS,
+            help='Dias sem uso para apagar uma imagem de PDF_IMAGENS_DIR.'
+        )
+
+    def handle(self, *args, **options):
+        limite = timezone.now() - datetime.timedelta(hours=options['horas'])
+        abandonados = list(UploadArte.objects.filter(atualizado_em__lt=limite))
+        for upload in abandonados:
+            cancelar_upload(upload)
+
+        orfaos = 0
+        pasta = settings.UPLOADS_ARTE_DIR
+        if os.path.isdir(pasta):
+            ativos = {f'{pk}.part' for pk in UploadArte.objects.values_list('pk', flat=True)}
+            for nome in os.listdir(pasta):
+                caminho = os.path.join(pasta, nome)
+                if nome not in ativos and os.path.getmtime(caminho) < limite.timestamp():
+                    os.remove(caminho)
+                    orfaos += 1
+
+        imagens_pdf = limpar_imagens_pdf(options['dias_imagens_pdf'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{len(abandonados)} upload(s) abandonado(s), {orfaos} arquivo(s) órfão(s) e '
+            f'{imagens_pdf} imagem(ns) de PDF removidos.'
+        ))
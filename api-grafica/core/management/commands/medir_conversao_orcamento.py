@@ -0,0 +1,94 @@
+# api-grafica/core/management/commands/medir_conversao_orcamento.py
+
+import statistics
+import time
+from decimal import Decimal
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from core.models import Cliente, Produto, Orcamento, ItemOrcamento, Pedido, ItemPedido
+
+
+class _Desfazer(Exception):
+    pass
+
+
+def _converter_item_a_item(orcamento):
+    # Caminho anterior de Orcamento.gerar_pedido (um create por item, signals por linha),
+    # mantido só como referência de comparação
+    pedido = Pedido.objects.create(
+        cliente=orcamento.cliente, orcamento_origem=orcamento, valor_total=0,
+        status_producao='Aguardando', status_pagamento=Pedido.StatusPagamento.PENDENTE,
+        data_criacao=timezone.now()
+    )
+    for io in orcamento.itens.all():
+        ItemPedido.objects.create(
+            pedido=pedido, produto=io.produto if io.produto_id else None, quantidade=io.quantidade,
+            largura=io.largura, altura=io.altura, descricao_customizada=io.descricao_customizada,
+            subtotal=io.subtotal
+        )
+    pedido.valor_total = orcamento.valor_total
+    pedido.save(update_fields=['valor_total'])
+    return pedido
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede a conversão de orçamento em pedido (tempo e número de consultas) para orçamentos '
+        'de 1, 50 e 500 linhas. Tudo roda numa transação desfeita no final: não grava nada no banco.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--linhas', type=int, nargs='+', default=[1, 50, 500], help='Tamanhos de orçamento a medir.')
+        parser.add_argument('--repeticoes', type=int, default=3, help='Quantas vezes medir cada tamanho (usa a mediana).')
+        parser.add_argument('--produtos', type=int, default=20, help='Produtos distintos usados nas linhas.')
+        parser.add_argument(
+            '--comparar', action='store_true',
+            help='Mede também a conversão item a item (caminho anterior) para comparação.'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with transaction.atomic():
+                self._medir(options)
+                raise _Desfazer()
+        except _Desfazer:
+            pass
+
+    def _medir(self, options):
+        cliente = Cliente.objects.create(nome='Benchmark conversão')
+        produtos = [
+            Produto.objects.create(
+                nome=f'Benchmark {i}', preco=Decimal('10.00'), custo=Decimal('4.00'), estoque_atual=1_000_000
+            )
+            for i in range(options['produtos'])
+        ]
+
+        metodos = [('lote', lambda orcamento: orcamento.gerar_pedido())]
+        if options['comparar']:
+            metodos.append(('item a item', _converter_item_a_item))
+
+        self.stdout.write(f"{'linhas':>7}  {'método':<12} {'mediana':>10} {'consultas':>10}")
+        for linhas in options['linhas']:
+            for nome, converter in metodos:
+                tempos, consultas = [], []
+                for _ in range(options['repeticoes']):
+                    orcamento = Orcamento.objects.create(cliente=cliente)
+                    ItemOrcamento.objects.bulk_create([
+                        ItemOrcamento(
+                            orcamento=orcamento, produto=produtos[i % len(produtos)],
+                            quantidade=2, subtotal=Decimal('20.00')
+                        )
+                        for i in range(linhas)
+                    ])
+                    orcamento.recalcular_total()
+                    with CaptureQueriesContext(connection) as capturadas:
+                        inicio = time.perf_counter()
+                        converter(orcamento)
+                        tempos.append(time.perf_counter() - inicio)
+                    consultas.append(len(capturadas))
+                self.stdout.write(
+                    f"{linhas:>7}  {nome:<12} {statistics.median(tempos) * 1000:>7.1f} ms {max(consultas):>10}"
+                )
@@ -0,0 +1,98 @@
+# api-grafica/core/management/commands/medir_inicializacao.py
+
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Executado num processo Python novo, para medir a importação "a frio".
+# app.urls importa core.urls -> core.views: é o que todo worker carrega.
+SCRIPT_MEDICAO = """
+import json, sys, time
+t0 = time.perf_counter()
+import django
+django.setup()
+t1 = time.perf_counter()
+import core.views
+t2 = time.perf_counter()
+import app.urls
+t3 = time.perf_counter()
+print(json.dumps({
+    'django_setup': t1 - t0, 'core_views': t2 - t1, 'urls': t3 - t2, 'total': t3 - t0,
+    'modulos': sorted(sys.modules),
+}))
+"""
+
+# Módulos pesados que só devem ser carregados sob demanda (ver core/pdf.py e core/cnpj.py).
+# 'requests' não entra na lista: o próprio rest_framework.compat o importa se instalado.
+MODULOS_SOB_DEMANDA = ['weasyprint', 'httpx']
+
+# Linha do -X importtime: "import time:   self [us] | cumulative | imported package"
+REGEX_IMPORTTIME = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+class Command(BaseCommand):
+    help = (
+        'Mede o tempo de inicialização da API (django.setup, core.views e URLs) em processos novos, '
+        'lista as importações mais lentas (python -X importtime) e falha se passar do limite.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--repeticoes', type=int, default=5, help='Quantas vezes medir (usa a mediana).')
+        parser.add_argument('--top', type=int, default=15, help='Quantas importações mais lentas listar.')
+        parser.add_argument(
+            '--limite-ms', type=float, default=None,
+            help='Falha (código de saída 1) se a mediana do tempo total passar deste valor.'
+        )
+
+    def _executar(self, *opcoes_python):
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=os.environ.get('DJANGO_SETTINGS_MODULE', 'app.settings'))
+        return subprocess.run(
+            [sys.executable, *opcoes_python, '-c', SCRIPT_MEDICAO],
+            cwd=settings.BASE_DIR, env=env, capture_output=True, text=True, check=True
+        )
+
+    def handle(self, *args, **options):
+        medicoes = []
+        for _ in range(options['repeticoes']):
+            resultado = self._executar()
+            medicoes.append(json.loads(resultado.stdout.strip().splitlines()[-1]))
+
+        for etapa in ('django_setup', 'core_views', 'urls', 'total'):
+            tempos = [m[etapa] for m in medicoes]
+            self.stdout.write(
+                f"{etapa:<14} mediana {statistics.median(tempos) * 1000:8.1f} ms"
+                f"   mín {min(tempos) * 1000:8.1f} ms   máx {max(tempos) * 1000:8.1f} ms"
+            )
+
+        # --- Importações mais lentas (tempo acumulado, só módulos de primeiro nível) ---
+        resultado = self._executar('-X', 'importtime')
+        importacoes = []
+        for linha in resultado.stderr.splitlines():
+            match = REGEX_IMPORTTIME.match(linha)
+            if match and len(match.group(3)) <= 1:
+                importacoes.append((int(match.group(2)), match.group(4)))
+        importacoes.sort(reverse=True)
+
+        self.stdout.write("\nImportações mais lentas (acumulado):")
+        for acumulado, modulo in importacoes[:options['top']]:
+            self.stdout.write(f"  {acumulado / 1000:8.1f} ms  {modulo}")
+
+        erros = []
+        carregados = set(medicoes[-1]['modulos'])
+        indevidos = [m for m in MODULOS_SOB_DEMANDA if m in carregados]
+        if indevidos:
+            erros.append(f"Módulos que deveriam ser carregados sob demanda foram importados no boot: {', '.join(indevidos)}")
+
+        total_ms = statistics.median(m['total'] for m in medicoes) * 1000
+        if options['limite_ms'] is not None and total_ms > options['limite_ms']:
+            erros.append(f"Inicialização levou {total_ms:.1f} ms (limite: {options['limite_ms']:.1f} ms).")
+
+        if erros:
+            raise CommandError('\n'.join(erros))
+        self.stdout.write(self.style.SUCCESS(f"\nInicialização OK ({total_ms:.1f} ms)."))
@@ -0,0 +1,73 @@
+# api-grafica/core/management/commands/medir_pdfs.py
+
+import statistics
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test import RequestFactory
+from core.documentos import DOCUMENTOS, html_documento
+from core.pdf import gerar_pdf, precarregar
+
+
+def _objeto_exemplo(nome, documento, pk):
+    if pk:
+        return documento.modelo.objects.filter(pk=pk).first()
+    objetos = documento.modelo.objects.order_by('-pk')
+    if nome == 'producao':
+        # O caso pesado: pedido com arte aprovada
+        com_arte = objetos.filter(status_arte='APROVADO', artes__isnull=False).distinct().first()
+        if com_arte:
+            return com_arte
+    return objetos.first()
+
+
+class Command(BaseCommand):
+    help = (
+        'Compara tamanho e tempo de geração dos PDFs (orçamento, OS, OS de produção e etiqueta) '
+        'sem e com a otimização de imagens/fontes (core/pdf.py). Usa o registro mais recente de '
+        'cada tipo, ou o --id informado.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--documentos', nargs='+', choices=list(DOCUMENTOS), default=list(DOCUMENTOS),
+            help='Documentos a medir.'
+        )
+        parser.add_argument('--id', type=int, help='Registro a usar (mesmo id para todos os documentos).')
+        parser.add_argument('--repeticoes', type=int, default=3, help='Quantas vezes gerar cada PDF (usa a mediana).')
+
+    def handle(self, *args, **options):
+        request = RequestFactory().get('/')
+        precarregar()  # a importação do WeasyPrint não entra na primeira medida
+        self.stdout.write(
+            f"{'documento':<12}{'PDF antes':>12}{'PDF depois':>12}{'variação':>10}"
+            f"{'tempo antes':>13}{'tempo depois':>13}"
+        )
+        medidos = 0
+        for nome in options['documentos']:
+            documento = DOCUMENTOS[nome]
+            objeto = _objeto_exemplo(nome, documento, options['id'])
+            if objeto is None:
+                self.stderr.write(f'{nome}: nenhum {documento.modelo.__name__} para medir.')
+                continue
+
+            resultado = {}
+            for otimizar in (False, True):
+                tempos = []
+                for _ in range(options['repeticoes']):
+                    inicio = time.perf_counter()
+                    # O contexto entra na medida: inclui preparar as imagens
+                    pdf = gerar_pdf(html_documento(nome, objeto, request, otimizar), otimizar)
+                    tempos.append((time.perf_counter() - inicio) * 1000)
+                resultado[otimizar] = (len(pdf), statistics.median(tempos))
+
+            (antes, ms_antes), (depois, ms_depois) = resultado[False], resultado[True]
+            reducao = (1 - depois / antes) * 100 if antes else 0
+            self.stdout.write(
+                f'{nome:<12}{antes / 1024:>10.1f}KB{depois / 1024:>10.1f}KB{-reducao:>9.0f}%'
+                f'{ms_antes:>11.0f}ms{ms_depois:>11.0f}ms'
+            )
+            medidos += 1
+
+        if not medidos:
+            raise CommandError('Nenhum documento medido: cadastre orçamentos/pedidos/etiquetas primeiro.')
@@ -0,0 +1,17 @@
+# api-grafica/core/management/commands/recalcular_vendas_produto.py
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.vendas import reconstruir_vendas_produto
+
+
+class Command(BaseCommand):
+    help = (
+        'Reconstrói o resumo mensal de vendas por produto (VendaProdutoMensal) a partir '
+        'de todos os itens de pedidos e orçamentos. Use após importações ou correções manuais no banco.'
+    )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            total = reconstruir_vendas_produto()
+        self.stdout.write(self.style.SUCCESS(f'Resumo de vendas recalculado: {total} linhas (produto/mês).'))
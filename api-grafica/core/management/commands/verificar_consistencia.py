@@ -0,0 +1,82 @@
+# api-grafica/core/management/commands/verificar_consistencia.py
+
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from core.consistencia import VERIFICACOES, faixas_de_id, verificar_faixa
+
+
+def _executar_no_worker(nome, inicio, fim, chunk_size, corrigir, exemplos):
+    try:
+        return verificar_faixa(nome, inicio, fim, chunk_size, corrigir, exemplos)
+    finally:
+        connections.close_all()
+
+
+class Command(BaseCommand):
+    help = (
+        'Confere os valores calculados por signals (totais de orçamentos e pedidos, custo de produção, '
+        'status de pagamento e estoque) recalculando-os em SQL, lote a lote. '
+        'Com --corrigir, grava os valores recalculados nas linhas divergentes.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verificar', nargs='+', choices=sorted(VERIFICACOES), default=list(VERIFICACOES),
+            help='Quais verificações rodar (padrão: todas).'
+        )
+        parser.add_argument('--chunk-size', type=int, default=2000, help='Linhas por lote (padrão: 2000).')
+        parser.add_argument(
+            '--workers', type=int, default=1,
+            help='Processos paralelos; cada tabela é dividida em faixas de id (padrão: 1).'
+        )
+        parser.add_argument('--corrigir', action='store_true', help='Corrige as divergências encontradas.')
+        parser.add_argument('--exemplos', type=int, default=10, help='Divergências listadas por verificação.')
+
+    def handle(self, *args, **options):
+        if options['chunk_size'] < 1 or options['workers'] < 1:
+            raise CommandError('--chunk-size e --workers devem ser maiores que zero.')
+
+        tarefas = []
+        for nome in options['verificar']:
+            if options['workers'] > 1:
+                faixas = faixas_de_id(VERIFICACOES[nome].modelo, options['workers'])
+            else:
+                faixas = [(None, None)]
+            tarefas += [
+                (nome, inicio, fim, options['chunk_size'], options['corrigir'], options['exemplos'])
+                for inicio, fim in faixas
+            ]
+
+        if options['workers'] > 1:
+            # Os processos filhos (fork) abrem conexões próprias: não podem herdar as do pai
+            connections.close_all()
+            contexto = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=options['workers'], mp_context=contexto) as executor:
+                parciais = list(executor.map(_executar_no_worker, *zip(*tarefas)))
+        else:
+            parciais = [verificar_faixa(*tarefa) for tarefa in tarefas]
+
+        total_divergentes = 0
+        for nome in options['verificar']:
+            resultados = [r for r in parciais if r['verificacao'] == nome]
+            verificados = sum(r['verificados'] for r in resultados)
+            divergentes = sum(r['divergentes'] for r in resultados)
+            corrigidos = sum(r['corrigidos'] for r in resultados)
+            exemplos = [e for r in resultados for e in r['exemplos']][:options['exemplos']]
+            total_divergentes += divergentes
+
+            linha = f"{nome} ({VERIFICACOES[nome].descricao}): {verificados} verificados, {divergentes} divergentes"
+            if options['corrigir']:
+                linha += f", {corrigidos} corrigidos"
+            estilo = self.style.SUCCESS if not divergentes else self.style.WARNING
+            self.stdout.write(estilo(linha))
+            for exemplo in exemplos:
+                self.stdout.write(f"  #{exemplo['id']}: atual={exemplo['atual']}, esperado={exemplo['esperado']}")
+
+        if total_divergentes and not options['corrigir']:
+            raise CommandError(
+                f'{total_divergentes} valor(es) divergente(s). Use --corrigir para recalcular.'
+            )
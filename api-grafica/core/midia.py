@@ -0,0 +1,82 @@
+import mimetypes
+import posixpath
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.db.models import Q
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseRedirect
+from django.utils._os import safe_join
+
+from .armazenamento import PASTA_CONTEUDO, armazenamento_midia, armazenamento_remoto
+from .empresa import obter_empresa
+from .models import ArtePedido
+
+CAMPOS_LOGO = ('logo_grande_dashboard', 'logo_pequena_dashboard', 'logo_orcamento_pdf')
+CAMPOS_ARTE = ('layout', 'miniatura', 'previa', 'imagem_pdf')
+
+CACHE_IMUTAVEL = 60 * 60 * 24 * 365  # conteudo/<sha256>: o nome muda se o conteúdo mudar
+CACHE_MUTAVEL = 60 * 5
+
+
+# --- Entrega de mídia (/media/) ---
+# O Django só confere a permissão; os bytes saem do nginx, via
+# X-Accel-Redirect para a location interna MEDIA_ACCEL_REDIRECT (ver
+# nginx.conf). Sem essa configuração (desenvolvimento), o próprio Django
+# serve o arquivo; com MEDIA_STORAGE = 's3', redireciona para o bucket.
+# Quem pode ver:
+#   - logos da Empresa: qualquer um (tela de login, aprovação pública)
+#   - usuário autenticado (JWT no header/cookie, ou sessão do admin): tudo
+#   - ?token=<token_aprovacao>: as artes daquele pedido
+
+def normalizar_nome(nome):
+    nome = posixpath.normpath(nome).lstrip('/')
+    if nome.startswith('..') or nome in ('', '.'):
+        raise Http404
+    return nome
+
+
+def arquivo_publico(nome):
+    empresa = obter_empresa()
+    return any(getattr(empresa, campo).name == nome for campo in CAMPOS_LOGO)
+
+
+def arte_do_token(nome, token):
+    filtro = Q()
+    for campo in CAMPOS_ARTE:
+        filtro |= Q(**{campo: nome})
+    try:
+        return ArtePedido.objects.filter(filtro, pedido__token_aprovacao=token).exists()
+    except ValidationError:
+        # Token que não é um UUID válido
+        return False
+
+
+def resposta_midia(nome, publico=False):
+    """
+    Resposta que entrega o arquivo (redirect para o bucket, X-Accel-Redirect
+    ou FileResponse), com cache longo para nomes endereçados por conteúdo.
+    """
+    prefixo = settings.MEDIA_ACCEL_REDIRECT
+    if armazenamento_remoto():
+        # Links antigos para /media/: redireciona para a URL pré-assinada do
+        # bucket (cache curto, a assinatura expira)
+        response = HttpResponseRedirect(armazenamento_midia().url(nome))
+        response['Cache-Control'] = f'private, max-age={CACHE_MUTAVEL}'
+        return response
+    if prefixo:
+        response = HttpResponse()
+        response['X-Accel-Redirect'] = prefixo.rstrip('/') + '/' + nome
+        # O nginx mantém o Content-Type e o Cache-Control desta resposta
+        response['Content-Type'] = mimetypes.guess_type(nome)[0] or 'application/octet-stream'
+    else:
+        try:
+            response = FileResponse(open(safe_join(settings.MEDIA_ROOT, nome), 'rb'))
+        except (FileNotFoundError, IsADirectoryError):
+            raise Http404
+
+    visibilidade = 'public' if publico else 'private'
+    if nome.startswith(f'{PASTA_CONTEUDO}/'):
+        response['Cache-Control'] = f'{visibilidade}, max-age={CACHE_IMUTAVEL}, immutable'
+    else:
+        response['Cache-Control'] = f'{visibilidade}, max-age={CACHE_MUTAVEL}'
+    return response
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0017_alter_despesa_options_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='profile',
+            name='versao_token',
+            field=models.PositiveIntegerField(default=0, help_text='Incrementada para revogar todos os tokens JWT já emitidos para o usuário'),
+        ),
+    ]
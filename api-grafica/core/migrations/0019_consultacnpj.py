@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:22
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0018_profile_versao_token'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ConsultaCNPJ',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('cnpj', models.CharField(help_text='Somente dígitos', max_length=14, unique=True)),
+                ('status_code', models.PositiveSmallIntegerField(help_text='Status HTTP devolvido pela API (200 ou 404)')),
+                ('dados', models.JSONField(blank=True, null=True)),
+                ('data_consulta', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Consulta de CNPJ',
+                'verbose_name_plural': 'Consultas de CNPJ',
+            },
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:28
+
+from django.db import migrations, models
+
+# A view é criada no post_migrate, com o SQL de core/views_sql.py (e
+# removida antes de cada migrate, para não travar as tabelas de origem).
+SQL_REMOVER_VIEW = "DROP VIEW IF EXISTS core_lancamentofinanceiro"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0019_consultacnpj'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LancamentoFinanceiro',
+            fields=[
+                ('chave', models.CharField(help_text='Ex: d_10, c_5, p_42', max_length=30, primary_key=True, serialize=False)),
+                ('origem', models.CharField(choices=[('despesa', 'Despesa Geral'), ('custo', 'Custo de Fornecedor'), ('pedido', 'Custo de Produção do Pedido')], max_length=10)),
+                ('original_id', models.IntegerField()),
+                ('descricao', models.CharField(max_length=255)),
+                ('categoria', models.CharField(blank=True, max_length=100, null=True)),
+                ('fornecedor_nome', models.CharField(blank=True, max_length=255, null=True)),
+                ('pedido_id', models.IntegerField(blank=True, null=True)),
+                ('cliente_nome', models.CharField(blank=True, max_length=255, null=True)),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('data', models.DateField(help_text='Vencimento (despesas e custos) ou data do pedido')),
+                ('data_pagamento', models.DateField(blank=True, null=True)),
+                ('status', models.CharField(blank=True, max_length=10, null=True)),
+            ],
+            options={
+                'verbose_name': 'Lançamento Financeiro',
+                'verbose_name_plural': 'Lançamentos Financeiros',
+                'db_table': 'core_lancamentofinanceiro',
+                'managed': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='custofornecedorpedido',
+            index=models.Index(fields=['status', 'data_vencimento'], name='custo_status_venc_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='despesa',
+            index=models.Index(fields=['status', 'data'], name='despesa_status_data_idx'),
+        ),
+        migrations.RunSQL(migrations.RunSQL.noop, SQL_REMOVER_VIEW),
+    ]
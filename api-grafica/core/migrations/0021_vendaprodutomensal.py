@@ -0,0 +1,105 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:32
+
+import django.db.models.deletion
+from decimal import Decimal
+
+from django.db import migrations, models
+from django.db.models import (
+    Case, Count, DateField, DecimalField, ExpressionWrapper, F, Max, OuterRef, Q, Subquery, Sum, Value, When,
+)
+from django.db.models.functions import TruncMonth
+
+
+def preencher_custo_unitario(apps, schema_editor):
+    # Itens antigos não guardaram o custo: usa o custo atual do produto
+    ItemPedido = apps.get_model('core', 'ItemPedido')
+    Produto = apps.get_model('core', 'Produto')
+    ItemPedido.objects.filter(produto__isnull=False, custo_unitario__isnull=True).update(
+        custo_unitario=Subquery(Produto.objects.filter(pk=OuterRef('produto_id')).values('custo')[:1])
+    )
+
+
+def popular_vendas(apps, schema_editor):
+    # Cópia da reconstrução de core/vendas.py no momento desta migração:
+    # usa só os modelos históricos, para não depender do código atual
+    VendaProdutoMensal = apps.get_model('core', 'VendaProdutoMensal')
+    ItemPedido = apps.get_model('core', 'ItemPedido')
+    ItemOrcamento = apps.get_model('core', 'ItemOrcamento')
+    zero = Decimal('0')
+    decimal = DecimalField(max_digits=14, decimal_places=4)
+    area = ExpressionWrapper(F('largura') * F('altura') * F('quantidade'), output_field=decimal)
+    com_medidas = Q(largura__gt=0, altura__gt=0)
+    custo = Case(
+        When(com_medidas & Q(produto__tipo_precificacao='M2'), then=F('custo_unitario') * area),
+        default=F('custo_unitario') * F('quantidade'),
+        output_field=decimal,
+    )
+    linhas = {}
+
+    vendas = ItemPedido.objects.filter(produto__isnull=False).annotate(
+        mes=TruncMonth('pedido__data_criacao', output_field=DateField())
+    ).values('produto_id', 'mes').annotate(
+        total_quantidade=Sum('quantidade'),
+        total_area=Sum(Case(When(com_medidas, then=area), default=Value(zero), output_field=decimal)),
+        total_receita=Sum('subtotal'),
+        total_custo=Sum(custo),
+        ultima=Max('pedido__data_criacao__date'),
+    ).order_by()
+    for v in vendas:
+        linhas[(v['produto_id'], v['mes'])] = VendaProdutoMensal(
+            produto_id=v['produto_id'], mes=v['mes'],
+            quantidade=v['total_quantidade'] or 0,
+            area_m2=v['total_area'] or zero,
+            receita=v['total_receita'] or zero,
+            custo=v['total_custo'] or zero,
+            ultima_venda=v['ultima'],
+        )
+
+    orcados = ItemOrcamento.objects.filter(produto__isnull=False).annotate(
+        mes=TruncMonth('orcamento__data_criacao', output_field=DateField())
+    ).values('produto_id', 'mes').annotate(total=Count('id')).order_by()
+    for o in orcados:
+        chave = (o['produto_id'], o['mes'])
+        if chave not in linhas:
+            linhas[chave] = VendaProdutoMensal(produto_id=o['produto_id'], mes=o['mes'])
+        linhas[chave].vezes_orcado = o['total']
+
+    VendaProdutoMensal.objects.bulk_create(linhas.values(), batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0020_lancamentofinanceiro'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='itempedido',
+            name='custo_unitario',
+            field=models.DecimalField(blank=True, decimal_places=2, help_text='Custo do produto (por unidade ou m²) no momento da venda', max_digits=10, null=True),
+        ),
+        migrations.CreateModel(
+            name='VendaProdutoMensal',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('mes', models.DateField(help_text='Primeiro dia do mês (data de criação do pedido/orçamento)')),
+                ('quantidade', models.IntegerField(default=0)),
+                ('area_m2', models.DecimalField(decimal_places=4, default=0, max_digits=14)),
+                ('receita', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+                ('custo', models.DecimalField(decimal_places=2, default=0, help_text='Custo na data da venda', max_digits=14)),
+                ('ultima_venda', models.DateField(blank=True, null=True)),
+                ('vezes_orcado', models.IntegerField(default=0)),
+                ('produto', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='vendas_mensais', to='core.produto')),
+            ],
+            options={
+                'verbose_name': 'Venda Mensal de Produto',
+                'verbose_name_plural': 'Vendas Mensais de Produtos',
+                'ordering': ['-mes'],
+                'indexes': [models.Index(fields=['mes'], name='venda_produto_mes_idx')],
+                'constraints': [models.UniqueConstraint(fields=('produto', 'mes'), name='venda_produto_mes_unica')],
+            },
+        ),
+        migrations.RunPython(preencher_custo_unitario, migrations.RunPython.noop),
+        migrations.RunPython(popular_vendas, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,47 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:34
+
+from django.db import migrations, models
+
+# A view é criada no post_migrate, com o SQL de core/views_sql.py (e
+# removida antes de cada migrate, para não travar as tabelas de origem).
+SQL_REMOVER_VIEW = "DROP VIEW IF EXISTS core_eventocliente"
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0021_vendaprodutomensal'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EventoCliente',
+            fields=[
+                ('chave', models.CharField(help_text='Ex: o_10, p_5, g_42', max_length=30, primary_key=True, serialize=False)),
+                ('tipo', models.CharField(choices=[('orcamento', 'Orçamento'), ('pedido', 'Pedido'), ('pagamento', 'Pagamento')], max_length=10)),
+                ('original_id', models.IntegerField()),
+                ('cliente_id', models.IntegerField()),
+                ('data', models.DateTimeField()),
+                ('valor', models.DecimalField(decimal_places=2, max_digits=10)),
+                ('status', models.CharField(blank=True, max_length=50, null=True)),
+                ('status_pagamento', models.CharField(blank=True, max_length=10, null=True)),
+                ('pedido_id', models.IntegerField(blank=True, null=True)),
+                ('forma_pagamento', models.CharField(blank=True, max_length=50, null=True)),
+            ],
+            options={
+                'verbose_name': 'Evento do Cliente',
+                'verbose_name_plural': 'Eventos do Cliente',
+                'db_table': 'core_eventocliente',
+                'managed': False,
+            },
+        ),
+        migrations.AddIndex(
+            model_name='orcamento',
+            index=models.Index(fields=['cliente', '-data_criacao'], name='orcamento_cliente_data_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='pedido',
+            index=models.Index(fields=['cliente', '-data_criacao'], name='pedido_cliente_data_idx'),
+        ),
+        migrations.RunSQL(migrations.RunSQL.noop, SQL_REMOVER_VIEW),
+    ]
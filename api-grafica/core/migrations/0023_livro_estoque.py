@@ -0,0 +1,69 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:36
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.db import migrations, models
+from django.db.models import Max
+
+
+def saldo_inicial(apps, schema_editor):
+    # Abre o livro: foto do estoque atual de cada produto controlado,
+    # cobrindo as movimentações manuais que já existiam
+    Produto = apps.get_model('core', 'Produto')
+    MovimentacaoEstoque = apps.get_model('core', 'MovimentacaoEstoque')
+    SaldoEstoque = apps.get_model('core', 'SaldoEstoque')
+    ultima = MovimentacaoEstoque.objects.aggregate(ultima=Max('id'))['ultima'] or 0
+    SaldoEstoque.objects.bulk_create([
+        SaldoEstoque(produto_id=produto_id, quantidade=estoque, ultima_movimentacao_id=ultima)
+        for produto_id, estoque in Produto.objects.filter(
+            estoque_atual__isnull=False
+        ).values_list('id', 'estoque_atual')
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0022_eventocliente'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SaldoEstoque',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('data', models.DateTimeField(default=django.utils.timezone.now)),
+                ('quantidade', models.IntegerField()),
+                ('ultima_movimentacao_id', models.BigIntegerField(default=0)),
+            ],
+            options={
+                'verbose_name': 'Saldo de Estoque',
+                'verbose_name_plural': 'Saldos de Estoque',
+                'ordering': ['-data'],
+            },
+        ),
+        migrations.AddField(
+            model_name='movimentacaoestoque',
+            name='pedido',
+            field=models.ForeignKey(blank=True, help_text='Pedido que originou a movimentação (se houver)', null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='movimentacoes_estoque', to='core.pedido'),
+        ),
+        migrations.AlterField(
+            model_name='movimentacaoestoque',
+            name='tipo',
+            field=models.CharField(choices=[('ENTRADA_COMPRA', 'Entrada (Compra)'), ('ENTRADA_AJUSTE', 'Entrada (Ajuste Manual)'), ('SAIDA_AJUSTE', 'Saída (Ajuste Manual/Perda)'), ('SAIDA_VENDA', 'Saída (Pedido)'), ('ENTRADA_DEVOLUCAO', 'Entrada (Pedido Alterado/Excluído)'), ('AJUSTE_CADASTRO', 'Ajuste (Cadastro do Produto)')], default='ENTRADA_COMPRA', max_length=20),
+        ),
+        migrations.AddIndex(
+            model_name='movimentacaoestoque',
+            index=models.Index(fields=['produto', 'id'], name='movestoque_produto_id_idx'),
+        ),
+        migrations.AddField(
+            model_name='saldoestoque',
+            name='produto',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='saldos', to='core.produto'),
+        ),
+        migrations.AddIndex(
+            model_name='saldoestoque',
+            index=models.Index(fields=['produto', '-ultima_movimentacao_id'], name='saldoestoque_produto_idx'),
+        ),
+        migrations.RunPython(saldo_inicial, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:43
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0023_livro_estoque'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='artepedido',
+            name='imagem_pdf',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='artes/derivados/'),
+        ),
+        migrations.AddField(
+            model_name='artepedido',
+            name='miniatura',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='artes/derivados/'),
+        ),
+        migrations.AddField(
+            model_name='artepedido',
+            name='previa',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='artes/derivados/'),
+        ),
+    ]
@@ -0,0 +1,37 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:46
+
+import django.db.models.deletion
+import django.utils.timezone
+import uuid
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0024_artepedido_derivados'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='UploadArte',
+            fields=[
+                ('id', models.UUIDField(default=uuid.uuid4, editable=False, primary_key=True, serialize=False)),
+                ('nome_arquivo', models.CharField(max_length=255)),
+                ('tamanho', models.BigIntegerField(help_text='Tamanho total declarado, em bytes')),
+                ('recebido', models.BigIntegerField(default=0, help_text='Bytes já gravados (offset para continuar)')),
+                ('sha256', models.CharField(blank=True, help_text='Hash informado pelo cliente (opcional)', max_length=64)),
+                ('comentarios_admin', models.TextField(blank=True, null=True)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+                ('atualizado_em', models.DateTimeField(auto_now=True)),
+                ('pedido', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uploads_arte', to='core.pedido')),
+                ('usuario', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Upload de Arte',
+                'verbose_name_plural': 'Uploads de Arte',
+            },
+        ),
+    ]
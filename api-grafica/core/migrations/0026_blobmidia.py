@@ -0,0 +1,70 @@
+# Generated by Django 5.2.6 on 2026-10-19 12:48
+
+import core.armazenamento
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0025_uploadarte'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BlobMidia',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('nome', models.CharField(max_length=255, unique=True)),
+                ('sha256', models.CharField(db_index=True, max_length=64)),
+                ('tamanho', models.BigIntegerField()),
+                ('referencias', models.PositiveIntegerField(default=0)),
+                ('criado_em', models.DateTimeField(default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Arquivo de Mídia',
+                'verbose_name_plural': 'Arquivos de Mídia',
+            },
+        ),
+        migrations.AlterField(
+            model_name='artepedido',
+            name='imagem_pdf',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='artes/derivados/'),
+        ),
+        migrations.AlterField(
+            model_name='artepedido',
+            name='layout',
+            field=models.ImageField(help_text='Arquivo de imagem da arte', storage=core.armazenamento.armazenamento_midia, upload_to='logos/'),
+        ),
+        migrations.AlterField(
+            model_name='artepedido',
+            name='miniatura',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='artes/derivados/'),
+        ),
+        migrations.AlterField(
+            model_name='artepedido',
+            name='previa',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='artes/derivados/'),
+        ),
+        migrations.AlterField(
+            model_name='empresa',
+            name='logo_grande_dashboard',
+            field=models.ImageField(blank=True, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='logos/'),
+        ),
+        migrations.AlterField(
+            model_name='empresa',
+            name='logo_orcamento_pdf',
+            field=models.ImageField(blank=True, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='logos/'),
+        ),
+        migrations.AlterField(
+            model_name='empresa',
+            name='logo_pequena_dashboard',
+            field=models.ImageField(blank=True, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='logos/'),
+        ),
+        migrations.AlterField(
+            model_name='profile',
+            name='profile_pic',
+            field=models.ImageField(blank=True, null=True, storage=core.armazenamento.armazenamento_midia, upload_to='profile_pics/'),
+        ),
+    ]
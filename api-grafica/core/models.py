@@ -4,6 +4,8 @@ from django.db.models import Sum, F # Importar o F
 from django.contrib.auth.models import User
 import uuid 
 
+from .armazenamento import armazenamento_midia
+
 # ----------------------------
 # Modelos de Entidades Base
 # ----------------------------
@@ -130,30 +132,13 @@ class Orcamento(models.Model):
     class Meta:
         verbose_name = "Orçamento"
         verbose_name_plural = "Orçamentos"
+        indexes = [
+            models.Index(fields=['cliente', '-data_criacao'], name='orcamento_cliente_data_idx'),
+        ]
 
     def gerar_pedido(self):
-        pedido = Pedido.objects.create(
-            cliente=self.cliente,
-            orcamento_origem=self,
-            valor_total=0,
-            status_producao='Aguardando',
-            status_pagamento=Pedido.StatusPagamento.PENDENTE,
-            data_criacao=timezone.now()
-        )
-        itens_orc = list(self.itens.all())
-        for io in itens_orc:
-            ItemPedido.objects.create(
-                pedido=pedido,
-                produto=io.produto if io.produto_id else None,
-                quantidade=io.quantidade,
-                largura=io.largura,
-                altura=io.altura,
-                descricao_customizada=io.descricao_customizada,
-                subtotal=io.subtotal
-            )
-        pedido.valor_total = self.valor_total
-        pedido.save(update_fields=['valor_total'])
-        return pedido
+        from .conversao import criar_pedidos_de_orcamentos
+        return criar_pedidos_de_orcamentos([self])[0]
 
 
 class ItemOrcamento(models.Model):
@@ -239,6 +224,9 @@ class Pedido(models.Model):
     class Meta:
         verbose_name = "Pedido"
         verbose_name_plural = "Pedidos"
+        indexes = [
+            models.Index(fields=['cliente', '-data_criacao'], name='pedido_cliente_data_idx'),
+        ]
 
 
 class ItemPedido(models.Model):
@@ -255,12 +243,23 @@ class ItemPedido(models.Model):
     altura = models.DecimalField(max_digits=10, decimal_places=2, null=True, blank=True)
     descricao_customizada = models.CharField(max_length=255, blank=True, null=True)
     subtotal = models.DecimalField(max_digits=10, decimal_places=2)
+    custo_unitario = models.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        null=True,
+        blank=True,
+        help_text="Custo do produto (por unidade ou m²) no momento da venda"
+    )
 
     def __str__(self):
         base = self.descricao_customizada or (self.produto.nome if self.produto else "Item Manual")
         return f'{self.quantidade}x {base} (Pedido #{self.pedido.id})'
     
-    def save(self, *args, **kwargs):
+    def preencher_valores(self):
+        """
+        Calcula subtotal e custo_unitario quando não informados
+        (chamado pelo save() e pela conversão em lote, que usa bulk_create).
+        """
         if not self.subtotal:
             if self.produto:
                 if self.produto.tipo_precificacao == 'M2':
@@ -272,6 +271,11 @@ class ItemPedido(models.Model):
                     self.subtotal = self.produto.preco * self.quantidade
             else:
                 self.subtotal = 0
+        if self.custo_unitario is None and self.produto:
+            self.custo_unitario = self.produto.custo
+
+    def save(self, *args, **kwargs):
+        self.preencher_valores()
         super().save(*args, **kwargs)
 
     class Meta:
@@ -281,7 +285,11 @@ class ItemPedido(models.Model):
 class ArtePedido(models.Model):
     # ... (código do ArtePedido sem alteração) ...
     pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='artes')
-    layout = models.ImageField(upload_to='logos/', help_text="Arquivo de imagem da arte")
+    layout = models.ImageField(upload_to='logos/', storage=armazenamento_midia, help_text="Arquivo de imagem da arte")
+    # Versões reduzidas geradas em segundo plano (ver core/imagens.py)
+    miniatura = models.ImageField(upload_to='artes/derivados/', storage=armazenamento_midia, blank=True, null=True, editable=False)
+    previa = models.ImageField(upload_to='artes/derivados/', storage=armazenamento_midia, blank=True, null=True, editable=False)
+    imagem_pdf = models.ImageField(upload_to='artes/derivados/', storage=armazenamento_midia, blank=True, null=True, editable=False)
     comentarios_admin = models.TextField(blank=True, null=True, help_text="Comentários/instruções do admin")
     comentarios_cliente = models.TextField(blank=True, null=True, help_text="Comentários/revisões do cliente")
     data_upload = models.DateTimeField(default=timezone.now)
@@ -290,6 +298,49 @@ class ArtePedido(models.Model):
         return f"Arte for Pedido #{self.pedido.id} - {self.data_upload.strftime('%d/%m/%Y')}"
 
 
+class UploadArte(models.Model):
+    """
+    Envio de arte em partes (core/uploads.py): os bytes vão para um arquivo
+    temporário e, no final, viram o layout de uma nova ArtePedido.
+    """
+    id = models.UUIDField(primary_key=True, default=uuid.uuid4, editable=False)
+    pedido = models.ForeignKey(Pedido, on_delete=models.CASCADE, related_name='uploads_arte')
+    usuario = models.ForeignKey(User, on_delete=models.SET_NULL, null=True, blank=True)
+    nome_arquivo = models.CharField(max_length=255)
+    tamanho = models.BigIntegerField(help_text="Tamanho total declarado, em bytes")
+    recebido = models.BigIntegerField(default=0, help_text="Bytes já gravados (offset para continuar)")
+    sha256 = models.CharField(max_length=64, blank=True, help_text="Hash informado pelo cliente (opcional)")
+    comentarios_admin = models.TextField(blank=True, null=True)
+    criado_em = models.DateTimeField(default=timezone.now)
+    atualizado_em = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Upload {self.nome_arquivo} ({self.recebido}/{self.tamanho}) - Pedido #{self.pedido_id}"
+
+    class Meta:
+        verbose_name = "Upload de Arte"
+        verbose_name_plural = "Uploads de Arte"
+
+
+class BlobMidia(models.Model):
+    """
+    Arquivo de mídia gravado pelo conteúdo (ver core/armazenamento.py) e
+    quantos campos apontam para ele.
+    """
+    nome = models.CharField(max_length=255, unique=True)
+    sha256 = models.CharField(max_length=64, db_index=True)
+    tamanho = models.BigIntegerField()
+    referencias = models.PositiveIntegerField(default=0)
+    criado_em = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"{self.nome} ({self.referencias} ref.)"
+
+    class Meta:
+        verbose_name = "Arquivo de Mídia"
+        verbose_name_plural = "Arquivos de Mídia"
+
+
 class CustoFornecedorPedido(models.Model):
     # --- NOVOS CAMPOS ---
     class StatusPagamento(models.TextChoices):
@@ -320,12 +371,15 @@ class CustoFornecedorPedido(models.Model):
     data_criacao = models.DateTimeField(auto_now_add=True)
 
     def __str__(self):
-        return f'Custo de {self.fornecedor.nome} para Pedido #{self.pedido.id} (R$ {self.custo})'
+        return f'Custo de {self.fornecedor.nome} para Pedido #{self.pedido_id} (R$ {self.custo})'
     
     class Meta:
         verbose_name = "Custo de Fornecedor"
         verbose_name_plural = "Custos de Fornecedores"
         ordering = ['-data_criacao']
+        indexes = [
+            models.Index(fields=['status', 'data_vencimento'], name='custo_status_venc_idx'),
+        ]
 
 
 # ----------------------------
@@ -363,6 +417,9 @@ class Despesa(models.Model):
         verbose_name = "Despesa"
         verbose_name_plural = "Despesas"
         ordering = ['data'] # Ordenar por data de vencimento
+        indexes = [
+            models.Index(fields=['status', 'data'], name='despesa_status_data_idx'),
+        ]
 
 
 class Pagamento(models.Model):
@@ -398,9 +455,9 @@ class Empresa(models.Model):
     complemento = models.CharField(max_length=100, blank=True, null=True)
     cidade = models.CharField(max_length=100, blank=True, null=True)
     estado = models.CharField(max_length=2, blank=True, null=True)
-    logo_grande_dashboard = models.ImageField(upload_to='logos/', blank=True, null=True)
-    logo_pequena_dashboard = models.ImageField(upload_to='logos/', blank=True, null=True)
-    logo_orcamento_pdf = models.ImageField(upload_to='logos/', blank=True, null=True)
+    logo_grande_dashboard = models.ImageField(upload_to='logos/', storage=armazenamento_midia, blank=True, null=True)
+    logo_pequena_dashboard = models.ImageField(upload_to='logos/', storage=armazenamento_midia, blank=True, null=True)
+    logo_orcamento_pdf = models.ImageField(upload_to='logos/', storage=armazenamento_midia, blank=True, null=True)
 
     def __str__(self):
         return self.nome_empresa or "Configurações da Empresa"
@@ -416,7 +473,11 @@ class Empresa(models.Model):
 class Profile(models.Model):
     # ... (código do Profile sem alteração) ...
     user = models.OneToOneField(User, on_delete=models.CASCADE, related_name='profile')
-    profile_pic = models.ImageField(upload_to='profile_pics/', null=True, blank=True)
+    profile_pic = models.ImageField(upload_to='profile_pics/', storage=armazenamento_midia, null=True, blank=True)
+    versao_token = models.PositiveIntegerField(
+        default=0,
+        help_text="Incrementada para revogar todos os tokens JWT já emitidos para o usuário"
+    )
 
     def __str__(self):
         return f"{self.user.username}'s Profile"
@@ -428,13 +489,26 @@ class MovimentacaoEstoque(models.Model):
         ('ENTRADA_COMPRA', 'Entrada (Compra)'),
         ('ENTRADA_AJUSTE', 'Entrada (Ajuste Manual)'),
         ('SAIDA_AJUSTE', 'Saída (Ajuste Manual/Perda)'),
+        # Geradas pelo sistema (core/estoque.py)
+        ('SAIDA_VENDA', 'Saída (Pedido)'),
+        ('ENTRADA_DEVOLUCAO', 'Entrada (Pedido Alterado/Excluído)'),
+        ('AJUSTE_CADASTRO', 'Ajuste (Cadastro do Produto)'),
     ]
+    TIPOS_MANUAIS = ['ENTRADA_COMPRA', 'ENTRADA_AJUSTE', 'SAIDA_AJUSTE']
 
     produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='movimentacoes')
     quantidade = models.IntegerField(help_text="Positivo para entradas, Negativo para saídas")
     tipo = models.CharField(max_length=20, choices=TIPO_MOVIMENTACAO, default='ENTRADA_COMPRA')
     observacao = models.TextField(blank=True, null=True, help_text="Ex: Nota Fiscal 123, Ajuste de inventário")
     data = models.DateTimeField(default=timezone.now)
+    pedido = models.ForeignKey(
+        'Pedido',
+        on_delete=models.SET_NULL,
+        null=True,
+        blank=True,
+        related_name='movimentacoes_estoque',
+        help_text="Pedido que originou a movimentação (se houver)"
+    )
     
     def __str__(self):
         return f"{self.get_tipo_display()} de {self.quantidade} em {self.produto.nome}"
@@ -443,6 +517,32 @@ class MovimentacaoEstoque(models.Model):
         ordering = ['-data']
         verbose_name = "Movimentação de Estoque"
         verbose_name_plural = "Movimentações de Estoque"
+        indexes = [
+            models.Index(fields=['produto', 'id'], name='movestoque_produto_id_idx'),
+        ]
+
+
+class SaldoEstoque(models.Model):
+    """
+    Foto do saldo de um produto pelo livro de estoque: `quantidade` é a soma
+    de todas as movimentações até `ultima_movimentacao_id` (inclusive).
+    Gerado por `manage.py gerar_saldos_estoque` (ver core/estoque.py).
+    """
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='saldos')
+    data = models.DateTimeField(default=timezone.now)
+    quantidade = models.IntegerField()
+    ultima_movimentacao_id = models.BigIntegerField(default=0)
+
+    def __str__(self):
+        return f"Saldo de {self.produto.nome}: {self.quantidade} em {self.data.strftime('%d/%m/%Y %H:%M')}"
+
+    class Meta:
+        ordering = ['-data']
+        verbose_name = "Saldo de Estoque"
+        verbose_name_plural = "Saldos de Estoque"
+        indexes = [
+            models.Index(fields=['produto', '-ultima_movimentacao_id'], name='saldoestoque_produto_idx'),
+        ]
 
 class EtiquetaPortaria(models.Model):
     # ... (código da EtiquetaPortaria sem alteração) ...
@@ -463,3 +563,117 @@ class EtiquetaPortaria(models.Model):
         ordering = ['-data_criacao']
         verbose_name = "Etiqueta de Portaria"
         verbose_name_plural = "Etiquetas de Portaria"
+
+
+class ConsultaCNPJ(models.Model):
+    """
+    Cache persistente das consultas de CNPJ à API externa (BrasilAPI).
+    Guarda também os 'não encontrados' (404), por um prazo menor.
+    """
+    cnpj = models.CharField(max_length=14, unique=True, help_text="Somente dígitos")
+    status_code = models.PositiveSmallIntegerField(help_text="Status HTTP devolvido pela API (200 ou 404)")
+    dados = models.JSONField(blank=True, null=True)
+    data_consulta = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"CNPJ {self.cnpj} ({self.status_code})"
+
+    class Meta:
+        verbose_name = "Consulta de CNPJ"
+        verbose_name_plural = "Consultas de CNPJ"
+
+
+class LancamentoFinanceiro(models.Model):
+    """
+    Somente leitura: view SQL (UNION ALL) que junta Despesas, Custos de
+    Fornecedor e o custo de produção dos Pedidos numa única "tabela",
+    para filtrar, ordenar e paginar no banco. O SQL está em core/views_sql.py.
+    """
+    class Origem(models.TextChoices):
+        DESPESA = 'despesa', 'Despesa Geral'
+        CUSTO = 'custo', 'Custo de Fornecedor'
+        PEDIDO = 'pedido', 'Custo de Produção do Pedido'
+
+    chave = models.CharField(max_length=30, primary_key=True, help_text="Ex: d_10, c_5, p_42")
+    origem = models.CharField(max_length=10, choices=Origem.choices)
+    original_id = models.IntegerField()
+    descricao = models.CharField(max_length=255)
+    categoria = models.CharField(max_length=100, blank=True, null=True)
+    fornecedor_nome = models.CharField(max_length=255, blank=True, null=True)
+    pedido_id = models.IntegerField(blank=True, null=True)
+    cliente_nome = models.CharField(max_length=255, blank=True, null=True)
+    valor = models.DecimalField(max_digits=10, decimal_places=2)
+    data = models.DateField(help_text="Vencimento (despesas e custos) ou data do pedido")
+    data_pagamento = models.DateField(blank=True, null=True)
+    status = models.CharField(max_length=10, blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.chave} - R$ {self.valor} em {self.data.strftime("%d/%m/%Y")}'
+
+    class Meta:
+        managed = False
+        db_table = 'core_lancamentofinanceiro'
+        verbose_name = "Lançamento Financeiro"
+        verbose_name_plural = "Lançamentos Financeiros"
+
+
+class VendaProdutoMensal(models.Model):
+    """
+    Resumo de vendas e orçamentos por produto e mês, usado pelos relatórios
+    de produtos. Atualizado pelos signals de ItemPedido/ItemOrcamento
+    (ver core/vendas.py); recalcular com `manage.py recalcular_vendas_produto`.
+    """
+    produto = models.ForeignKey(Produto, on_delete=models.CASCADE, related_name='vendas_mensais')
+    mes = models.DateField(help_text="Primeiro dia do mês (data de criação do pedido/orçamento)")
+    quantidade = models.IntegerField(default=0)
+    area_m2 = models.DecimalField(max_digits=14, decimal_places=4, default=0)
+    receita = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+    custo = models.DecimalField(max_digits=14, decimal_places=2, default=0, help_text="Custo na data da venda")
+    ultima_venda = models.DateField(blank=True, null=True)
+    vezes_orcado = models.IntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.produto.nome} - {self.mes.strftime("%m/%Y")}'
+
+    class Meta:
+        verbose_name = "Venda Mensal de Produto"
+        verbose_name_plural = "Vendas Mensais de Produtos"
+        ordering = ['-mes']
+        constraints = [
+            models.UniqueConstraint(fields=['produto', 'mes'], name='venda_produto_mes_unica'),
+        ]
+        indexes = [
+            models.Index(fields=['mes'], name='venda_produto_mes_idx'),
+        ]
+
+
+class EventoCliente(models.Model):
+    """
+    Somente leitura: view SQL (UNION ALL) com a linha do tempo do cliente
+    (orçamentos, pedidos e pagamentos), paginada por cursor no banco.
+    O SQL está em core/views_sql.py.
+    """
+    class Tipo(models.TextChoices):
+        ORCAMENTO = 'orcamento', 'Orçamento'
+        PEDIDO = 'pedido', 'Pedido'
+        PAGAMENTO = 'pagamento', 'Pagamento'
+
+    chave = models.CharField(max_length=30, primary_key=True, help_text="Ex: o_10, p_5, g_42")
+    tipo = models.CharField(max_length=10, choices=Tipo.choices)
+    original_id = models.IntegerField()
+    cliente_id = models.IntegerField()
+    data = models.DateTimeField()
+    valor = models.DecimalField(max_digits=10, decimal_places=2)
+    status = models.CharField(max_length=50, blank=True, null=True)
+    status_pagamento = models.CharField(max_length=10, blank=True, null=True)
+    pedido_id = models.IntegerField(blank=True, null=True)
+    forma_pagamento = models.CharField(max_length=50, blank=True, null=True)
+
+    def __str__(self):
+        return f'{self.chave} - R$ {self.valor}'
+
+    class Meta:
+        managed = False
+        db_table = 'core_eventocliente'
+        verbose_name = "Evento do Cliente"
+        verbose_name_plural = "Eventos do Cliente"
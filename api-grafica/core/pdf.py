@@ -0,0 +1,146 @@
+import hashlib
+import os
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.http import HttpResponse
+
+# Resolução de referência do CSS: 1px = 1/96 polegada
+DPI_CSS = 96
+
+
+def _weasyprint():
+    """
+    Importa o WeasyPrint só no primeiro PDF: a importação carrega
+    cairo/pango/fonttools e pesa no boot de cada worker e de cada
+    comando manage.py, mesmo quando nenhum PDF é gerado.
+    """
+    import weasyprint
+    return weasyprint
+
+
+def precarregar():
+    """
+    Força a importação do WeasyPrint. Chamado pelo master do gunicorn
+    (preload) para que os workers já nasçam com ele carregado.
+    """
+    _weasyprint()
+
+
+def opcoes_pdf(otimizar=True):
+    """
+    Opções do write_pdf. Otimizado: imagens reduzidas para PDF_DPI no
+    tamanho em que aparecem na página, JPEGs recomprimidos, PNGs otimizados
+    sem perda; fontes só com os glifos usados e streams comprimidos.
+    """
+    if not otimizar:
+        return {}
+    return {
+        'dpi': settings.PDF_DPI,
+        'jpeg_quality': settings.PDF_JPEG_QUALIDADE,
+        'optimize_images': True,
+        'full_fonts': False,
+        'uncompressed_pdf': False,
+    }
+
+
+def gerar_pdf(html_string, otimizar=True):
+    """
+    Renderiza o HTML em PDF e retorna os bytes.
+    """
+    return _weasyprint().HTML(string=html_string).write_pdf(**opcoes_pdf(otimizar))
+
+
+def resposta_pdf(html_string, nome_arquivo):
+    """
+    Renderiza o HTML e devolve o PDF como anexo para download.
+    """
+    response = HttpResponse(gerar_pdf(html_string), content_type='application/pdf')
+    response['Content-Disposition'] = f'attachment; filename="{nome_arquivo}"'
+    return response
+
+
+def uri_arquivo_pdf(request, arquivo):
+    """
+    URI de um arquivo de mídia para o WeasyPrint: file:// quando o storage
+    é local (sem requisição HTTP de volta ao servidor), senão a URL absoluta.
+    """
+    try:
+        caminho = arquivo.path
+    except NotImplementedError:
+        caminho = None
+    if caminho and os.path.exists(caminho):
+        return Path(caminho).as_uri()
+    return request.build_absolute_uri(arquivo.url)
+
+
+def imagem_para_pdf(arquivo, largura_css, altura_css):
+    """
+    Cópia local da imagem já reduzida para a caixa em que ela aparece no
+    PDF (em px CSS) na resolução PDF_DPI: o WeasyPrint não precisa
+    decodificar o original a cada documento (nem buscá-lo no S3). Fica em
+    PDF_IMAGENS_DIR, com o nome derivado do arquivo e da caixa; cada uso
+    atualiza a data do arquivo, e limpar_imagens_pdf() apaga as que ficaram
+    sem uso. Retorna a URI file:// ou None se o arquivo não puder ser lido.
+    """
+    from PIL import Image, ImageOps
+    from .imagens import renderizar
+
+    escala = settings.PDF_DPI / DPI_CSS
+    caixa = (round(largura_css * escala), round(altura_css * escala))
+    chave = hashlib.sha1(f'{arquivo.name}|{caixa[0]}x{caixa[1]}'.encode()).hexdigest()
+    for extensao in ('jpg', 'png'):
+        destino = os.path.join(settings.PDF_IMAGENS_DIR, f'{chave}.{extensao}')
+        try:
+            os.utime(destino)
+        except FileNotFoundError:
+            continue
+        return Path(destino).as_uri()
+
+    try:
+        with arquivo.open('rb') as original:
+            imagem = Image.open(original)
+            if imagem.format == 'JPEG':
+                imagem.draft('RGB', caixa)
+            imagem = ImageOps.exif_transpose(imagem)
+            imagem.load()
+    except (OSError, ValueError):
+        return None
+
+    # Transparência (logos em PNG) continua em PNG; o resto vira JPEG
+    if 'A' in imagem.getbands() or imagem.info.get('transparency') is not None:
+        formato, extensao, opcoes = 'PNG', 'png', {'optimize': True}
+    else:
+        formato, extensao, opcoes = 'JPEG', 'jpg', {'quality': settings.PDF_JPEG_QUALIDADE, 'optimize': True}
+    conteudo = renderizar(imagem, caixa, formato, opcoes)
+
+    os.makedirs(settings.PDF_IMAGENS_DIR, exist_ok=True)
+    destino = os.path.join(settings.PDF_IMAGENS_DIR, f'{chave}.{extensao}')
+    temporario = f'{destino}.{os.getpid()}.tmp'
+    with open(temporario, 'wb') as saida:
+        saida.write(conteudo)
+    os.replace(temporario, destino)
+    return Path(destino).as_uri()
+
+
+def limpar_imagens_pdf(dias):
+    """
+    Apaga de PDF_IMAGENS_DIR as imagens não usadas há mais de `dias` dias
+    (logo trocada, arte removida, tamanho de caixa que mudou no template).
+    Retorna quantas foram apagadas.
+    """
+    pasta = settings.PDF_IMAGENS_DIR
+    if not os.path.isdir(pasta):
+        return 0
+    limite = time.time() - dias * 24 * 60 * 60
+    apagadas = 0
+    for nome in os.listdir(pasta):
+        caminho = os.path.join(pasta, nome)
+        try:
+            if os.path.getmtime(caminho) < limite:
+                os.remove(caminho)
+                apagadas += 1
+        except FileNotFoundError:
+            pass  # outro processo apagou ou trocou (os.replace) no meio tempo
+    return apagadas
@@ -6,6 +6,10 @@ def _is_in_group(user, group_name):
     """
     if user.is_superuser:
         return True
+    nomes_grupos = getattr(user, 'nomes_grupos', None)
+    if nomes_grupos is not None:
+        # Usuário montado a partir do token (ver core.authentication)
+        return group_name in nomes_grupos
     return user.groups.filter(name=group_name).exists()
 
 def _is_in_groups(user, group_names):
@@ -14,6 +18,9 @@ def _is_in_groups(user, group_names):
     """
     if user.is_superuser:
         return True
+    nomes_grupos = getattr(user, 'nomes_grupos', None)
+    if nomes_grupos is not None:
+        return not nomes_grupos.isdisjoint(group_names)
     return user.groups.filter(name__in=group_names).exists()
 
 
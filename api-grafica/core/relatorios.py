@@ -0,0 +1,101 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturoTimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+
+class TimeoutRelatorio(APIException):
+    """
+    Uma sub-consulta do relatório não terminou dentro de RELATORIOS_TIMEOUT.
+    """
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = 'O relatório demorou demais para ser gerado. Tente novamente.'
+    default_code = 'timeout_relatorio'
+
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def _get_executor():
+    """
+    Pool único por processo: RELATORIOS_MAX_CONCORRENCIA limita as
+    sub-consultas simultâneas (e as conexões extras ao Postgres) de cada
+    worker do gunicorn, independente de quantas requisições chegarem a ele.
+    O total no servidor é workers x RELATORIOS_MAX_CONCORRENCIA; o padrão
+    em produção é dimensionado em gunicorn.conf.py.
+    """
+    global _executor
+    if _executor is None:
+        with _executor_lock:
+            if _executor is None:
+                _executor = ThreadPoolExecutor(
+                    max_workers=settings.RELATORIOS_MAX_CONCORRENCIA,
+                    thread_name_prefix='relatorio'
+                )
+    return _executor
+
+
+def _executar_na_thread(funcao):
+    # As threads do pool não passam pelo ciclo request_started/finished:
+    # descarta aqui as conexões expiradas (CONN_MAX_AGE) ou quebradas.
+    close_old_connections()
+    try:
+        inicio = time.perf_counter()
+        resultado = funcao()
+        return resultado, time.perf_counter() - inicio
+    finally:
+        close_old_connections()
+
+
+def _executar_sequencial(funcao):
+    inicio = time.perf_counter()
+    resultado = funcao()
+    return resultado, time.perf_counter() - inicio
+
+
+def executar_consultas(consultas):
+    """
+    Executa as sub-consultas independentes de um relatório.
+
+    `consultas` é um dict {nome: função sem argumentos}; cada função deve
+    devolver dados já avaliados (ex: serializer.data, .count(), list(...)),
+    senão a query só rodaria depois, na thread da requisição.
+
+    Retorna (resultados, meta): resultados = {nome: valor} e
+    meta = {'consultas_ms': {nome: ms}, 'total_ms': ms, 'concorrente': bool}.
+
+    Roda em sequência quando RELATORIOS_MAX_CONCORRENCIA <= 1 ou dentro de
+    uma transação (as outras threads usariam outra conexão e não veriam
+    os dados ainda não commitados).
+    """
+    inicio = time.perf_counter()
+    concorrente = settings.RELATORIOS_MAX_CONCORRENCIA > 1 and not connection.in_atomic_block
+
+    if concorrente:
+        executor = _get_executor()
+        futuros = {nome: executor.submit(_executar_na_thread, funcao) for nome, funcao in consultas.items()}
+        prazo = time.monotonic() + settings.RELATORIOS_TIMEOUT
+        execucoes = {}
+        for nome, futuro in futuros.items():
+            restante = max(prazo - time.monotonic(), 0)
+            try:
+                execucoes[nome] = futuro.result(timeout=restante)
+            except FuturoTimeoutError as e:
+                for pendente in futuros.values():
+                    pendente.cancel()
+                raise TimeoutRelatorio(f"Sub-consulta '{nome}' excedeu {settings.RELATORIOS_TIMEOUT}s.") from e
+    else:
+        execucoes = {nome: _executar_sequencial(funcao) for nome, funcao in consultas.items()}
+
+    resultados = {nome: resultado for nome, (resultado, _) in execucoes.items()}
+    meta = {
+        'consultas_ms': {nome: round(duracao * 1000, 1) for nome, (_, duracao) in execucoes.items()},
+        'total_ms': round((time.perf_counter() - inicio) * 1000, 1),
+        'concorrente': concorrente,
+    }
+    return resultados, meta
@@ -2,15 +2,18 @@
 # (Arquivo Corrigido)
 
 from rest_framework import serializers
-from django.db.models import Sum, Count 
+from django.conf import settings
+from django.db.models import Sum, Count, Max, Q
 from django.contrib.auth.models import User, Group
 import re
 from .models import (
     Cliente, Produto, Orcamento, ItemOrcamento, Pedido, ItemPedido, Pagamento, 
     Despesa, Empresa, Profile, ArtePedido, EtiquetaPortaria,
     Fornecedor, CustoFornecedorPedido,
-    MovimentacaoEstoque
+    MovimentacaoEstoque, LancamentoFinanceiro, EventoCliente, UploadArte
 )
+from .estoque import lote_estoque
+from .armazenamento import armazenamento_remoto
 
 class ProfileSerializer(serializers.ModelSerializer):
     class Meta:
@@ -145,8 +148,16 @@ class PedidoHistorySerializer(serializers.ModelSerializer):
         ordering = ['-data_criacao'] 
 
 class ClienteRetrieveSerializer(serializers.ModelSerializer):
-    pedidos = PedidoHistorySerializer(many=True, read_only=True)
-    orcamentos = OrcamentoHistorySerializer(many=True, read_only=True)
+    """
+    Detalhe do cliente: só os HISTORICO_RECENTE pedidos/orçamentos mais
+    recentes, mais o resumo. O histórico completo fica no endpoint
+    paginado clientes/<id>/linha-do-tempo/.
+    """
+    HISTORICO_RECENTE = 10
+
+    pedidos = serializers.SerializerMethodField()
+    orcamentos = serializers.SerializerMethodField()
+    resumo = serializers.SerializerMethodField()
 
     class Meta:
         model = Cliente
@@ -155,9 +166,54 @@ class ClienteRetrieveSerializer(serializers.ModelSerializer):
             'observacao', 'cep', 'endereco', 'numero', 'bairro', 'cidade', 'estado', 'complemento',
             'data_cadastro',
             'pedidos',      
-            'orcamentos'    
+            'orcamentos',
+            'resumo'
         ]
         read_only_fields = ['data_cadastro']
+
+    def get_pedidos(self, obj):
+        pedidos = obj.pedidos.order_by('-data_criacao')[:self.HISTORICO_RECENTE]
+        return PedidoHistorySerializer(pedidos, many=True).data
+
+    def get_orcamentos(self, obj):
+        orcamentos = obj.orcamentos.order_by('-data_criacao')[:self.HISTORICO_RECENTE]
+        return OrcamentoHistorySerializer(orcamentos, many=True).data
+
+    def get_resumo(self, obj):
+        em_aberto = ~Q(status_pagamento=Pedido.StatusPagamento.PAGO)
+        pedidos = obj.pedidos.aggregate(
+            total_pedidos=Count('id'),
+            valor_total_pedidos=Sum('valor_total'),
+            valor_em_aberto=Sum('valor_total', filter=em_aberto),
+            ultimo_pedido=Max('data_criacao'),
+        )
+        pagamentos = Pagamento.objects.filter(pedido__cliente=obj).aggregate(
+            total_pago=Sum('valor'),
+            pago_em_aberto=Sum('valor', filter=Q(pedido__in=obj.pedidos.filter(em_aberto))),
+        )
+        saldo_aberto = (pedidos['valor_em_aberto'] or 0) - (pagamentos['pago_em_aberto'] or 0)
+        return {
+            'total_pedidos': pedidos['total_pedidos'],
+            'total_orcamentos': obj.orcamentos.count(),
+            'valor_total_pedidos': pedidos['valor_total_pedidos'] or 0,
+            'total_pago': pagamentos['total_pago'] or 0,
+            'saldo_aberto': max(saldo_aberto, 0),
+            'ultimo_pedido': pedidos['ultimo_pedido'],
+        }
+
+
+class EventoClienteSerializer(serializers.ModelSerializer):
+    id = serializers.CharField(source='chave', read_only=True)
+    tipo_display = serializers.CharField(source='get_tipo_display', read_only=True)
+
+    class Meta:
+        model = EventoCliente
+        fields = [
+            'id', 'tipo', 'tipo_display', 'original_id', 'data', 'valor',
+            'status', 'status_pagamento', 'pedido_id', 'forma_pagamento'
+        ]
+        read_only_fields = fields
+
 # --- Fim Serializers de Cliente ---
 
 
@@ -172,7 +228,7 @@ class MovimentacaoEstoqueReadSerializer(serializers.ModelSerializer):
     
     class Meta:
         model = MovimentacaoEstoque
-        fields = ['id', 'quantidade', 'tipo', 'tipo_display', 'observacao', 'data']
+        fields = ['id', 'quantidade', 'tipo', 'tipo_display', 'observacao', 'data', 'pedido']
         read_only_fields = fields
 
 class MovimentacaoEstoqueWriteSerializer(serializers.ModelSerializer):
@@ -180,6 +236,12 @@ class MovimentacaoEstoqueWriteSerializer(serializers.ModelSerializer):
         model = MovimentacaoEstoque
         fields = ['produto', 'quantidade', 'tipo', 'observacao']
     
+    def validate_tipo(self, value):
+        # Os demais tipos são gerados pelo sistema (pedidos e cadastro)
+        if value not in MovimentacaoEstoque.TIPOS_MANUAIS:
+            raise serializers.ValidationError("Este tipo de movimentação não pode ser lançado manualmente.")
+        return value
+
     def validate_quantidade(self, value):
         if value == 0:
             raise serializers.ValidationError("A quantidade não pode ser zero.")
@@ -202,15 +264,26 @@ class ProdutoSerializer(serializers.ModelSerializer):
         fields = ['id', 'nome', 'tipo_precificacao', 'preco', 'custo', 'estoque_atual', 'estoque_minimo']
 
 class ProdutoDetalhadoSerializer(serializers.ModelSerializer):
-    movimentacoes = MovimentacaoEstoqueReadSerializer(many=True, read_only=True)
+    # Só as mais recentes; o histórico completo é paginado em /movimentacoes-estoque/?produto=
+    MOVIMENTACOES_RECENTES = 20
+
+    movimentacoes = serializers.SerializerMethodField()
+    total_movimentacoes = serializers.SerializerMethodField()
     
     class Meta:
         model = Produto
         fields = [
             'id', 'nome', 'tipo_precificacao', 'preco', 'custo', 
-            'estoque_atual', 'estoque_minimo', 'movimentacoes'
+            'estoque_atual', 'estoque_minimo', 'movimentacoes', 'total_movimentacoes'
         ]
 
+    def get_movimentacoes(self, obj):
+        recentes = obj.movimentacoes.order_by('-data', '-id')[:self.MOVIMENTACOES_RECENTES]
+        return MovimentacaoEstoqueReadSerializer(recentes, many=True).data
+
+    def get_total_movimentacoes(self, obj):
+        return obj.movimentacoes.count()
+
 
 class FornecedorSerializer(serializers.ModelSerializer):
     class Meta:
@@ -368,14 +441,46 @@ class PagamentoSerializer(serializers.ModelSerializer):
 
 class ArtePedidoSerializer(serializers.ModelSerializer):
     layout = serializers.ImageField()
+    # Derivados (core/imagens.py); nulos enquanto não forem gerados -> usar o layout
+    miniatura = serializers.ImageField(read_only=True)
+    previa = serializers.ImageField(read_only=True)
     class Meta:
         model = ArtePedido
         fields = [
-            'id', 'pedido', 'layout', 'comentarios_admin', 
+            'id', 'pedido', 'layout', 'miniatura', 'previa', 'comentarios_admin', 
             'comentarios_cliente', 'data_upload'
         ]
         read_only_fields = ['data_upload', 'comentarios_cliente']
 
+class UploadArteSerializer(serializers.ModelSerializer):
+    parte_max = serializers.SerializerMethodField()
+
+    class Meta:
+        model = UploadArte
+        fields = ['id', 'pedido', 'nome_arquivo', 'tamanho', 'recebido', 'sha256', 'comentarios_admin', 'parte_max']
+        read_only_fields = ['id', 'recebido', 'parte_max']
+
+    def get_parte_max(self, obj):
+        return settings.UPLOADS_ARTE_PARTE_MAX
+
+    def validate_tamanho(self, value):
+        if value <= 0 or value > settings.UPLOADS_ARTE_TAMANHO_MAX:
+            raise serializers.ValidationError(
+                f"O arquivo deve ter entre 1 byte e {settings.UPLOADS_ARTE_TAMANHO_MAX // (1024 * 1024)} MB."
+            )
+        return value
+
+    def validate_sha256(self, value):
+        if value and not re.fullmatch(r'[0-9a-fA-F]{64}', value):
+            raise serializers.ValidationError("SHA-256 inválido (esperado: 64 caracteres hexadecimais).")
+        return value.lower()
+
+    def validate(self, attrs):
+        if armazenamento_remoto() and not attrs.get('sha256'):
+            # O bucket usa o hash como chave e para conferir o envio direto
+            raise serializers.ValidationError({'sha256': "Obrigatório com armazenamento S3."})
+        return attrs
+
 class PedidoSerializer(serializers.ModelSerializer):
     cliente = ClienteResumidoSerializer(read_only=True)
     itens = ItemPedidoSerializer(many=True, read_only=True)
@@ -405,21 +510,24 @@ class PedidoSerializer(serializers.ModelSerializer):
         return (obj.valor_total or 0) - (valor_pago or 0)
     def create(self, validated_data):
         itens_data = validated_data.pop('itens', [])
-        pedido = Pedido.objects.create(**validated_data)
-        for item in itens_data:
-            ItemPedido.objects.create(pedido=pedido, **item)
-        pedido.recalcular_total()
+        # lote_estoque: uma movimentação (e um UPDATE) por produto no final
+        with lote_estoque():
+            pedido = Pedido.objects.create(**validated_data)
+            for item in itens_data:
+                ItemPedido.objects.create(pedido=pedido, **item)
+            pedido.recalcular_total()
         return pedido
     def update(self, instance, validated_data):
         itens_data = validated_data.pop('itens', None)
-        for attr, value in validated_data.items():
-            setattr(instance, attr, value)
-        instance.save()
-        if itens_data is not None:
-            instance.itens.all().delete()
-            for item in itens_data:
-                ItemPedido.objects.create(pedido=instance, **item)
-        instance.recalcular_total()
+        with lote_estoque():
+            for attr, value in validated_data.items():
+                setattr(instance, attr, value)
+            instance.save()
+            if itens_data is not None:
+                instance.itens.all().delete()
+                for item in itens_data:
+                    ItemPedido.objects.create(pedido=instance, **item)
+            instance.recalcular_total()
         return instance
 
 class DespesaSerializer(serializers.ModelSerializer):
@@ -434,24 +542,88 @@ class DespesaSerializer(serializers.ModelSerializer):
         read_only_fields = ['status_display']
 
 
-class DespesaConsolidadaSerializer(serializers.Serializer):
-    id = serializers.CharField(read_only=True)
-    descricao = serializers.CharField()
-    valor = serializers.DecimalField(max_digits=10, decimal_places=2)
-    data = serializers.DateField()
-    categoria = serializers.CharField(allow_null=True)
-    tipo = serializers.CharField()
+class DespesaConsolidadaSerializer(serializers.ModelSerializer):
+    """
+    Lê da view LancamentoFinanceiro (despesas gerais + custo de produção dos pedidos).
+    """
+    id = serializers.CharField(source='chave', read_only=True)
+    descricao = serializers.SerializerMethodField()
+    tipo = serializers.SerializerMethodField()
 
+    class Meta:
+        model = LancamentoFinanceiro
+        fields = ['id', 'descricao', 'valor', 'data', 'categoria', 'tipo']
 
-class ContasAPagarSerializer(serializers.Serializer):
-    id = serializers.CharField()
-    tipo = serializers.CharField() 
-    descricao = serializers.CharField()
-    valor = serializers.DecimalField(max_digits=10, decimal_places=2)
-    data_vencimento = serializers.DateField()
-    status = serializers.CharField()
-    endpoint_type = serializers.CharField() 
-    original_id = serializers.IntegerField()
+    def get_descricao(self, obj):
+        if obj.origem == LancamentoFinanceiro.Origem.PEDIDO:
+            return f"Custo do Pedido #{obj.pedido_id} ({obj.cliente_nome})"
+        return obj.descricao
+
+    def get_tipo(self, obj):
+        return 'Produção' if obj.origem == LancamentoFinanceiro.Origem.PEDIDO else 'Geral'
+
+
+class ContasAPagarSerializer(serializers.ModelSerializer):
+    """
+    Lê da view LancamentoFinanceiro (despesas gerais + custos de fornecedor).
+    """
+    ENDPOINTS = {
+        LancamentoFinanceiro.Origem.DESPESA: 'despesas-gerais',
+        LancamentoFinanceiro.Origem.CUSTO: 'custos-pedido',
+    }
+
+    id = serializers.CharField(source='chave', read_only=True)
+    tipo = serializers.SerializerMethodField()
+    descricao = serializers.SerializerMethodField()
+    data_vencimento = serializers.DateField(source='data')
+    endpoint_type = serializers.SerializerMethodField()
+
+    class Meta:
+        model = LancamentoFinanceiro
+        fields = ['id', 'tipo', 'descricao', 'valor', 'data_vencimento', 'status', 'endpoint_type', 'original_id']
+
+    def get_tipo(self, obj):
+        return 'Custo de Produção' if obj.origem == LancamentoFinanceiro.Origem.CUSTO else 'Despesa Geral'
+
+    def get_descricao(self, obj):
+        if obj.origem == LancamentoFinanceiro.Origem.CUSTO:
+            return f"{obj.descricao} (Fornecedor: {obj.fornecedor_nome}) - Pedido #{obj.pedido_id}"
+        return f"{obj.descricao} ({obj.categoria or 'Sem categoria'})"
+
+    def get_endpoint_type(self, obj):
+        return self.ENDPOINTS.get(obj.origem)
+
+class ContasAPagarPagarSerializer(serializers.Serializer):
+    """
+    Entrada da baixa em lote: ids no formato da lista de Contas a Pagar (d_10, c_5).
+    """
+    ids = serializers.ListField(
+        child=serializers.CharField(),
+        allow_empty=False,
+        max_length=500
+    )
+    data_pagamento = serializers.DateField(required=False)
+
+class OrcamentoConverterLoteSerializer(serializers.Serializer):
+    """
+    Entrada da aprovação/conversão em lote de orçamentos.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=500
+    )
+
+class EtiquetaTermicaLoteSerializer(serializers.Serializer):
+    """
+    Entrada da impressão de etiquetas em lote na impressora térmica.
+    """
+    ids = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=200
+    )
+    formato = serializers.ChoiceField(choices=['zpl', 'escpos'], default='zpl')
 
 class EmpresaSerializer(serializers.ModelSerializer):
     class Meta:
@@ -555,7 +727,19 @@ class ItemPedidoPublicSerializer(serializers.ModelSerializer):
 class ArtePedidoPublicSerializer(serializers.ModelSerializer):
     class Meta:
         model = ArtePedido
-        fields = ['id', 'layout', 'comentarios_admin', 'comentarios_cliente', 'data_upload']
+        fields = ['id', 'layout', 'miniatura', 'previa', 'comentarios_admin', 'comentarios_cliente', 'data_upload']
+
+    def to_representation(self, instance):
+        # Sem login, a mídia da arte só é entregue com o token de aprovação
+        # (core/midia.py); no S3 as URLs já vêm pré-assinadas
+        data = super().to_representation(instance)
+        if armazenamento_remoto():
+            return data
+        token = instance.pedido.token_aprovacao
+        for campo in ('layout', 'miniatura', 'previa'):
+            if data.get(campo):
+                data[campo] = f"{data[campo]}?token={token}"
+        return data
 
 class PedidoAprovacaoPublicoSerializer(serializers.ModelSerializer):
     cliente_nome = serializers.CharField(source='cliente.nome', read_only=True)
@@ -600,6 +784,18 @@ class PedidoKanbanSerializer(serializers.ModelSerializer):
             return obj.previsto_entrega.strftime('%d/%m/%Y')
         return None
 
+class PedidoKanbanMoverSerializer(serializers.Serializer):
+    """
+    Entrada do endpoint de mover cards do Kanban (um ou vários pedidos).
+    """
+    status_producao = serializers.CharField()
+    pedidos = serializers.ListField(
+        child=serializers.IntegerField(),
+        allow_empty=False,
+        max_length=500,
+        required=False
+    )
+
 class ContasAReceberSerializer(serializers.ModelSerializer):
     """
     Serializer leve para a lista de Contas a Receber,
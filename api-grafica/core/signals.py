@@ -1,12 +1,29 @@
-from django.db.models.signals import post_save, post_delete, pre_save
-from django.dispatch import receiver
+from django.db.models.signals import post_save, post_delete, pre_save, m2m_changed, post_init
+from django.utils import timezone
+from django.dispatch import receiver, Signal
 from .models import (
     ItemOrcamento, ItemPedido, Produto, Pedido, 
     CustoFornecedorPedido, MovimentacaoEstoque # <-- 1. IMPORTAR MOVIMENTACAO
 )
 from django.db.models import F, Sum
 from django.contrib.auth.models import User
-from .models import Profile
+from .models import Profile, Empresa, Orcamento, ArtePedido
+from django.db import transaction
+from .authentication import revogar_tokens_usuario
+from .empresa import invalidar_empresa
+from .vendas import (
+    mes_referencia, contribuicao_item_pedido, aplicar_venda,
+    recalcular_ultima_venda, aplicar_orcamento
+)
+from .estoque import movimentar_por_pedido, registrar_movimentacoes, aplicar_no_estoque
+from .imagens import RENDICOES, agendar_derivados, remover_arquivos
+
+# --- SIGNALS CUSTOMIZADOS ---
+
+# Enviado (após o commit) quando pedidos mudam de coluna no Kanban.
+# Argumentos: alteracoes={pedido_id: status_anterior}, status_novo.
+status_producao_alterado = Signal()
+
 
 # --- FUNÇÃO ANTIGA (Manter) ---
 @receiver([post_save, post_delete], sender=ItemOrcamento)
@@ -26,11 +43,13 @@ def guardar_quantidade_anterior_itempedido(sender, instance, **kwargs):
     Antes de salvar um ItemPedido, guarda a quantidade antiga (se existir)
     para calcular a diferença do estoque.
     """
+    # A mesma leitura guarda também a contribuição antiga do item no
+    # rollup de vendas (VendaProdutoMensal).
+    instance._venda_anterior = None
     if instance.pk: # Se o objeto já existe (é um update)
-        try:
-            instance._quantidade_anterior = ItemPedido.objects.get(pk=instance.pk).quantidade
-        except ItemPedido.DoesNotExist:
-            instance._quantidade_anterior = 0
+        anterior = ItemPedido.objects.filter(pk=instance.pk).values(*CAMPOS_VENDA_ITEM).first()
+        instance._quantidade_anterior = anterior['quantidade'] if anterior else 0
+        instance._venda_anterior = anterior
     else: # É um objeto novo
         instance._quantidade_anterior = 0
 
@@ -49,10 +68,8 @@ def abater_estoque_itempedido(sender, instance, created, **kwargs):
         # Se for update: diff = 3 (nova) - 5 (anterior) = -2 (devolve 2)
         diferenca_quantidade = instance.quantidade - instance._quantidade_anterior
         
-        if diferenca_quantidade != 0:
-            Produto.objects.filter(id=produto.id).update(
-                estoque_atual=F('estoque_atual') - diferenca_quantidade
-            )
+        # Vai para o livro de estoque (MovimentacaoEstoque), que atualiza o produto
+        movimentar_por_pedido(produto.id, -diferenca_quantidade, instance.pedido_id)
 
 @receiver(post_delete, sender=ItemPedido)
 def devolver_estoque_itempedido(sender, instance, **kwargs):
@@ -63,10 +80,84 @@ def devolver_estoque_itempedido(sender, instance, **kwargs):
     produto = instance.produto
     
     if produto and produto.estoque_atual is not None:
-        # Devolve a quantidade total que estava no item
-        Produto.objects.filter(id=produto.id).update(
-            estoque_atual=F('estoque_atual') + instance.quantidade
+        # Devolve a quantidade total que estava no item.
+        # Sem vincular ao pedido: ele pode estar sendo excluído junto.
+        movimentar_por_pedido(produto.id, instance.quantidade, instance.pedido_id, vincular=False)
+
+# --- ROLLUP DE VENDAS POR PRODUTO (VendaProdutoMensal) ---
+
+CAMPOS_VENDA_ITEM = ('produto_id', 'quantidade', 'largura', 'altura', 'subtotal', 'custo_unitario')
+
+
+def _contribuicao_venda(valores):
+    if not valores or valores['produto_id'] is None:
+        return None
+    por_m2 = Produto.objects.filter(
+        pk=valores['produto_id'], tipo_precificacao=Produto.TipoPrecificacao.METRO_QUADRADO
+    ).exists() if valores['largura'] and valores['altura'] else False
+    return contribuicao_item_pedido(por_m2=por_m2, **valores)
+
+
+@receiver(post_save, sender=ItemPedido)
+def atualizar_vendas_itempedido(sender, instance, created, **kwargs):
+    """
+    Aplica no rollup mensal a diferença entre a contribuição antiga e a nova
+    do item. Re-salvar um item sem mudanças (recalcular_total) não gera escrita.
+    """
+    anterior = getattr(instance, '_venda_anterior', None)
+    atual = {campo: getattr(instance, campo) for campo in CAMPOS_VENDA_ITEM}
+    if anterior == atual:
+        return
+
+    data_criacao = instance.pedido.data_criacao
+    mes = mes_referencia(data_criacao)
+    contribuicao_anterior = _contribuicao_venda(anterior)
+    if contribuicao_anterior:
+        aplicar_venda(anterior['produto_id'], mes, contribuicao_anterior, sinal=-1)
+    contribuicao_atual = _contribuicao_venda(atual)
+    if contribuicao_atual:
+        aplicar_venda(
+            atual['produto_id'], mes, contribuicao_atual, data_venda=timezone.localtime(data_criacao).date()
         )
+    if contribuicao_anterior and anterior['produto_id'] != atual['produto_id']:
+        recalcular_ultima_venda(anterior['produto_id'], mes)
+
+
+@receiver(post_delete, sender=ItemPedido)
+def remover_vendas_itempedido(sender, instance, **kwargs):
+    contribuicao = _contribuicao_venda({campo: getattr(instance, campo) for campo in CAMPOS_VENDA_ITEM})
+    if not contribuicao:
+        return
+    data_criacao = Pedido.objects.filter(pk=instance.pedido_id).values_list('data_criacao', flat=True).first()
+    if data_criacao is None:
+        return
+    mes = mes_referencia(data_criacao)
+    aplicar_venda(instance.produto_id, mes, contribuicao, sinal=-1)
+    recalcular_ultima_venda(instance.produto_id, mes)
+
+
+@receiver(post_init, sender=ItemOrcamento)
+def guardar_produto_itemorcamento(sender, instance, **kwargs):
+    instance._produto_id_anterior = instance.produto_id if instance.pk else None
+
+
+@receiver(post_save, sender=ItemOrcamento)
+def atualizar_orcados_itemorcamento(sender, instance, created, **kwargs):
+    anterior = instance._produto_id_anterior
+    if anterior != instance.produto_id:
+        mes = mes_referencia(instance.orcamento.data_criacao)
+        aplicar_orcamento(anterior, mes, -1)
+        aplicar_orcamento(instance.produto_id, mes, 1)
+    instance._produto_id_anterior = instance.produto_id
+
+
+@receiver(post_delete, sender=ItemOrcamento)
+def remover_orcados_itemorcamento(sender, instance, **kwargs):
+    if instance._produto_id_anterior is None:
+        return
+    data_criacao = Orcamento.objects.filter(pk=instance.orcamento_id).values_list('data_criacao', flat=True).first()
+    if data_criacao is not None:
+        aplicar_orcamento(instance._produto_id_anterior, mes_referencia(data_criacao), -1)
 
 # ---------------------------------------------------
 
@@ -85,6 +176,59 @@ def create_or_update_user_profile(sender, instance, created, **kwargs):
         Profile.objects.get_or_create(user=instance)
 
 
+# --- REVOGAÇÃO DE TOKENS JWT ---
+# Campos do User que estão gravados nas claims do token (ou que devem
+# derrubar as sessões abertas quando mudam).
+CAMPOS_USUARIO_TOKEN = ('password', 'is_active', 'is_superuser', 'username')
+
+@receiver(pre_save, sender=User)
+def guardar_dados_token_usuario(sender, instance, **kwargs):
+    """
+    Guarda os valores antigos dos campos relevantes para o token,
+    para saber no post_save se os tokens emitidos ficaram desatualizados.
+    """
+    if instance.pk:
+        instance._dados_token_anteriores = User.objects.filter(pk=instance.pk).values(*CAMPOS_USUARIO_TOKEN).first()
+    else:
+        instance._dados_token_anteriores = None
+
+@receiver(post_save, sender=User)
+def revogar_tokens_usuario_alterado(sender, instance, created, **kwargs):
+    """
+    Revoga os tokens do usuário quando senha, status ativo, superusuário
+    ou username mudam.
+    """
+    anteriores = getattr(instance, '_dados_token_anteriores', None)
+    if created or not anteriores:
+        return
+    if any(anteriores[campo] != getattr(instance, campo) for campo in CAMPOS_USUARIO_TOKEN):
+        revogar_tokens_usuario(instance.pk)
+
+@receiver(m2m_changed, sender=User.groups.through)
+def revogar_tokens_grupos_alterados(sender, instance, action, reverse, pk_set, **kwargs):
+    """
+    Os grupos ficam gravados no token: qualquer mudança revoga os tokens.
+    """
+    if action not in ('post_add', 'post_remove', 'pre_clear'):
+        return
+    if not reverse:
+        revogar_tokens_usuario(instance.pk)
+        return
+    # Alteração feita pelo lado do Group (group.user_set...)
+    if action == 'pre_clear':
+        pk_set = instance.user_set.values_list('pk', flat=True)
+    for user_id in pk_set or []:
+        revogar_tokens_usuario(user_id)
+
+@receiver(post_delete, sender=Profile)
+def revogar_tokens_usuario_excluido(sender, instance, **kwargs):
+    """
+    Usuário excluído (o Profile vai junto): descarta a versão em cache, e os
+    tokens dele deixam de valer já, não só quando o cache expirar.
+    """
+    revogar_tokens_usuario(instance.user_id)
+
+
 
 @receiver([post_save, post_delete], sender=CustoFornecedorPedido)
 def atualizar_custo_producao_pedido(sender, instance, **kwargs):
@@ -113,14 +257,126 @@ def atualizar_estoque_por_movimentacao(sender, instance, created, **kwargs):
     """
     # Este signal só roda na CRIAÇÃO (created=True)
     # para evitar duplicidade se alguém editar a movimentação.
+    # (As geradas por core/estoque.py usam bulk_create e já aplicam o saldo.)
     if created:
-        produto = instance.produto
-        if produto.estoque_atual is None:
-            # Se o produto for um serviço (sem estoque), inicializa como 0
-            produto.estoque_atual = 0
-        
-        # 'instance.quantidade' já é positivo para entradas e negativo para saídas
-        # Usamos F() para segurança em concorrência
-        Produto.objects.filter(id=produto.id).update(
-            estoque_atual=F('estoque_atual') + instance.quantidade
-        )
\ No newline at end of file
+        # 'instance.quantidade' já é positivo para entradas e negativo para saídas.
+        # Produto sem estoque (serviço) passa a começar do 0.
+        aplicar_no_estoque({instance.produto_id: instance.quantidade})
+
+
+# --- LIVRO DE ESTOQUE: EDIÇÃO DO ESTOQUE NO CADASTRO DO PRODUTO ---
+
+@receiver(pre_save, sender=Produto)
+def guardar_estoque_anterior_produto(sender, instance, update_fields=None, **kwargs):
+    instance._estoque_anterior = None
+    if instance.pk and (update_fields is None or 'estoque_atual' in update_fields):
+        instance._estoque_anterior = Produto.objects.filter(pk=instance.pk).values_list(
+            'estoque_atual', flat=True
+        ).first()
+
+
+@receiver(post_save, sender=Produto)
+def registrar_ajuste_estoque_produto(sender, instance, created, update_fields=None, **kwargs):
+    """
+    Quando o estoque é digitado no cadastro do produto (criação ou edição),
+    registra a diferença no livro sem aplicá-la de novo no produto.
+    """
+    if update_fields is not None and 'estoque_atual' not in update_fields:
+        return
+    diferenca = (instance.estoque_atual or 0) - (getattr(instance, '_estoque_anterior', None) or 0)
+    if diferenca:
+        registrar_movimentacoes([MovimentacaoEstoque(
+            produto=instance,
+            quantidade=diferenca,
+            tipo='AJUSTE_CADASTRO',
+            observacao='Estoque inicial' if created else 'Alterado no cadastro do produto',
+        )], aplicar=False)
+
+
+# --- DERIVADOS DAS ARTES (miniatura, prévia, imagem do PDF) ---
+
+@receiver(post_init, sender=ArtePedido)
+def guardar_layout_arte(sender, instance, **kwargs):
+    instance._layout_anterior = instance.layout.name if instance.pk else None
+
+
+@receiver(pre_save, sender=ArtePedido)
+def limpar_derivados_arte(sender, instance, **kwargs):
+    """
+    Layout trocado: os derivados antigos deixam de valer (a arte volta a
+    usar o original até os novos ficarem prontos).
+    """
+    instance._derivados_antigos = []
+    if instance.pk and instance.layout.name != instance._layout_anterior:
+        # O layout anterior também é liberado (ver core/armazenamento.py)
+        if instance._layout_anterior:
+            instance._derivados_antigos.append(instance._layout_anterior)
+        for campo in RENDICOES:
+            arquivo = getattr(instance, campo)
+            if arquivo:
+                instance._derivados_antigos.append(arquivo.name)
+                setattr(instance, campo, None)
+
+
+@receiver(post_save, sender=ArtePedido)
+def agendar_derivados_arte(sender, instance, created, **kwargs):
+    if created or instance.layout.name != instance._layout_anterior:
+        antigos = instance._derivados_antigos
+        if antigos:
+            transaction.on_commit(lambda: remover_arquivos(antigos))
+        if instance.layout:
+            agendar_derivados(instance.pk)
+    instance._layout_anterior = instance.layout.name
+
+
+@receiver(post_delete, sender=ArtePedido)
+def remover_derivados_arte(sender, instance, **kwargs):
+    nomes = [getattr(instance, campo).name for campo in ['layout', *RENDICOES] if getattr(instance, campo)]
+    if nomes:
+        transaction.on_commit(lambda: remover_arquivos(nomes))
+
+
+# --- ARQUIVOS SUBSTITUÍDOS (logos da Empresa, foto de perfil) ---
+# Com a mídia deduplicada (core/armazenamento.py), o arquivo antigo é
+# liberado quando trocado; só sai do disco se ninguém mais o usa.
+
+CAMPOS_ARQUIVO = {
+    Empresa: ['logo_grande_dashboard', 'logo_pequena_dashboard', 'logo_orcamento_pdf'],
+    Profile: ['profile_pic'],
+}
+
+
+@receiver(pre_save, sender=Empresa)
+@receiver(pre_save, sender=Profile)
+def guardar_arquivos_substituidos(sender, instance, **kwargs):
+    campos = CAMPOS_ARQUIVO[sender]
+    instance._arquivos_substituidos = []
+    anterior = sender.objects.filter(pk=instance.pk).values(*campos).first() if instance.pk else None
+    if anterior:
+        instance._arquivos_substituidos = [
+            anterior[campo] for campo in campos
+            if anterior[campo] and anterior[campo] != getattr(instance, campo).name
+        ]
+
+
+@receiver(post_save, sender=Empresa)
+@receiver(post_save, sender=Profile)
+def liberar_arquivos_substituidos(sender, instance, **kwargs):
+    nomes = getattr(instance, '_arquivos_substituidos', [])
+    if nomes:
+        transaction.on_commit(lambda: remover_arquivos(nomes))
+
+
+@receiver(post_delete, sender=Profile)
+def liberar_arquivos_profile(sender, instance, **kwargs):
+    nomes = [instance.profile_pic.name] if instance.profile_pic else []
+    if nomes:
+        transaction.on_commit(lambda: remover_arquivos(nomes))
+
+
+@receiver([post_save, post_delete], sender=Empresa)
+def invalidar_cache_empresa(sender, instance, **kwargs):
+    """
+    Gatilho para descartar a cópia em cache da Empresa em todos os workers.
+    """
+    invalidar_empresa()
@@ -0,0 +1,194 @@
+import textwrap
+
+from django.conf import settings
+
+from .empresa import obter_empresa
+from .etiquetas import LAYOUTS, RODAPE, CAIXA_LOGO, PT_POR_PX, Bloco, arquivo_logo, contexto_etiqueta
+
+
+# --- Etiqueta da portaria para impressora térmica ---
+# Mesmo layout da etiqueta em PDF (etiquetas.LAYOUTS), gerado como
+# comandos da impressora: ZPL (Zebra, Elgin L42...) ou ESC/POS (bobina de
+# cupom). O arquivo vai direto para a impressora (ex.: lp -o raw), sem PDF
+# nem diálogo de impressão. A logo vira um bitmap de 1 bit, convertido uma
+# vez por arquivo e reaproveitado.
+
+FORMATOS = {
+    # formato: (content type, extensão)
+    'zpl': ('application/vnd.zebra-zpl', 'zpl'),
+    'escpos': ('application/octet-stream', 'bin'),
+}
+
+
+def _pontos(pt):
+    """Medida em pt (1/72") -> pontos da impressora."""
+    return round(pt * settings.ETIQUETA_TERMICA_DPI / 72)
+
+
+def _linhas_bloco(bloco, contexto):
+    if isinstance(bloco.texto, list):
+        return [''.join(t.format(**contexto) for t, _ in bloco.texto)]
+    return bloco.texto.format(**contexto).split('\n')
+
+
+# --- Logo em 1 bit ---
+
+_bitmaps = {}
+
+
+def bitmap_logo(largura_max, altura_max):
+    """
+    Logo em preto e branco (pontilhada) cabendo na caixa, em pontos:
+    (bytes por linha, altura, dados). Cada linha é completada até o byte
+    e o bit 1 é ponto preto, como ZPL e ESC/POS esperam. None sem logo.
+    """
+    caminho = arquivo_logo()
+    if not caminho:
+        return None
+    chave = (caminho, largura_max, altura_max)
+    if chave not in _bitmaps:
+        from PIL import Image, ImageOps
+
+        with Image.open(caminho) as imagem:
+            imagem = imagem.convert('RGBA')
+            fundo = Image.new('RGBA', imagem.size, 'white')
+            imagem = Image.alpha_composite(fundo, imagem).convert('L')
+        imagem.thumbnail((largura_max, altura_max), Image.LANCZOS)
+        bitmap = ImageOps.invert(imagem).convert('1')
+        _bitmaps[chave] = ((bitmap.width + 7) // 8, bitmap.height, bitmap.tobytes())
+    return _bitmaps[chave]
+
+
+# --- ZPL ---
+
+def _zpl_texto(texto):
+    # ^FH_: _XX é um byte em hexadecimal; ^ e ~ são comandos
+    return texto.replace('_', '_5F').replace('^', '_5E').replace('~', '_7E')
+
+
+def _zpl_tracejado(x, y, largura):
+    traco = _pontos(6 * PT_POR_PX)
+    espessura = _pontos(2 * PT_POR_PX)
+    return ''.join(
+        f'^FO{inicio},{y}^GB{min(traco, x + largura - inicio)},{espessura},{espessura}^FS'
+        for inicio in range(x, x + largura, 2 * traco)
+    )
+
+
+def etiqueta_zpl(etiqueta, empresa):
+    contexto = contexto_etiqueta(etiqueta, empresa)
+    dpmm = settings.ETIQUETA_TERMICA_DPI / 25.4
+    largura_total = round(settings.ETIQUETA_ZPL_LARGURA_MM * dpmm)
+    altura_total = round(settings.ETIQUETA_ZPL_ALTURA_MM * dpmm)
+    margem = round(5 * dpmm)
+    largura = largura_total - 2 * margem
+    y = margem
+
+    partes = [f'^XA^CI28^PW{largura_total}^LL{altura_total}^LH0,0']
+
+    def texto(bloco, y):
+        altura = _pontos(bloco.tamanho)
+        alinhamento = 'C' if bloco.centro else 'L'
+        for linha in _linhas_bloco(bloco, contexto):
+            # ^FB quebra a linha longa; a altura ocupada vem de textwrap
+            # pela largura média de um caractere da fonte 0 (~0,5 da altura)
+            quebras = len(textwrap.wrap(linha, max(1, largura * 2 // altura))) or 1
+            partes.append(
+                f'^FO{margem},{y}^A0N,{altura},0^FB{largura},{quebras},0,{alinhamento},0'
+                f'^FH_^FD{_zpl_texto(linha)}^FS'
+            )
+            y += round(altura * 1.15) * quebras
+        return y
+
+    logo = bitmap_logo(_pontos(CAIXA_LOGO[0]), _pontos(CAIXA_LOGO[1]))
+    if logo:
+        por_linha, altura, dados = logo
+        total = por_linha * altura
+        x = margem + (largura - por_linha * 8) // 2
+        partes.append(f'^FO{x},{y}^GFA,{total},{total},{por_linha},{dados.hex().upper()}^FS')
+        y += altura
+    else:
+        y = texto(Bloco('{nome_empresa}', 16, True, None, True, 0), y)
+    y += _pontos(10 * PT_POR_PX)
+    partes.append(_zpl_tracejado(margem, y, largura))
+    y += _pontos(17 * PT_POR_PX)
+
+    layout = LAYOUTS['RETIRADA' if etiqueta.tipo_cliente == 'RETIRADA' else 'CONDOMINIO']
+    for bloco in layout:
+        y = texto(bloco, y + _pontos(bloco.antes))
+
+    rodape = altura_total - margem - _pontos(RODAPE.tamanho * 1.15)
+    partes.append(_zpl_tracejado(margem, rodape - _pontos(12 * PT_POR_PX), largura))
+    texto(RODAPE, rodape)
+
+    partes.append('^XZ\n')
+    return ''.join(partes).encode('utf-8')
+
+
+# --- ESC/POS ---
+
+ESC, GS = b'\x1b', b'\x1d'
+# Página de código PC860 (português): ESC t 3 nas Epson/Elgin/Bematech
+CODEPAGE = ('cp860', 3)
+
+
+def _escpos_logo(por_linha, altura, dados):
+    # GS v 0: imagem raster, largura em bytes e altura em pontos
+    return (
+        GS + b'v0\x00' + por_linha.to_bytes(2, 'little') + altura.to_bytes(2, 'little') + dados
+    )
+
+
+def _avancar(pontos):
+    # ESC J n: avança n pontos (máx. 255 por comando)
+    saida = b''
+    while pontos > 0:
+        saida += ESC + b'J' + bytes([min(pontos, 255)])
+        pontos -= 255
+    return saida
+
+
+def etiqueta_escpos(etiqueta, empresa):
+    contexto = contexto_etiqueta(etiqueta, empresa)
+    colunas = settings.ESCPOS_COLUNAS
+    codificacao, pagina = CODEPAGE
+    partes = [ESC + b'@', ESC + b't' + bytes([pagina]), ESC + b'a\x01']
+
+    def texto(bloco):
+        partes.append(_avancar(_pontos(bloco.antes)))
+        # Fonte A tem 24 pontos (~8,5pt): 12pt sai em 1x, 20pt em 2x, 24pt em 3x
+        escala = min(max(round(bloco.tamanho / 9), 1), 8)
+        partes.append(ESC + b'a' + (b'\x01' if bloco.centro else b'\x00'))
+        partes.append(GS + b'!' + bytes([(escala - 1) << 4 | (escala - 1)]))
+        partes.append(ESC + b'E' + (b'\x01' if bloco.negrito else b'\x00'))
+        for linha in _linhas_bloco(bloco, contexto):
+            for quebrada in textwrap.wrap(linha, colunas // escala) or ['']:
+                partes.append(quebrada.encode(codificacao, 'replace') + b'\n')
+
+    largura_logo = min(_pontos(CAIXA_LOGO[0]), colunas * 12)
+    logo = bitmap_logo(largura_logo, _pontos(CAIXA_LOGO[1]))
+    if logo:
+        partes.append(_escpos_logo(*logo))
+    else:
+        texto(Bloco('{nome_empresa}', 16, True, None, True, 0))
+    partes.append(GS + b'!\x00' + ESC + b'E\x00' + ESC + b'a\x01' + b'- ' * (colunas // 2) + b'\n')
+
+    layout = LAYOUTS['RETIRADA' if etiqueta.tipo_cliente == 'RETIRADA' else 'CONDOMINIO']
+    for bloco in layout:
+        texto(bloco)
+
+    partes.append(GS + b'!\x00' + ESC + b'E\x00' + ESC + b'a\x01' + b'\n' + b'- ' * (colunas // 2) + b'\n')
+    texto(RODAPE)
+    # GS V 66 n: avança até a serrilha e corta
+    partes.append(GS + b'V' + bytes([66, 0]))
+    return b''.join(partes)
+
+
+def gerar_etiquetas_termicas(etiquetas, formato):
+    """
+    Bytes para a impressora com as etiquetas na ordem dada, uma por
+    etiqueta (ZPL) ou com corte entre elas (ESC/POS).
+    """
+    empresa = obter_empresa()
+    gerar = etiqueta_zpl if formato == 'zpl' else etiqueta_escpos
+    return b''.join(gerar(etiqueta, empresa) for etiqueta in etiquetas)
@@ -1,3 +1,866 @@
-from django.test import TestCase
+import asyncio
+import datetime
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from decimal import Decimal
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest import SkipTest, skipUnless
 
-# Create your tests here.
+from django.core.management import CommandError, call_command
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.test import RequestFactory, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import ValidationError
+from rest_framework_simplejwt.tokens import AccessToken
+
+from . import armazenamento, cnpj, uploads
+from .consistencia import verificar_faixa
+from .estoque import anotar_saldo_livro, lote_estoque, saldo_em
+from .conversao import criar_pedidos_de_orcamentos
+from .vendas import reconstruir_vendas_produto
+from .models import (
+    ArtePedido, BlobMidia, Cliente, ConsultaCNPJ, CustoFornecedorPedido, Fornecedor, ItemOrcamento, ItemPedido,
+    MovimentacaoEstoque, Orcamento, Pagamento, Pedido, Produto, SaldoEstoque, UploadArte,
+    VendaProdutoMensal,
+)
+
+try:
+    import requests
+    from moto import mock_aws
+except ImportError:
+    mock_aws = None
+
+
+# --- Consulta de CNPJ (core/cnpj.py) contra um servidor local ---
+
+class _ServidorCNPJ(ThreadingHTTPServer):
+    """
+    Faz o papel da BrasilAPI: responde /<cnpj> com 200 (ou 404 para
+    CNPJs terminados em 0000), depois de 'atraso' segundos.
+    """
+    daemon_threads = True
+
+    def __init__(self):
+        super().__init__(('127.0.0.1', 0), _RespostaCNPJ)
+        self.atraso = 0
+        self.chamadas = 0
+
+    @property
+    def url(self):
+        return f'http://127.0.0.1:{self.server_address[1]}/'
+
+
+class _RespostaCNPJ(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.server.chamadas += 1
+        time.sleep(self.server.atraso)
+        cnpj_pedido = self.path.strip('/')
+        if cnpj_pedido.endswith('0000'):
+            self.send_response(404)
+            self.end_headers()
+            return
+        corpo = json.dumps({'cnpj': cnpj_pedido, 'razao_social': 'GRAFICA TESTE LTDA'}).encode()
+        try:
+            self.send_response(200)
+            self.send_header('Content-Type', 'application/json')
+            self.send_header('Content-Length', str(len(corpo)))
+            self.end_headers()
+            self.wfile.write(corpo)
+        except BrokenPipeError:
+            pass  # o cliente desistiu (teste de timeout)
+
+    def log_message(self, *args):
+        pass
+
+
+class ConsultaCNPJTests(TestCase):
+    CNPJ = '11222333000181'
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.servidor = _ServidorCNPJ()
+        threading.Thread(target=cls.servidor.serve_forever, daemon=True).start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.servidor.shutdown()
+        cls.servidor.server_close()
+        super().tearDownClass()
+
+    def setUp(self):
+        self.servidor.atraso = 0
+        self.servidor.chamadas = 0
+        configuracao = override_settings(CNPJ_API_BASE_URL=self.servidor.url, CNPJ_API_TIMEOUT=2)
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        # O backend guarda a URL: um novo para cada teste
+        cnpj._backend = None
+        self.addCleanup(setattr, cnpj, '_backend', None)
+
+    async def test_primeira_consulta_vai_a_api_e_a_segunda_usa_o_cache(self):
+        status_code, dados, do_cache = await cnpj.consultar_cnpj_async(self.CNPJ)
+        self.assertEqual((status_code, do_cache), (200, False))
+        self.assertEqual(dados['razao_social'], 'GRAFICA TESTE LTDA')
+
+        status_code, dados, do_cache = await cnpj.consultar_cnpj_async(self.CNPJ)
+        self.assertEqual((status_code, do_cache), (200, True))
+        self.assertEqual(self.servidor.chamadas, 1)
+
+    async def test_nao_encontrado_tambem_fica_em_cache(self):
+        self.assertEqual((await cnpj.consultar_cnpj_async('11222333000000'))[:2], (404, None))
+        self.assertEqual(await cnpj.consultar_cnpj_async('11222333000000'), (404, None, True))
+        self.assertEqual(self.servidor.chamadas, 1)
+
+    async def test_cache_vencido_consulta_de_novo(self):
+        await cnpj.consultar_cnpj_async(self.CNPJ)
+        await ConsultaCNPJ.objects.filter(cnpj=self.CNPJ).aupdate(
+            data_consulta=timezone.now() - datetime.timedelta(days=31)
+        )
+        self.assertFalse((await cnpj.consultar_cnpj_async(self.CNPJ))[2])
+        self.assertEqual(self.servidor.chamadas, 2)
+
+    @override_settings(CNPJ_API_TIMEOUT=0.3)
+    async def test_api_lenta_levanta_timeout_e_nao_grava_cache(self):
+        self.servidor.atraso = 1
+        with self.assertRaises(cnpj.TimeoutConsultaCNPJ):
+            await cnpj.consultar_cnpj_async(self.CNPJ)
+        self.assertFalse(await ConsultaCNPJ.objects.filter(cnpj=self.CNPJ).aexists())
+
+    async def test_consultas_simultaneas_ao_mesmo_cnpj_sao_agrupadas(self):
+        self.servidor.atraso = 0.3
+        resultados = await asyncio.gather(*(cnpj.consultar_cnpj_async(self.CNPJ) for _ in range(5)))
+        self.assertEqual(self.servidor.chamadas, 1)
+        self.assertTrue(all(r[0] == 200 and r[2] is False for r in resultados))
+
+
+# --- Envio direto de arte ao bucket (core/uploads.py com MEDIA_STORAGE = 's3') ---
+
+def _png(cor='red'):
+    from PIL import Image
+
+    arquivo = io.BytesIO()
+    Image.new('RGB', (40, 30), cor).save(arquivo, 'PNG')
+    return arquivo.getvalue()
+
+
+@skipUnless(mock_aws, 'moto não instalado')
+@override_settings(
+    MEDIA_STORAGE='s3', AWS_STORAGE_BUCKET_NAME='artes', AWS_S3_ENDPOINT_URL=None,
+    AWS_S3_ENDPOINT_URL_PUBLICO=None, AWS_ACCESS_KEY_ID='teste', AWS_SECRET_ACCESS_KEY='teste',
+)
+class EnvioDiretoS3Tests(TestCase):
+
+    def setUp(self):
+        bucket = mock_aws()
+        bucket.start()
+        self.addCleanup(bucket.stop)
+        # O storage guarda as configurações do bucket: um novo para cada teste
+        armazenamento._armazenamento = None
+        self.addCleanup(setattr, armazenamento, '_armazenamento', None)
+        self.storage = armazenamento.armazenamento_midia()
+        self.storage.bucket.create()
+        self.pedido = Pedido.objects.create(cliente=Cliente.objects.create(nome='Cliente Teste'))
+
+    def _iniciar(self, conteudo, nome_arquivo='arte.png'):
+        upload = UploadArte.objects.create(
+            pedido=self.pedido, nome_arquivo=nome_arquivo, tamanho=len(conteudo),
+            sha256=hashlib.sha256(conteudo).hexdigest(),
+        )
+        return upload, uploads.iniciar_upload(upload)
+
+    def _enviar(self, envio, conteudo):
+        return requests.put(envio['url_envio'], data=conteudo, headers=envio['headers_envio'])
+
+    def _existe(self, nome):
+        # storage.exists() é sempre False com AWS_S3_FILE_OVERWRITE: pergunta ao bucket
+        objetos = self.storage.bucket.objects.filter(Prefix=nome)
+        return any(objeto.key == nome for objeto in objetos)
+
+    def test_url_envio_recebe_o_arquivo_na_chave_por_conteudo(self):
+        conteudo = _png()
+        upload, envio = self._iniciar(conteudo)
+        self.assertEqual(envio['headers_envio']['Content-Type'], 'image/png')
+        self.assertEqual(self._enviar(envio, conteudo).status_code, 200)
+        self.assertTrue(self._existe(uploads.chave_envio_direto(upload)))
+        self.assertTrue(self.storage.conferir_envio(uploads.chave_envio_direto(upload), len(conteudo), upload.sha256))
+
+    def test_conferir_envio_apaga_objeto_que_nao_confere(self):
+        conteudo = _png()
+        upload, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        nome = uploads.chave_envio_direto(upload)
+        self.assertFalse(self.storage.conferir_envio(nome, len(conteudo) + 1, upload.sha256))
+        self.assertFalse(self._existe(nome))
+
+    def test_conferir_envio_nao_apaga_objeto_em_uso(self):
+        conteudo = _png()
+        upload, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        nome = uploads.chave_envio_direto(upload)
+        BlobMidia.objects.create(nome=nome, sha256=upload.sha256, tamanho=len(conteudo), referencias=1)
+        self.assertFalse(self.storage.conferir_envio(nome, len(conteudo) + 1, upload.sha256))
+        self.assertTrue(self._existe(nome))
+
+    def test_concluir_upload_cria_a_arte_com_o_objeto_do_bucket(self):
+        conteudo = _png()
+        upload, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        arte, sha256 = uploads.concluir_upload(upload.pk)
+
+        self.assertEqual(sha256, upload.sha256)
+        self.assertEqual(arte.layout.name, uploads.chave_envio_direto(upload))
+        self.assertEqual(BlobMidia.objects.get(nome=arte.layout.name).referencias, 1)
+        self.assertFalse(UploadArte.objects.filter(pk=upload.pk).exists())
+        self.pedido.refresh_from_db()
+        self.assertEqual(self.pedido.status_arte, Pedido.StatusArte.EM_APROVACAO)
+
+    def test_concluir_upload_sem_objeto_no_bucket_nao_cria_arte(self):
+        upload, _ = self._iniciar(_png())
+        with self.assertRaises(ValidationError):
+            uploads.concluir_upload(upload.pk)
+        self.assertFalse(ArtePedido.objects.exists())
+        self.assertTrue(UploadArte.objects.filter(pk=upload.pk).exists())
+
+    def test_concluir_upload_recusa_arquivo_que_nao_e_imagem(self):
+        conteudo = b'nao sou uma imagem'
+        upload, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        with self.assertRaisesMessage(ValidationError, 'imagem válida'):
+            uploads.concluir_upload(upload.pk)
+        self.assertFalse(ArtePedido.objects.exists())
+        self.assertFalse(BlobMidia.objects.exists())
+
+    def test_cancelar_upload_apaga_objeto_sem_uso(self):
+        conteudo = _png()
+        upload, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        # O objeto sai do bucket depois do commit (ConteudoMixin.delete)
+        with self.captureOnCommitCallbacks(execute=True):
+            uploads.cancelar_upload(upload)
+        self.assertFalse(self._existe(uploads.chave_envio_direto(upload)))
+        self.assertFalse(UploadArte.objects.exists())
+
+    def test_cancelar_upload_mantem_objeto_de_arte_existente(self):
+        conteudo = _png()
+        primeiro, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        uploads.concluir_upload(primeiro.pk)
+
+        # Mesmo arquivo enviado de novo e cancelado: a arte continua com ele
+        segundo, envio = self._iniciar(conteudo)
+        self._enviar(envio, conteudo)
+        with self.captureOnCommitCallbacks(execute=True):
+            uploads.cancelar_upload(segundo)
+        self.assertTrue(self._existe(uploads.chave_envio_direto(segundo)))
+
+
+# --- Etiqueta da portaria: PDF direto (core/etiquetas.py) x template HTML ---
+
+class EtiquetaPDFDiretoTests(TestCase):
+    # Percentual de pixels diferentes (ver comparar_etiqueta._diferenca).
+    # O texto ocupa ~8% da etiqueta e a de condomínio difere da de retirada
+    # em ~5%: acima de 3% já é bloco fora do lugar, não fonte/antialiasing.
+    DIFERENCA_MAXIMA = 3
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        try:
+            import pypdfium2
+            from .pdf import gerar_pdf
+
+            pypdfium2.PdfDocument(gerar_pdf('<p>teste</p>')).close()
+        except Exception:
+            # Sem pypdfium2, sem WeasyPrint ou sem as bibliotecas dele (Pango)
+            raise SkipTest('WeasyPrint ou pypdfium2 indisponível para comparar as etiquetas.')
+
+    def test_versao_direta_confere_com_a_do_template(self):
+        from .documentos import html_documento
+        from .etiquetas import renderizar_etiqueta
+        from .management.commands.comparar_etiqueta import _diferenca, _etiquetas_exemplo
+        from .pdf import gerar_pdf
+
+        request = RequestFactory().get('/')
+        for etiqueta in _etiquetas_exemplo(None):
+            with self.subTest(tipo=etiqueta.tipo_cliente):
+                pdf_html = gerar_pdf(html_documento('etiqueta', etiqueta, request))
+                diferenca = _diferenca(pdf_html, renderizar_etiqueta(etiqueta), 100, None)
+                self.assertLess(diferenca, self.DIFERENCA_MAXIMA)
+
+
+# --- Verificação dos valores calculados (core/consistencia.py) ---
+
+class VerificarConsistenciaTests(TestCase):
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(nome='Cliente Teste')
+        self.produto = Produto.objects.create(nome='Cartão', preco=Decimal('100'), estoque_atual=None)
+
+    def _convertido(self, desconto, frete=0):
+        orcamento = Orcamento.objects.create(
+            cliente=self.cliente, valor_desconto=Decimal(desconto), valor_frete=Decimal(frete)
+        )
+        ItemOrcamento.objects.create(orcamento=orcamento, produto=self.produto, quantidade=2)
+        orcamento.refresh_from_db()
+        return orcamento.gerar_pedido()
+
+    def _divergentes(self, nome):
+        return verificar_faixa(nome)['divergentes']
+
+    def test_pedido_convertido_com_desconto_nao_diverge(self):
+        pedido = self._convertido(20, frete=5)
+        self.assertEqual(pedido.valor_total, Decimal('185'))
+        Pagamento.objects.create(pedido=pedido, valor=Decimal('185'))
+        Pedido.objects.filter(pk=pedido.pk).update(status_pagamento=Pedido.StatusPagamento.PAGO)
+
+        self.assertEqual(self._divergentes('pedido_total'), 0)
+        self.assertEqual(self._divergentes('pedido_status_pagamento'), 0)
+
+    def test_status_pagamento_compara_com_o_total_guardado(self):
+        pedido = self._convertido(20)
+        Pagamento.objects.create(pedido=pedido, valor=Decimal('100'))
+        Pedido.objects.filter(pk=pedido.pk).update(status_pagamento=Pedido.StatusPagamento.PAGO)
+
+        resultado = verificar_faixa('pedido_status_pagamento')
+        self.assertEqual(resultado['exemplos'], [{'id': pedido.pk, 'atual': 'PAGO', 'esperado': 'PARCIAL'}])
+
+    def test_corrigir_recalcula_so_as_divergencias(self):
+        convertido = self._convertido(20)
+        avulso = Pedido.objects.create(cliente=self.cliente)
+        ItemPedido.objects.create(pedido=avulso, produto=self.produto, quantidade=3)
+        CustoFornecedorPedido.objects.create(
+            pedido=avulso, fornecedor=Fornecedor.objects.create(nome='Fornecedor'),
+            descricao='Impressão', custo=Decimal('40'),
+        )
+        Pagamento.objects.create(pedido=avulso, valor=Decimal('300'))
+        # Valores guardados desatualizados (ex.: update direto no banco)
+        Pedido.objects.filter(pk=avulso.pk).update(valor_total=0, custo_producao=0)
+
+        with self.assertRaisesMessage(CommandError, 'divergente'):
+            call_command('verificar_consistencia', stdout=io.StringIO())
+
+        call_command('verificar_consistencia', '--corrigir', stdout=io.StringIO())
+        avulso.refresh_from_db()
+        self.assertEqual(avulso.valor_total, Decimal('300'))
+        self.assertEqual(avulso.custo_producao, Decimal('40'))
+        self.assertEqual(avulso.status_pagamento, Pedido.StatusPagamento.PAGO)
+        convertido.refresh_from_db()
+        self.assertEqual(convertido.valor_total, Decimal('180'))
+        # Tudo corrigido: a verificação seguinte passa
+        call_command('verificar_consistencia', stdout=io.StringIO())
+
+
+# --- Entrega de /media/ com o cookie do access token (core/authentication.py) ---
+
+class MidiaCookieTests(TestCase):
+    LOGO = 'conteudo/ab/cd/logo.png'
+    PRIVADO = 'conteudo/ef/01/arte.png'
+
+    def setUp(self):
+        import tempfile
+        from django.contrib.auth.models import User
+        from .models import Empresa
+
+        pasta = tempfile.TemporaryDirectory()
+        self.addCleanup(pasta.cleanup)
+        configuracao = override_settings(MEDIA_ROOT=pasta.name, MEDIA_ACCEL_REDIRECT='')
+        configuracao.enable()
+        self.addCleanup(configuracao.disable)
+        for nome in (self.LOGO, self.PRIVADO):
+            os.makedirs(os.path.join(pasta.name, os.path.dirname(nome)), exist_ok=True)
+            with open(os.path.join(pasta.name, nome), 'wb') as arquivo:
+                arquivo.write(_png())
+        with self.captureOnCommitCallbacks(execute=True):
+            Empresa.objects.update_or_create(pk=1, defaults={'logo_grande_dashboard': self.LOGO})
+
+        self.user = User.objects.create_user('midia', password='x')
+        vencido = AccessToken.for_user(self.user)
+        vencido.set_exp(from_time=timezone.now() - datetime.timedelta(days=1))
+        self.vencido = str(vencido)
+
+    def _get(self, nome, cookie=None):
+        if cookie:
+            self.client.cookies['access_token'] = cookie
+        return self.client.get(f'/media/{nome}')
+
+    def test_cookie_valido_libera_arquivo_privado(self):
+        self.assertEqual(self._get(self.PRIVADO, str(AccessToken.for_user(self.user))).status_code, 200)
+
+    def test_cookie_vencido_ou_invalido_nao_bloqueia_logo_publica(self):
+        for cookie in (None, self.vencido, 'lixo'):
+            with self.subTest(cookie=(cookie or '')[:10]):
+                self.assertEqual(self._get(self.LOGO, cookie).status_code, 200)
+
+    def test_cookie_vencido_nao_libera_arquivo_privado(self):
+        self.assertEqual(self._get(self.PRIVADO, self.vencido).status_code, 401)
+
+
+# --- Revogação de tokens (core/authentication.py) ---
+
+@override_settings(
+    CACHES={'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache', 'LOCATION': 'tokens'}},
+    JWT_STATELESS_LEITURA=True,
+)
+class RevogacaoTokenTests(TestCase):
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from django.core.cache import cache
+
+        cache.clear()
+        self.user = User.objects.create_user('token', password='x')
+
+    def _autenticar(self, token):
+        from .authentication import JWTStatelessAuthentication
+
+        request = RequestFactory().get('/', HTTP_AUTHORIZATION=f'Bearer {token.access_token}')
+        return JWTStatelessAuthentication().authenticate(request)
+
+    def _token(self):
+        from .authentication import TokenComClaimsSerializer
+
+        return TokenComClaimsSerializer.get_token(self.user)
+
+    def test_token_de_usuario_excluido_nao_vale_mais(self):
+        from rest_framework_simplejwt.exceptions import InvalidToken
+
+        token = self._token()
+        self.assertEqual(self._autenticar(token)[0].id, str(self.user.id))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.delete()
+        with self.assertRaises(InvalidToken):
+            self._autenticar(token)
+
+    def test_usuario_sem_profile_nao_tem_versao_valida(self):
+        from .authentication import SEM_PERFIL, obter_versao_token
+
+        self.assertEqual(obter_versao_token(self.user.id + 1000), SEM_PERFIL)
+
+    def test_senha_trocada_revoga_o_token(self):
+        from rest_framework_simplejwt.exceptions import InvalidToken
+
+        token = self._token()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.user.set_password('outra')
+            self.user.save()
+        with self.assertRaises(InvalidToken):
+            self._autenticar(token)
+        self.assertEqual(self._autenticar(self._token())[0].id, str(self.user.id))
+
+
+# --- Livro de estoque (core/estoque.py) ---
+
+class LivroEstoqueTests(TestCase):
+
+    def setUp(self):
+        self.produto = Produto.objects.create(nome='Adesivo', preco=Decimal('10'), estoque_atual=10)
+        self.pedido = Pedido.objects.create(cliente=Cliente.objects.create(nome='Cliente Teste'))
+
+    def _estoque(self, produto=None):
+        return Produto.objects.values_list('estoque_atual', flat=True).get(pk=(produto or self.produto).pk)
+
+    def _saldo_livro(self):
+        return anotar_saldo_livro(Produto.objects.filter(pk=self.produto.pk)).get().saldo_livro
+
+    def _envelhecer(self, dias):
+        # Movimentações até aqui passam a ter `dias` dias
+        MovimentacaoEstoque.objects.update(data=timezone.now() - datetime.timedelta(days=dias))
+
+    def test_recriar_itens_no_lote_nao_gera_movimentacao(self):
+        ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=3)
+        self.assertEqual(self._estoque(), 7)
+        movimentacoes = MovimentacaoEstoque.objects.count()
+
+        # Como PedidoSerializer.update: apaga os itens e cria de novo
+        with lote_estoque():
+            self.pedido.itens.all().delete()
+            ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=1)
+            ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=2)
+        self.assertEqual(MovimentacaoEstoque.objects.count(), movimentacoes)
+        self.assertEqual(self._estoque(), 7)
+
+        with lote_estoque():
+            self.pedido.itens.all().delete()
+            ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=5)
+        ultima = MovimentacaoEstoque.objects.latest('id')
+        self.assertEqual((ultima.quantidade, ultima.tipo, ultima.pedido_id), (-2, 'SAIDA_VENDA', self.pedido.pk))
+        self.assertEqual(self._estoque(), 5)
+
+    def test_foto_mais_movimentacoes_posteriores_igual_ao_estoque(self):
+        ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=4)
+        self._envelhecer(1)
+        call_command('gerar_saldos_estoque', stdout=io.StringIO())
+        foto = SaldoEstoque.objects.get(produto=self.produto)
+        self.assertEqual(foto.quantidade, 6)
+
+        ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=2)
+        MovimentacaoEstoque.objects.create(produto=self.produto, quantidade=5, tipo='ENTRADA_COMPRA')
+        self.assertEqual(self._estoque(), 9)
+        self.assertEqual(self._saldo_livro(), 9)
+        call_command('conciliar_estoque', stdout=io.StringIO())
+
+        # Uma segunda foto só pega o que mudou desde a primeira
+        self._envelhecer(1)
+        call_command('gerar_saldos_estoque', stdout=io.StringIO())
+        self.assertEqual(
+            list(SaldoEstoque.objects.filter(produto=self.produto).order_by('id').values_list('quantidade', flat=True)),
+            [6, 9]
+        )
+        self.assertEqual(self._saldo_livro(), 9)
+
+    def test_conciliar_corrige_pelo_livro(self):
+        ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=4)
+        Produto.objects.filter(pk=self.produto.pk).update(estoque_atual=50)
+        with self.assertRaises(CommandError):
+            call_command('conciliar_estoque', stdout=io.StringIO())
+        call_command('conciliar_estoque', '--corrigir', stdout=io.StringIO())
+        self.assertEqual(self._estoque(), 6)
+
+    def test_saldo_em_data_passada(self):
+        ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=4)
+        self._envelhecer(10)
+        MovimentacaoEstoque.objects.create(
+            produto=self.produto, quantidade=3, tipo='ENTRADA_COMPRA',
+            data=timezone.now() - datetime.timedelta(days=5),
+        )
+        ItemPedido.objects.create(pedido=self.pedido, produto=self.produto, quantidade=1)
+
+        agora = timezone.now()
+        self.assertEqual(saldo_em(self.produto, agora - datetime.timedelta(days=20)), 0)
+        self.assertEqual(saldo_em(self.produto, agora - datetime.timedelta(days=7)), 6)
+        self.assertEqual(saldo_em(self.produto, agora - datetime.timedelta(days=1)), 9)
+        self.assertEqual(saldo_em(self.produto, agora), 8)
+        self.assertEqual(self._estoque(), 8)
+
+        # Com uma foto no meio do caminho, o saldo passado não muda
+        SaldoEstoque.objects.create(
+            produto=self.produto, quantidade=6, data=agora - datetime.timedelta(days=8),
+            ultima_movimentacao_id=MovimentacaoEstoque.objects.filter(quantidade=-4).get().pk,
+        )
+        self.assertEqual(saldo_em(self.produto, agora - datetime.timedelta(days=7)), 6)
+        self.assertEqual(saldo_em(self.produto, agora), 8)
+
+    def test_produto_sem_estoque_continua_sem_controle(self):
+        servico = Produto.objects.create(nome='Criação de arte', preco=Decimal('50'), estoque_atual=None)
+        item = ItemPedido.objects.create(pedido=self.pedido, produto=servico, quantidade=2)
+        with lote_estoque():
+            item.quantidade = 3
+            item.save()
+        item.delete()
+        self.assertFalse(MovimentacaoEstoque.objects.filter(produto=servico).exists())
+        self.assertIsNone(self._estoque(servico))
+        call_command('conciliar_estoque', stdout=io.StringIO())
+
+
+# --- Rollup mensal de vendas (core/vendas.py) ---
+
+def _rollup():
+    return sorted(VendaProdutoMensal.objects.values_list(
+        'produto_id', 'mes', 'quantidade', 'area_m2', 'receita', 'custo', 'ultima_venda', 'vezes_orcado'
+    ))
+
+
+class RollupVendasTests(TestCase):
+
+    def setUp(self):
+        self.cliente = Cliente.objects.create(nome='Cliente Teste')
+        self.cartao = Produto.objects.create(nome='Cartão', preco=Decimal('0.50'), custo=Decimal('0.20'), estoque_atual=None)
+        self.lona = Produto.objects.create(
+            nome='Lona', preco=Decimal('60'), custo=Decimal('25'), estoque_atual=None,
+            tipo_precificacao=Produto.TipoPrecificacao.METRO_QUADRADO,
+        )
+
+    def assertRollupIgualAoReconstruido(self):
+        incremental = _rollup()
+        reconstruir_vendas_produto()
+        self.assertEqual(incremental, _rollup())
+
+    def test_rollup_incremental_igual_ao_reconstruido(self):
+        agora = timezone.now()
+        pedido = Pedido.objects.create(cliente=self.cliente, data_criacao=agora)
+        antigo = Pedido.objects.create(cliente=self.cliente, data_criacao=agora - datetime.timedelta(days=40))
+        cartoes = ItemPedido.objects.create(pedido=pedido, produto=self.cartao, quantidade=500)
+        banner = ItemPedido.objects.create(
+            pedido=pedido, produto=self.lona, quantidade=2, largura=Decimal('1.5'), altura=Decimal('0.8')
+        )
+        ItemPedido.objects.create(pedido=antigo, produto=self.cartao, quantidade=100)
+        ItemPedido.objects.create(pedido=antigo, produto=None, descricao_customizada='Avulso', subtotal=Decimal('30'))
+        orcamento = Orcamento.objects.create(cliente=self.cliente)
+        orcado = ItemOrcamento.objects.create(orcamento=orcamento, produto=self.cartao, quantidade=1000)
+        ItemOrcamento.objects.create(
+            orcamento=orcamento, produto=self.lona, quantidade=1, largura=Decimal('1'), altura=Decimal('1')
+        )
+        self.assertRollupIgualAoReconstruido()
+
+        # Edição: quantidade, medidas e troca de produto
+        cartoes.quantidade = 1000
+        cartoes.subtotal = Decimal('400')
+        cartoes.save()
+        banner.largura = Decimal('2')
+        banner.save()
+        cartoes.produto = self.lona
+        cartoes.largura, cartoes.altura = Decimal('1'), Decimal('1')
+        cartoes.custo_unitario = self.lona.custo
+        cartoes.save()
+        orcado.produto = self.lona
+        orcado.largura, orcado.altura = Decimal('1'), Decimal('1')
+        orcado.save()
+        self.assertRollupIgualAoReconstruido()
+
+        # Exclusão de item, de orçamento e do pedido inteiro
+        banner.delete()
+        orcamento.delete()
+        antigo.delete()
+        self.assertRollupIgualAoReconstruido()
+        self.assertTrue(VendaProdutoMensal.objects.exists())
+
+
+# --- Conversão de orçamentos em lote (core/conversao.py) ---
+
+class ConversaoOrcamentoTests(TestCase):
+
+    def setUp(self):
+        cliente = Cliente.objects.create(nome='Cliente Teste')
+        self.adesivo = Produto.objects.create(nome='Adesivo', preco=Decimal('2'), custo=Decimal('1'), estoque_atual=100)
+        self.placa = Produto.objects.create(nome='Placa', preco=Decimal('30'), custo=Decimal('12'), estoque_atual=5)
+        lona = Produto.objects.create(
+            nome='Lona', preco=Decimal('60'), custo=Decimal('25'), estoque_atual=None,
+            tipo_precificacao=Produto.TipoPrecificacao.METRO_QUADRADO,
+        )
+        self.orcamentos = []
+        for itens in (
+            [(self.adesivo, 10, None), (self.adesivo, 5, None), (lona, 2, Decimal('1.5')), (self.placa, 1, None)],
+            [(self.placa, 3, None), (None, 1, None)],
+        ):
+            orcamento = Orcamento.objects.create(cliente=cliente, valor_desconto=Decimal('5'))
+            for produto, quantidade, medida in itens:
+                ItemOrcamento.objects.create(
+                    orcamento=orcamento, produto=produto, quantidade=quantidade, largura=medida, altura=medida,
+                    subtotal=None if produto else Decimal('15'), descricao_customizada=None if produto else 'Avulso',
+                )
+            orcamento.refresh_from_db()
+            self.orcamentos.append(orcamento)
+
+    def _converter_item_a_item(self):
+        # Caminho anterior (Orcamento.gerar_pedido): um ItemPedido.create por item, com os signals
+        for orcamento in self.orcamentos:
+            pedido = Pedido.objects.create(
+                cliente=orcamento.cliente, orcamento_origem=orcamento, valor_total=0,
+                status_producao='Aguardando', data_criacao=timezone.now(),
+            )
+            for io in orcamento.itens.all():
+                ItemPedido.objects.create(
+                    pedido=pedido, produto=io.produto, quantidade=io.quantidade, largura=io.largura,
+                    altura=io.altura, descricao_customizada=io.descricao_customizada, subtotal=io.subtotal,
+                )
+            pedido.valor_total = orcamento.valor_total
+            pedido.save(update_fields=['valor_total'])
+
+    def _resultado(self):
+        # Livro por orçamento/produto (o caminho em lote grava uma linha por produto)
+        livro = MovimentacaoEstoque.objects.filter(pedido__isnull=False).values(
+            'pedido__orcamento_origem_id', 'produto_id', 'tipo'
+        ).annotate(total=Sum('quantidade')).order_by('pedido__orcamento_origem_id', 'produto_id')
+        itens = ItemPedido.objects.order_by('pedido__orcamento_origem_id', 'id').values_list(
+            'pedido__orcamento_origem_id', 'produto_id', 'quantidade', 'subtotal', 'custo_unitario'
+        )
+        return {
+            'livro': list(livro),
+            'estoque': list(Produto.objects.order_by('id').values_list('id', 'estoque_atual')),
+            'vendas': _rollup(),
+            'itens': list(itens),
+            'totais': list(Pedido.objects.order_by('orcamento_origem_id').values_list('orcamento_origem_id', 'valor_total')),
+        }
+
+    def test_conversao_em_lote_igual_a_item_a_item(self):
+        with transaction.atomic():
+            self._converter_item_a_item()
+            esperado = self._resultado()
+            transaction.set_rollback(True)
+
+        criar_pedidos_de_orcamentos(self.orcamentos)
+        self.assertEqual(self._resultado(), esperado)
+        self.assertEqual(Produto.objects.get(pk=self.adesivo.pk).estoque_atual, 85)
+        self.assertEqual(Produto.objects.get(pk=self.placa.pk).estoque_atual, 1)
+
+
+# --- Baixa em lote de Contas a Pagar (ContasAPagarPagarView) ---
+
+class ContasAPagarPagarTests(TestCase):
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from rest_framework.test import APIClient
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('financeiro', password='x'))
+        self.pedido = Pedido.objects.create(cliente=Cliente.objects.create(nome='Cliente Teste'))
+        fornecedor = Fornecedor.objects.create(nome='Fornecedor')
+        self.custos = [
+            CustoFornecedorPedido.objects.create(
+                pedido=self.pedido, fornecedor=fornecedor, descricao=descricao, custo=Decimal(custo),
+            )
+            for descricao, custo in (('Impressão', '40'), ('Acabamento', '15'))
+        ]
+
+    def _pagar(self, ids, **extra):
+        return self.client.post('/api/contas-a-pagar/pagar/', {'ids': ids, **extra}, format='json')
+
+    def test_resultado_por_item(self):
+        from .models import Despesa
+
+        a_pagar = Despesa.objects.create(descricao='Aluguel', valor=Decimal('900'), data=datetime.date(2024, 5, 10))
+        paga = Despesa.objects.create(
+            descricao='Luz', valor=Decimal('120'), data=datetime.date(2024, 5, 5),
+            status='PAGO', data_pagamento=datetime.date(2024, 5, 5),
+        )
+        ids = ['x_1', 'd_999999', f'd_{paga.pk}', f'd_{a_pagar.pk}', f'd_{a_pagar.pk}']
+
+        resposta = self._pagar(ids, data_pagamento='2024-05-20')
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data['pagos'], 1)
+        self.assertEqual(resposta.data['resultados'], [
+            {'id': 'x_1', 'pago': False, 'motivo': 'ID inválido.'},
+            {'id': 'd_999999', 'pago': False, 'motivo': 'Não encontrado.'},
+            {'id': f'd_{paga.pk}', 'pago': False, 'motivo': 'Já estava pago.'},
+            {'id': f'd_{a_pagar.pk}', 'pago': True},
+        ])
+        a_pagar.refresh_from_db()
+        self.assertEqual((a_pagar.status, a_pagar.data_pagamento), ('PAGO', datetime.date(2024, 5, 20)))
+        # A conta já paga mantém a data original
+        paga.refresh_from_db()
+        self.assertEqual(paga.data_pagamento, datetime.date(2024, 5, 5))
+
+    def test_custos_do_mesmo_pedido_recalculam_o_custo_producao_uma_vez(self):
+        # custo_producao desatualizado: o update() em lote não passa pelo signal
+        Pedido.objects.filter(pk=self.pedido.pk).update(custo_producao=0)
+
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self._pagar([f'c_{custo.pk}' for custo in self.custos])
+        self.assertEqual(resposta.data['pagos'], 2)
+        self.assertEqual(resposta.data['data_pagamento'], timezone.now().date())
+
+        updates_pedido = [q['sql'] for q in consultas.captured_queries if q['sql'].startswith('UPDATE "core_pedido"')]
+        self.assertEqual(len(updates_pedido), 1)
+        self.pedido.refresh_from_db()
+        self.assertEqual(self.pedido.custo_producao, Decimal('55'))
+        self.assertEqual(
+            set(CustoFornecedorPedido.objects.values_list('status', flat=True)), {'PAGO'}
+        )
+
+    def test_sem_custo_pago_nao_recalcula_pedido(self):
+        CustoFornecedorPedido.objects.filter(pk=self.custos[0].pk).update(status='PAGO')
+        with CaptureQueriesContext(connection) as consultas:
+            resposta = self._pagar([f'c_{self.custos[0].pk}'])
+        self.assertEqual(resposta.data['resultados'], [
+            {'id': f'c_{self.custos[0].pk}', 'pago': False, 'motivo': 'Já estava pago.'},
+        ])
+        self.assertFalse([q for q in consultas.captured_queries if q['sql'].startswith('UPDATE')])
+
+
+# --- Mover cards do Kanban (mover_pedidos_kanban / PedidoKanbanMoverView) ---
+
+class KanbanMoverTests(TestCase):
+
+    def setUp(self):
+        from django.contrib.auth.models import User
+        from rest_framework.test import APIClient
+
+        self.client = APIClient()
+        self.client.force_authenticate(User.objects.create_superuser('producao', password='x'))
+        cliente = Cliente.objects.create(nome='Cliente Teste')
+        self.aguardando = Pedido.objects.create(cliente=cliente, status_producao='Aguardando')
+        self.em_producao = Pedido.objects.create(cliente=cliente, status_producao='Em Produção')
+        self.entregue = Pedido.objects.create(cliente=cliente, status_producao='Entregue')
+
+    def _mover(self, status_producao, pk=None, **extra):
+        url = f'/api/pedidos-kanban/{pk}/mover/' if pk else '/api/pedidos-kanban/mover/'
+        return self.client.post(url, {'status_producao': status_producao, **extra}, format='json')
+
+    def test_mover_um_pedido(self):
+        resposta = self._mover('Em Produção', pk=self.aguardando.pk)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data, {'id': self.aguardando.pk, 'status_producao': 'Em Produção'})
+        self.aguardando.refresh_from_db()
+        self.assertEqual(self.aguardando.status_producao, 'Em Produção')
+        self.assertIsNone(self.aguardando.data_producao)
+
+    def test_um_pedido_inexistente_e_404_e_demais_motivos_400(self):
+        resposta = self._mover('Em Produção', pk=999999)
+        self.assertEqual((resposta.status_code, resposta.data['detail']), (404, 'Pedido não encontrado.'))
+
+        resposta = self._mover('Em Produção', pk=self.em_producao.pk)
+        self.assertEqual((resposta.status_code, resposta.data['detail']), (400, "Pedido já está em 'Em Produção'."))
+
+        resposta = self._mover('Em Produção', pk=self.entregue.pk)
+        self.assertEqual(
+            (resposta.status_code, resposta.data['detail']),
+            (400, "Pedido com status 'Entregue' não está no Kanban."),
+        )
+
+    def test_status_fora_do_kanban_e_400(self):
+        resposta = self._mover('Entregue', pk=self.aguardando.pk)
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('status_producao', resposta.data)
+        resposta = self._mover('Entregue', pedidos=[self.aguardando.pk])
+        self.assertEqual(resposta.status_code, 400)
+        self.aguardando.refresh_from_db()
+        self.assertEqual(self.aguardando.status_producao, 'Aguardando')
+
+    def test_lote_sem_pedidos_e_400(self):
+        resposta = self._mover('Finalizado')
+        self.assertEqual(resposta.status_code, 400)
+        self.assertIn('pedidos', resposta.data)
+
+    def test_mover_em_lote(self):
+        from .signals import status_producao_alterado
+
+        recebidos = []
+
+        def receber(sender, alteracoes, status_novo, **kwargs):
+            recebidos.append((alteracoes, status_novo))
+
+        status_producao_alterado.connect(receber)
+        self.addCleanup(status_producao_alterado.disconnect, receber)
+
+        ids = [self.aguardando.pk, 999999, self.entregue.pk, self.em_producao.pk, self.aguardando.pk]
+        with self.captureOnCommitCallbacks(execute=True):
+            resposta = self._mover('Em Produção', pedidos=ids)
+        self.assertEqual(resposta.status_code, 200)
+        self.assertEqual(resposta.data, {
+            'status_producao': 'Em Produção',
+            'movidos': [self.aguardando.pk],
+            'ignorados': [
+                {'id': 999999, 'motivo': 'Pedido não encontrado.'},
+                {'id': self.entregue.pk, 'motivo': "Pedido com status 'Entregue' não está no Kanban."},
+                {'id': self.em_producao.pk, 'motivo': "Pedido já está em 'Em Produção'."},
+            ],
+        })
+        self.assertEqual(recebidos, [({self.aguardando.pk: 'Aguardando'}, 'Em Produção')])
+
+    def test_data_producao_so_ao_finalizar_e_sem_sobrescrever(self):
+        from .views import mover_pedidos_kanban
+
+        anterior = datetime.date(2024, 3, 1)
+        Pedido.objects.filter(pk=self.em_producao.pk).update(data_producao=anterior)
+
+        movidos, ignorados = mover_pedidos_kanban([self.aguardando.pk, self.em_producao.pk], 'Finalizado')
+        self.assertEqual((movidos, ignorados), ([self.aguardando.pk, self.em_producao.pk], []))
+        self.aguardando.refresh_from_db()
+        self.em_producao.refresh_from_db()
+        self.assertEqual(self.aguardando.data_producao, timezone.localdate())
+        self.assertEqual(self.em_producao.data_producao, anterior)
+
+        # Voltar para outra coluna não mexe na data_producao
+        mover_pedidos_kanban([self.em_producao.pk], 'Aguardando Arte')
+        self.em_producao.refresh_from_db()
+        self.assertEqual(
+            (self.em_producao.status_producao, self.em_producao.data_producao), ('Aguardando Arte', anterior)
+        )
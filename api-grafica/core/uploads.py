@@ -0,0 +1,234 @@
+import hashlib
+import mimetypes
+import os
+import uuid
+
+from django.conf import settings
+from django.core.files import File
+from django.db import transaction
+from rest_framework import status
+from rest_framework.exceptions import APIException, ValidationError
+
+from .armazenamento import armazenamento_midia, armazenamento_remoto, nome_por_conteudo
+from .models import ArtePedido, BlobMidia, UploadArte
+
+BLOCO = 1024 * 1024  # leitura/escrita em blocos de 1 MB: memória constante
+
+
+# --- Upload de arte em partes ---
+# 1. POST   /uploads-arte/                 -> cria o upload (tamanho total, sha256 opcional)
+# 2. PATCH  /uploads-arte/<id>/            -> grava uma parte no offset do header Upload-Offset
+#    GET    /uploads-arte/<id>/            -> offset atual, para continuar depois de uma falha
+# 3. POST   /uploads-arte/<id>/concluir/   -> confere tamanho/hash e cria a ArtePedido
+# Os bytes vão direto do corpo da requisição para um arquivo em
+# UPLOADS_ARTE_DIR, sem passar pelos upload handlers do Django.
+# Com MEDIA_STORAGE = 's3' não há partes: o POST devolve uma URL
+# pré-assinada (url_envio) e o cliente manda o arquivo inteiro direto ao
+# bucket; o concluir confere o objeto e cria a ArtePedido.
+
+class OffsetInvalido(APIException):
+    status_code = status.HTTP_409_CONFLICT
+    default_detail = 'O offset enviado não confere com o que já foi recebido.'
+    default_code = 'offset_invalido'
+
+
+class ParteIncompleta(APIException):
+    status_code = status.HTTP_400_BAD_REQUEST
+    default_detail = 'A parte chegou incompleta. Reenvie a partir do offset atual.'
+    default_code = 'parte_incompleta'
+
+
+def caminho_temporario(upload):
+    return os.path.join(settings.UPLOADS_ARTE_DIR, f'{upload.pk}.part')
+
+
+def chave_envio_direto(upload):
+    return nome_por_conteudo(upload.sha256, upload.nome_arquivo)
+
+
+def iniciar_upload(upload):
+    """
+    Prepara o destino do upload. Retorna os dados extras da resposta:
+    vazio no armazenamento local, {'url_envio', 'headers_envio'} no S3.
+    """
+    if armazenamento_remoto():
+        content_type = mimetypes.guess_type(upload.nome_arquivo)[0] or 'application/octet-stream'
+        url, headers = armazenamento_midia().url_envio(
+            chave_envio_direto(upload), upload.sha256, content_type, settings.AWS_QUERYSTRING_EXPIRE
+        )
+        return {'url_envio': url, 'headers_envio': headers}
+    os.makedirs(settings.UPLOADS_ARTE_DIR, exist_ok=True)
+    open(caminho_temporario(upload), 'wb').close()
+    return {}
+
+
+def _validar_parte(upload, offset, tamanho_parte):
+    if offset != upload.recebido:
+        raise OffsetInvalido(f'Offset esperado: {upload.recebido}.')
+    if tamanho_parte <= 0 or tamanho_parte > settings.UPLOADS_ARTE_PARTE_MAX:
+        raise ValidationError({'detail': f'Cada parte deve ter entre 1 e {settings.UPLOADS_ARTE_PARTE_MAX} bytes.'})
+    if offset + tamanho_parte > upload.tamanho:
+        raise ValidationError({'detail': 'A parte ultrapassa o tamanho declarado do arquivo.'})
+
+
+def _receber_parte(caminho, tamanho_parte, stream, sha256_parte):
+    """
+    Copia a parte do corpo da requisição para um arquivo só dela. Levanta
+    ParteIncompleta (e apaga o arquivo) se faltarem bytes ou o hash não conferir.
+    """
+    hash_parte = hashlib.sha256()
+    gravados = 0
+    try:
+        with open(caminho, 'wb') as destino:
+            while gravados < tamanho_parte:
+                bloco = stream.read(min(BLOCO, tamanho_parte - gravados))
+                if not bloco:
+                    break
+                destino.write(bloco)
+                hash_parte.update(bloco)
+                gravados += len(bloco)
+        if gravados != tamanho_parte:
+            raise ParteIncompleta()
+        if sha256_parte and hash_parte.hexdigest() != sha256_parte.lower():
+            raise ParteIncompleta('O SHA-256 da parte não confere. Reenvie a partir do offset atual.')
+    except BaseException:
+        if os.path.exists(caminho):
+            os.remove(caminho)
+        raise
+
+
+def gravar_parte(upload_id, offset, tamanho_parte, stream, sha256_parte=None):
+    """
+    Grava `tamanho_parte` bytes do stream a partir de `offset`.
+
+    A parte é lida do cliente para um arquivo próprio, sem transação nem
+    trava: um cliente lento não prende conexão do banco nem bloqueia a
+    retentativa. Só depois, com a linha do upload travada, o offset é
+    conferido de novo e a parte é anexada ao arquivo do upload (cópia em
+    disco local). Se outra requisição gravou o mesmo offset antes, esta
+    recebe OffsetInvalido. Retorna o upload atualizado.
+    """
+    if armazenamento_remoto():
+        raise ValidationError({'detail': 'Com armazenamento S3 o arquivo vai direto para a url_envio.'})
+    _validar_parte(UploadArte.objects.get(pk=upload_id), offset, tamanho_parte)
+
+    caminho_parte = f'{caminho_temporario(UploadArte(pk=upload_id))}.{offset}.{uuid.uuid4().hex}'
+    _receber_parte(caminho_parte, tamanho_parte, stream, sha256_parte)
+    try:
+        with transaction.atomic():
+            upload = UploadArte.objects.select_for_update().get(pk=upload_id)
+            _validar_parte(upload, offset, tamanho_parte)
+            with open(caminho_temporario(upload), 'r+b') as destino, open(caminho_parte, 'rb') as parte:
+                destino.seek(offset)
+                destino.truncate()
+                for bloco in iter(lambda: parte.read(BLOCO), b''):
+                    destino.write(bloco)
+                destino.flush()
+                os.fsync(destino.fileno())
+            upload.recebido = offset + tamanho_parte
+            upload.save(update_fields=['recebido', 'atualizado_em'])
+    finally:
+        os.remove(caminho_parte)
+    return upload
+
+
+def sha256_arquivo(caminho):
+    hash_arquivo = hashlib.sha256()
+    with open(caminho, 'rb') as arquivo:
+        for bloco in iter(lambda: arquivo.read(BLOCO), b''):
+            hash_arquivo.update(bloco)
+    return hash_arquivo.hexdigest()
+
+
+class _ArquivoTemporario(File):
+    # Com temporary_file_path() o FileSystemStorage move o arquivo (rename)
+    # em vez de copiá-lo, como faz com os uploads temporários do Django.
+    def temporary_file_path(self):
+        return self.name
+
+
+def _validar_imagem(arquivo):
+    """arquivo: caminho local ou arquivo aberto (ex.: objeto do bucket)."""
+    from PIL import Image
+    try:
+        with Image.open(arquivo) as imagem:
+            imagem.verify()
+    except Exception:
+        raise ValidationError({'detail': 'O arquivo enviado não é uma imagem válida.'})
+
+
+def concluir_upload(upload_id):
+    """
+    Confere o arquivo completo (tamanho, SHA-256 e se é imagem) e cria a
+    ArtePedido com ele como layout, numa transação: ou a arte é criada e o
+    upload some, ou nada muda e o upload pode ser concluído de novo.
+    Retorna (arte, sha256).
+    """
+    with transaction.atomic():
+        upload = UploadArte.objects.select_for_update().select_related('pedido').get(pk=upload_id)
+        if armazenamento_remoto():
+            arte = _concluir_envio_direto(upload)
+            upload.delete()
+            registrar_arte_enviada(upload.pedido)
+            return arte, upload.sha256
+        if upload.recebido != upload.tamanho:
+            raise ValidationError({'detail': f'Faltam bytes: recebido {upload.recebido} de {upload.tamanho}.'})
+        caminho = caminho_temporario(upload)
+        sha256 = sha256_arquivo(caminho)
+        if upload.sha256 and sha256 != upload.sha256.lower():
+            raise ValidationError({'detail': 'O SHA-256 do arquivo não confere com o informado.'})
+        _validar_imagem(caminho)
+
+        arte = ArtePedido(pedido=upload.pedido, comentarios_admin=upload.comentarios_admin)
+        with open(caminho, 'rb') as arquivo:
+            arte.layout.save(os.path.basename(upload.nome_arquivo), _ArquivoTemporario(arquivo, name=caminho), save=False)
+        arte.save()
+        upload.delete()
+        registrar_arte_enviada(upload.pedido)
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    return arte, sha256
+
+
+def _concluir_envio_direto(upload):
+    storage = armazenamento_midia()
+    nome = chave_envio_direto(upload)
+    if not storage.conferir_envio(nome, upload.tamanho, upload.sha256):
+        raise ValidationError({'detail': 'O arquivo não está no bucket ou o tamanho/SHA-256 não confere.'})
+    # A mesma checagem do armazenamento local; o objeto continua no bucket
+    # e sai com cancelar_upload
+    with storage.open(nome, 'rb') as arquivo:
+        _validar_imagem(arquivo)
+    storage.adicionar_referencia(nome, upload.sha256, upload.tamanho)
+    arte = ArtePedido(pedido=upload.pedido, comentarios_admin=upload.comentarios_admin, layout=nome)
+    arte.save()
+    return arte
+
+
+def cancelar_upload(upload):
+    caminho = caminho_temporario(upload)
+    upload.delete()
+    if os.path.exists(caminho):
+        os.remove(caminho)
+    if armazenamento_remoto() and upload.sha256:
+        # Objeto enviado ao bucket mas nunca concluído (e que ninguém usa)
+        nome = chave_envio_direto(upload)
+        em_uso = (
+            BlobMidia.objects.filter(nome=nome).exists()
+            or UploadArte.objects.filter(sha256=upload.sha256).exists()
+        )
+        if not em_uso:
+            armazenamento_midia().delete(nome)
+
+
+def registrar_arte_enviada(pedido):
+    """
+    Pedido com arte nova: fica aguardando aprovação do cliente (e ganha o
+    token da página pública, se ainda não tiver).
+    """
+    update_fields = ['status_arte']
+    if not pedido.token_aprovacao:
+        pedido.token_aprovacao = uuid.uuid4()
+        update_fields.append('token_aprovacao')
+    pedido.status_arte = pedido.StatusArte.EM_APROVACAO
+    pedido.save(update_fields=update_fields)
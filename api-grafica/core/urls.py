@@ -12,18 +12,20 @@ from .views import (
     PedidoViewSet, ItemPedidoViewSet, DashboardStatsView, PagamentoViewSet, 
     DespesaViewSet, DespesaConsolidadaView, VendasRecentesView, FaturamentoPorPagamentoView, 
     RelatorioFaturamentoView, OrcamentoPDFView, PedidoPDFView, EmpresaSettingsView, UserProfileView, 
-    ChangePasswordView, EmpresaPublicaView, EvolucaoVendasView, PedidosPorStatusView,
+    ChangePasswordView, RevogarTokensView, EmpresaPublicaView, EvolucaoVendasView, PedidosPorStatusView,
     ProdutosMaisVendidosView, ClientesMaisAtivosView, RelatorioClientesView, RelatorioPedidosView, RelatorioOrcamentosView,
     RelatorioProdutosView,
-    ArtePedidoViewSet,
-    AprovacaoPedidoViewSet, EtiquetaPortariaViewSet, EtiquetaPDFView, PedidosKanbanView,
+    ArtePedidoViewSet, UploadArteView, UploadArteDetalheView, UploadArteConcluirView,
+    AprovacaoPedidoViewSet, EtiquetaPortariaViewSet, EtiquetaPDFView, PedidosKanbanView, PedidoKanbanMoverView,
     
     FornecedorViewSet, CustoFornecedorPedidoViewSet, RelatorioFornecedoresView,
     
     ConsultaCNPJView,
     PedidoProducaoPDFView,
+    DocumentoPreviaView,
     MovimentacaoEstoqueViewSet,
     ContasAPagarView,
+    ContasAPagarPagarView,
     ContasAReceberView,
     FluxoCaixaView,
 
@@ -57,6 +59,7 @@ urlpatterns = [
 
     path('token/', TokenObtainPairView.as_view(), name='token_obtain_pair'),
     path('token/refresh/', TokenRefreshView.as_view(), name='token_refresh'),
+    path('token/revogar/', RevogarTokensView.as_view(), name='token_revogar'),
     path('public/empresa/', EmpresaPublicaView.as_view(), name='empresa-publica'),
     
     path(
@@ -80,6 +83,10 @@ urlpatterns = [
     path('dashboard-stats/', DashboardStatsView.as_view(), name='dashboard-stats'),
     path('despesas/', DespesaConsolidadaView.as_view(), name='despesa-consolidada'),
     path('contas-a-pagar/', ContasAPagarView.as_view(), name='contas-a-pagar'),
+    path('contas-a-pagar/pagar/', ContasAPagarPagarView.as_view(), name='contas-a-pagar-pagar'),
+    path('uploads-arte/', UploadArteView.as_view(), name='upload-arte'),
+    path('uploads-arte/<uuid:pk>/', UploadArteDetalheView.as_view(), name='upload-arte-detalhe'),
+    path('uploads-arte/<uuid:pk>/concluir/', UploadArteConcluirView.as_view(), name='upload-arte-concluir'),
     path('contas-a-receber/', ContasAReceberView.as_view(), name='contas-a-receber'),
     path('relatorios/fluxo-caixa/', FluxoCaixaView.as_view(), name='relatorio-fluxo-caixa'),
 
@@ -90,7 +97,9 @@ urlpatterns = [
     path('faturamento-por-pagamento/', FaturamentoPorPagamentoView.as_view(), name='faturamento-por-pagamento'),
     path('relatorios/faturamento/', RelatorioFaturamentoView.as_view(), name='relatorio-faturamento'),
     path('orcamentos/<int:pk>/pdf/', OrcamentoPDFView.as_view(), name='orcamento-pdf'),
+    path('orcamentos/<int:pk>/previa/', DocumentoPreviaView.as_view(documento='orcamento'), name='orcamento-previa'),
     path('pedidos/<int:pk>/pdf/', PedidoPDFView.as_view(), name='pedido-pdf'),
+    path('pedidos/<int:pk>/previa/', DocumentoPreviaView.as_view(documento='pedido'), name='pedido-previa'),
     path('pedidos/<int:pk>/pdf/producao/', PedidoProducaoPDFView.as_view(), name='pedido-producao-pdf'),
     path('empresa-settings/', EmpresaSettingsView.as_view(), name='empresa-settings'),
     path('profile/', UserProfileView.as_view(), name='user-profile'),
@@ -106,5 +115,7 @@ urlpatterns = [
     path('relatorios/fornecedores/', RelatorioFornecedoresView.as_view(), name='relatorio-fornecedores'),
     path('etiquetas-portaria/<int:pk>/pdf/', EtiquetaPDFView.as_view(), name='etiqueta-portaria-pdf'),
     path('pedidos-kanban/', PedidosKanbanView.as_view(), name='pedidos-kanban'),
+    path('pedidos-kanban/mover/', PedidoKanbanMoverView.as_view(), name='pedidos-kanban-mover'),
+    path('pedidos-kanban/<int:pk>/mover/', PedidoKanbanMoverView.as_view(), name='pedidos-kanban-mover-detalhe'),
     
 ]
\ No newline at end of file
@@ -0,0 +1,155 @@
+import datetime
+from decimal import Decimal
+
+from django.db.models import Case, Count, DateField, DecimalField, ExpressionWrapper, F, Max, Q, Sum, Value, When
+from django.db.models.functions import Coalesce, Greatest, TruncMonth
+from django.utils import timezone
+
+from .models import ItemOrcamento, ItemPedido, VendaProdutoMensal
+
+ZERO = Decimal('0')
+
+
+# --- Rollup mensal de vendas por produto (VendaProdutoMensal) ---
+# Mantido pelos signals de ItemPedido / ItemOrcamento (core/signals.py).
+# Para reconstruir do zero: python manage.py recalcular_vendas_produto
+
+def mes_referencia(data_hora):
+    """
+    Primeiro dia do mês (no fuso local) de um datetime, igual ao TruncMonth.
+    """
+    return timezone.localtime(data_hora).date().replace(day=1)
+
+
+def contribuicao_item_pedido(produto_id, quantidade, largura, altura, subtotal, custo_unitario, por_m2):
+    """
+    Quanto um ItemPedido soma no rollup: (quantidade, area_m2, receita, custo).
+    O custo usa o custo_unitario gravado no item (custo do produto na venda);
+    em produtos por m² ele é multiplicado pela área, nos demais pela quantidade.
+    """
+    if produto_id is None:
+        return None
+    area = (largura * altura * quantidade) if largura and altura else ZERO
+    base_custo = area if por_m2 and area else quantidade
+    return (quantidade, area, subtotal or ZERO, (custo_unitario or ZERO) * base_custo)
+
+
+def aplicar_venda(produto_id, mes, contribuicao, sinal=1, data_venda=None):
+    """
+    Soma (sinal=1) ou subtrai (sinal=-1) a contribuição de um item no mês.
+    """
+    quantidade, area, receita, custo = contribuicao
+    linha, _ = VendaProdutoMensal.objects.get_or_create(produto_id=produto_id, mes=mes)
+    campos = {
+        'quantidade': F('quantidade') + sinal * quantidade,
+        'area_m2': F('area_m2') + sinal * area,
+        'receita': F('receita') + sinal * receita,
+        'custo': F('custo') + sinal * custo,
+    }
+    if data_venda is not None:
+        campos['ultima_venda'] = Greatest(Coalesce(F('ultima_venda'), Value(data_venda)), Value(data_venda))
+    VendaProdutoMensal.objects.filter(pk=linha.pk).update(**campos)
+    if sinal < 0:
+        _remover_se_vazia(linha.pk)
+
+
+def aplicar_vendas_em_lote(mes, por_produto, data_venda):
+    """
+    Soma no mês as contribuições já agregadas por produto ({produto_id: contribuicao}).
+    As linhas que faltam são criadas num único INSERT (ignore_conflicts cobre
+    uma criação concorrente); depois, um UPDATE por produto.
+    """
+    if not por_produto:
+        return
+    VendaProdutoMensal.objects.bulk_create(
+        [VendaProdutoMensal(produto_id=produto_id, mes=mes) for produto_id in por_produto],
+        ignore_conflicts=True
+    )
+    for produto_id, (quantidade, area, receita, custo) in por_produto.items():
+        VendaProdutoMensal.objects.filter(produto_id=produto_id, mes=mes).update(
+            quantidade=F('quantidade') + quantidade,
+            area_m2=F('area_m2') + area,
+            receita=F('receita') + receita,
+            custo=F('custo') + custo,
+            ultima_venda=Greatest(Coalesce(F('ultima_venda'), Value(data_venda)), Value(data_venda)),
+        )
+
+
+def _remover_se_vazia(pk):
+    # Mantém o rollup igual ao reconstruído: sem linhas zeradas
+    VendaProdutoMensal.objects.filter(pk=pk, quantidade=0, vezes_orcado=0, receita=0, custo=0).delete()
+
+
+def recalcular_ultima_venda(produto_id, mes):
+    """
+    Depois de remover um item, a última venda do mês só pode ser recalculada consultando os itens do mês.
+    """
+    ultima = ItemPedido.objects.filter(
+        produto_id=produto_id,
+        pedido__data_criacao__date__gte=mes,
+        pedido__data_criacao__date__lt=_proximo_mes(mes),
+    ).aggregate(ultima=Max('pedido__data_criacao__date'))['ultima']
+    VendaProdutoMensal.objects.filter(produto_id=produto_id, mes=mes).update(ultima_venda=ultima)
+
+
+def aplicar_orcamento(produto_id, mes, delta):
+    if produto_id is None:
+        return
+    linha, _ = VendaProdutoMensal.objects.get_or_create(produto_id=produto_id, mes=mes)
+    VendaProdutoMensal.objects.filter(pk=linha.pk).update(vezes_orcado=F('vezes_orcado') + delta)
+    if delta < 0:
+        _remover_se_vazia(linha.pk)
+
+
+def _proximo_mes(mes):
+    return (mes.replace(day=28) + datetime.timedelta(days=4)).replace(day=1)
+
+
+def reconstruir_vendas_produto():
+    """
+    Apaga e recria o rollup a partir de todo o histórico, com duas consultas
+    agrupadas por produto/mês (a migração 0021 tem a sua própria cópia,
+    com os modelos históricos).
+    Retorna o número de linhas criadas.
+    """
+    decimal = DecimalField(max_digits=14, decimal_places=4)
+    area = ExpressionWrapper(F('largura') * F('altura') * F('quantidade'), output_field=decimal)
+    com_medidas = Q(largura__gt=0, altura__gt=0)
+    custo = Case(
+        When(com_medidas & Q(produto__tipo_precificacao='M2'), then=F('custo_unitario') * area),
+        default=F('custo_unitario') * F('quantidade'),
+        output_field=decimal,
+    )
+    linhas = {}
+
+    vendas = ItemPedido.objects.filter(produto__isnull=False).annotate(
+        mes=TruncMonth('pedido__data_criacao', output_field=DateField())
+    ).values('produto_id', 'mes').annotate(
+        total_quantidade=Sum('quantidade'),
+        total_area=Sum(Case(When(com_medidas, then=area), default=Value(ZERO), output_field=decimal)),
+        total_receita=Sum('subtotal'),
+        total_custo=Sum(custo),
+        ultima=Max('pedido__data_criacao__date'),
+    ).order_by()
+    for v in vendas:
+        linhas[(v['produto_id'], v['mes'])] = VendaProdutoMensal(
+            produto_id=v['produto_id'], mes=v['mes'],
+            quantidade=v['total_quantidade'] or 0,
+            area_m2=v['total_area'] or ZERO,
+            receita=v['total_receita'] or ZERO,
+            custo=v['total_custo'] or ZERO,
+            ultima_venda=v['ultima'],
+        )
+
+    orcados = ItemOrcamento.objects.filter(produto__isnull=False).annotate(
+        mes=TruncMonth('orcamento__data_criacao', output_field=DateField())
+    ).values('produto_id', 'mes').annotate(total=Count('id')).order_by()
+    for o in orcados:
+        chave = (o['produto_id'], o['mes'])
+        if chave not in linhas:
+            linhas[chave] = VendaProdutoMensal(produto_id=o['produto_id'], mes=o['mes'])
+        linhas[chave].vezes_orcado = o['total']
+
+    VendaProdutoMensal.objects.all().delete()
+    VendaProdutoMensal.objects.bulk_create(linhas.values(), batch_size=1000)
+    return len(linhas)
@@ -1,7 +1,8 @@
 # diegouidev/api-grafica/api-grafica-62138a55777cc50b923f497f7da210ce889488cb/core/views.py
 # (Arquivo Corrigido e Completo)
 
-from rest_framework import viewsets, status, filters
+from rest_framework import viewsets, status, filters, generics
+from rest_framework.pagination import CursorPagination
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework.decorators import action
 from rest_framework.response import Response
@@ -10,15 +11,19 @@ from rest_framework.response import Response
 from rest_framework.permissions import IsAuthenticated
 from .models import Pedido, Despesa, Pagamento, CustoFornecedorPedido
 from django.db import transaction
+from django.conf import settings
 import datetime
 import uuid 
-from django.http import HttpResponse
+from django.http import HttpResponse, JsonResponse
+from django.views import View
+from asgiref.sync import sync_to_async
+from rest_framework.exceptions import AuthenticationFailed
+from rest_framework.authentication import SessionAuthentication
 from django.template.loader import render_to_string
-from weasyprint import HTML, CSS
 from django.shortcuts import get_object_or_404
 from rest_framework.permissions import AllowAny
 from rest_framework.parsers import MultiPartParser, FormParser
-from django.db.models import Avg, Sum, Q, Value, CharField, Max, F, ExpressionWrapper, fields, Count, DecimalField, Case, When
+from django.db.models import Avg, Sum, Q, Value, CharField, Max, F, ExpressionWrapper, fields, Count, DecimalField, Case, When, OuterRef, Subquery
 from django.utils import timezone
 from django.db.models.functions import TruncMonth, Coalesce, TruncDay
 from decimal import Decimal
@@ -26,10 +31,23 @@ from collections import defaultdict
 from django.contrib.auth.models import User, Group
 from django.utils.timezone import now
 
-import requests
 import re
 from itertools import chain 
 
+from .authentication import (
+    JWTStatelessAuthentication, JWTVersionadoAuthentication, JWTCookieAuthentication, revogar_tokens_usuario
+)
+from .midia import normalizar_nome, arquivo_publico, arte_do_token, resposta_midia
+from .empresa import obter_empresa, versao_empresa
+from .cnpj import consultar_cnpj_async, ErroConsultaCNPJ, TimeoutConsultaCNPJ
+from .pdf import resposta_pdf
+from .documentos import DOCUMENTOS, html_documento, html_previa
+from .etiquetas import renderizar_etiqueta
+from .termica import FORMATOS, gerar_etiquetas_termicas
+from .relatorios import executar_consultas
+from .conversao import criar_pedidos_de_orcamentos
+from .uploads import iniciar_upload, gravar_parte, concluir_upload, cancelar_upload, registrar_arte_enviada
+from .signals import status_producao_alterado
 from .permissions import (
     IsAdmin,
     CanAccessFinance,
@@ -44,14 +62,18 @@ from .models import (
     Cliente, Produto, Orcamento, ItemOrcamento, ItemPedido, Empresa,
     ArtePedido, EtiquetaPortaria,
     Fornecedor,
-    MovimentacaoEstoque
+    MovimentacaoEstoque, LancamentoFinanceiro, VendaProdutoMensal, EventoCliente, UploadArte
 )
+from .filters import LancamentoFinanceiroFilter
 # --- Bloco de importação COMPLETO ---
 from .serializers import (
     ClienteSerializer, 
     ClienteRetrieveSerializer, 
+    EventoClienteSerializer,
     ProdutoSerializer, 
     OrcamentoSerializer,
+    OrcamentoConverterLoteSerializer,
+    UploadArteSerializer,
     ItemOrcamentoSerializer, 
     PedidoSerializer, 
     ItemPedidoSerializer, 
@@ -76,8 +98,10 @@ from .serializers import (
     ArtePedidoSerializer, 
     PedidoAprovacaoPublicoSerializer, 
     PedidoRejeicaoSerializer, 
-    EtiquetaPortariaSerializer, 
+    EtiquetaPortariaSerializer,
+    EtiquetaTermicaLoteSerializer,
     PedidoKanbanSerializer,
+    PedidoKanbanMoverSerializer,
     FornecedorSerializer, 
     CustoFornecedorPedidoSerializer,
     RelatorioFornecedorGastoSerializer,
@@ -86,6 +110,7 @@ from .serializers import (
     MovimentacaoEstoqueWriteSerializer, 
     ProdutoDetalhadoSerializer,
     ContasAPagarSerializer,
+    ContasAPagarPagarSerializer,
     ContasAReceberSerializer,
     FluxoCaixaSerializer,
     GroupSerializer,
@@ -108,6 +133,13 @@ def get_date_range(request):
     return start_of_month, today
 
 
+class LinhaDoTempoPagination(CursorPagination):
+    page_size = 20
+    page_size_query_param = 'page_size'
+    max_page_size = 100
+    ordering = ('-data', '-chave')
+
+
 class ClienteViewSet(viewsets.ModelViewSet):
     queryset = Cliente.objects.all().order_by('-data_cadastro')
     serializer_class = ClienteSerializer 
@@ -120,11 +152,20 @@ class ClienteViewSet(viewsets.ModelViewSet):
             return ClienteRetrieveSerializer
         return ClienteSerializer
     
-    def get_queryset(self):
-        queryset = super().get_queryset()
-        if self.action == 'retrieve':
-            queryset = queryset.prefetch_related('pedidos', 'orcamentos')
-        return queryset
+    @action(detail=True, methods=['get'], url_path='linha-do-tempo')
+    def linha_do_tempo(self, request, pk=None):
+        """
+        Orçamentos, pedidos e pagamentos do cliente em ordem cronológica
+        (mais recentes primeiro), paginados por cursor. Filtro: ?tipo=pedido
+        """
+        cliente = self.get_object()
+        eventos = EventoCliente.objects.filter(cliente_id=cliente.pk)
+        tipo = request.query_params.get('tipo')
+        if tipo:
+            eventos = eventos.filter(tipo=tipo)
+        paginator = LinhaDoTempoPagination()
+        pagina = paginator.paginate_queryset(eventos, request, view=self)
+        return paginator.get_paginated_response(EventoClienteSerializer(pagina, many=True).data)
 
 
 class ProdutoViewSet(viewsets.ModelViewSet):
@@ -186,12 +227,22 @@ class CustoFornecedorPedidoViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
+class MovimentacaoEstoquePagination(CursorPagination):
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+    ordering = ('-data', '-id')
+
+
 class MovimentacaoEstoqueViewSet(viewsets.ModelViewSet):
+    # Livro de estoque: só inclusão (correções entram como novas movimentações)
     queryset = MovimentacaoEstoque.objects.all()
     serializer_class = MovimentacaoEstoqueWriteSerializer 
     filter_backends = [DjangoFilterBackend]
-    filterset_fields = ['produto']
+    filterset_fields = ['produto', 'pedido', 'tipo']
     permission_classes = [IsAdminOrProducao]
+    pagination_class = MovimentacaoEstoquePagination
+    http_method_names = ['get', 'post', 'head', 'options']
 
     def get_serializer_class(self):
         if self.action in ['list', 'retrieve']:
@@ -260,6 +311,47 @@ class OrcamentoViewSet(viewsets.ModelViewSet):
         serializer = PedidoSerializer(novo_pedido)
         return Response(serializer.data, status=status.HTTP_201_CREATED)
 
+    @action(detail=False, methods=['post'], url_path='converter-em-lote')
+    def converter_em_lote(self, request):
+        """
+        Aprova e converte vários orçamentos de uma vez.
+        POST {"ids": [1, 2, ...]} -> um pedido por orçamento, numa única transação
+        (itens em bulk_create, um UPDATE de estoque por produto).
+        """
+        serializer = OrcamentoConverterLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+
+        resultados = {}
+        with transaction.atomic():
+            orcamentos = {
+                o.id: o for o in Orcamento.objects.select_for_update().filter(id__in=ids)
+            }
+            ja_convertidos = set(
+                Pedido.objects.filter(orcamento_origem_id__in=orcamentos).values_list('orcamento_origem_id', flat=True)
+            )
+            a_converter = []
+            for orcamento_id in ids:
+                if orcamento_id not in orcamentos:
+                    resultados[orcamento_id] = {'id': orcamento_id, 'convertido': False, 'motivo': 'Não encontrado.'}
+                elif orcamento_id in ja_convertidos:
+                    resultados[orcamento_id] = {
+                        'id': orcamento_id, 'convertido': False, 'motivo': 'Já foi convertido em pedido.'
+                    }
+                else:
+                    a_converter.append(orcamentos[orcamento_id])
+
+            for pedido in criar_pedidos_de_orcamentos(a_converter):
+                resultados[pedido.orcamento_origem_id] = {
+                    'id': pedido.orcamento_origem_id, 'convertido': True, 'pedido_id': pedido.id
+                }
+            Orcamento.objects.filter(id__in=[o.id for o in a_converter]).update(status='Aprovado')
+
+        return Response({
+            'convertidos': len(a_converter),
+            'resultados': [resultados[orcamento_id] for orcamento_id in ids],
+        })
+
 class ItemOrcamentoViewSet(viewsets.ModelViewSet):
     queryset = ItemOrcamento.objects.all()
     serializer_class = ItemOrcamentoSerializer
@@ -294,12 +386,70 @@ class ArtePedidoViewSet(viewsets.ModelViewSet):
     def perform_create(self, serializer):
         pedido = serializer.validated_data['pedido']
         serializer.save()
-        update_fields = ['status_arte']
-        if not pedido.token_aprovacao:
-            pedido.token_aprovacao = uuid.uuid4()
-            update_fields.append('token_aprovacao')
-        pedido.status_arte = Pedido.StatusArte.EM_APROVACAO
-        pedido.save(update_fields=update_fields)
+        registrar_arte_enviada(pedido)
+
+
+# --- Upload de arte em partes (ver core/uploads.py) ---
+
+class UploadArteView(APIView):
+    """
+    POST {"pedido", "nome_arquivo", "tamanho", "sha256" (opcional), "comentarios_admin"}
+    Inicia um upload; as partes vão para /uploads-arte/<id>/. Com
+    armazenamento S3 o sha256 é obrigatório e a resposta traz url_envio e
+    headers_envio para um único PUT direto no bucket.
+    """
+    permission_classes = [CanAccessPedidos]
+
+    def post(self, request, *args, **kwargs):
+        serializer = UploadArteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        upload = serializer.save(usuario=request.user)
+        dados = UploadArteSerializer(upload).data
+        dados.update(iniciar_upload(upload))
+        return Response(dados, status=status.HTTP_201_CREATED)
+
+
+class UploadArteDetalheView(APIView):
+    """
+    GET    -> estado do upload (recebido = offset para continuar)
+    PATCH  -> corpo = bytes da parte; header Upload-Offset obrigatório,
+              Upload-Checksum (sha256 hex da parte) opcional
+    DELETE -> cancela e apaga o arquivo temporário
+    """
+    permission_classes = [CanAccessPedidos]
+
+    def get(self, request, pk, *args, **kwargs):
+        upload = get_object_or_404(UploadArte, pk=pk)
+        return Response(UploadArteSerializer(upload).data)
+
+    def patch(self, request, pk, *args, **kwargs):
+        get_object_or_404(UploadArte, pk=pk)
+        try:
+            offset = int(request.headers['Upload-Offset'])
+            tamanho_parte = int(request.META.get('CONTENT_LENGTH') or 0)
+        except (KeyError, ValueError):
+            return Response(
+                {'detail': 'Informe o header Upload-Offset e o Content-Length da parte.'},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+        # request.stream lê direto do socket: o corpo não é carregado em memória
+        upload = gravar_parte(pk, offset, tamanho_parte, request.stream, request.headers.get('Upload-Checksum'))
+        return Response(UploadArteSerializer(upload).data)
+
+    def delete(self, request, pk, *args, **kwargs):
+        cancelar_upload(get_object_or_404(UploadArte, pk=pk))
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class UploadArteConcluirView(APIView):
+    permission_classes = [CanAccessPedidos]
+
+    def post(self, request, pk, *args, **kwargs):
+        get_object_or_404(UploadArte, pk=pk)
+        arte, sha256 = concluir_upload(pk)
+        dados = ArtePedidoSerializer(arte, context={'request': request}).data
+        dados['sha256'] = sha256
+        return Response(dados, status=status.HTTP_201_CREATED)
 
 
 class AprovacaoPedidoViewSet(viewsets.ReadOnlyModelViewSet):
@@ -377,59 +527,127 @@ class DespesaViewSet(viewsets.ModelViewSet):
         return Response(serializer.data, status=status.HTTP_200_OK)
 
 
-class DespesaConsolidadaView(APIView):
+class LancamentoCursorPagination(CursorPagination):
+    """
+    Paginação por cursor (keyset) para a view LancamentoFinanceiro:
+    o custo de cada página não cresce com o histórico.
+    """
+    page_size = 50
+    page_size_query_param = 'page_size'
+    max_page_size = 500
+
+
+class LancamentoFinanceiroListView(generics.ListAPIView):
+    """
+    Base das listagens financeiras servidas pela view SQL LancamentoFinanceiro.
+    Filtros: data_inicio, data_fim, status, categoria, origem.
+    Ordenação: ?ordering=data|-data|valor|-valor.
+    Paginação: só quando o cliente pede (?page_size= ou ?cursor=);
+    sem esses parâmetros devolve a lista completa, como antes.
+    """
     permission_classes = [CanAccessFinance]
-    
-    def get(self, request, *args, **kwargs):
-        despesas_gerais = Despesa.objects.annotate(tipo=Value('Geral', output_field=CharField())).values('id', 'descricao', 'valor', 'data', 'categoria', 'tipo')
-        custos_producao = Pedido.objects.filter(custo_producao__gt=0).annotate(tipo=Value('Produção', output_field=CharField())).values('id', 'custo_producao', 'data_criacao', 'tipo', 'cliente__nome')
-        custos_formatados = [{'id': f"p_{custo['id']}", 'descricao': f"Custo do Pedido #{custo['id']} ({custo['cliente__nome']})", 'valor': custo['custo_producao'], 'data': custo['data_criacao'].date(), 'categoria': 'Custo de Produção', 'tipo': custo['tipo']} for custo in custos_producao]
-        lista_combinada = sorted(list(despesas_gerais) + custos_formatados, key=lambda x: x['data'], reverse=True)
-        serializer = DespesaConsolidadaSerializer(lista_combinada, many=True)
-        return Response(serializer.data)
+    filter_backends = [DjangoFilterBackend, filters.OrderingFilter]
+    filterset_class = LancamentoFinanceiroFilter
+    ordering_fields = ['data', 'valor']
+    pagination_class = LancamentoCursorPagination
+    origens = []
+
+    def get_queryset(self):
+        return LancamentoFinanceiro.objects.filter(origem__in=self.origens)
+
+    def paginate_queryset(self, queryset):
+        params = self.request.query_params
+        if 'cursor' not in params and 'page_size' not in params:
+            return None
+        return super().paginate_queryset(queryset)
+
+
+class DespesaConsolidadaView(LancamentoFinanceiroListView):
+    origens = [LancamentoFinanceiro.Origem.DESPESA, LancamentoFinanceiro.Origem.PEDIDO]
+    serializer_class = DespesaConsolidadaSerializer
+    ordering = ['-data', 'chave']
 
 
-class ContasAPagarView(APIView):
+class ContasAPagarView(LancamentoFinanceiroListView):
+    origens = [LancamentoFinanceiro.Origem.DESPESA, LancamentoFinanceiro.Origem.CUSTO]
+    serializer_class = ContasAPagarSerializer
+    ordering = ['data', 'chave']
+
+    def get_queryset(self):
+        return super().get_queryset().filter(status='A PAGAR')
+
+
+REGEX_ID_CONTA = re.compile(r'^([dc])_(\d+)$')
+
+
+class ContasAPagarPagarView(APIView):
+    """
+    Baixa em lote de Contas a Pagar.
+    POST {"ids": ["d_10", "c_5", ...], "data_pagamento": "YYYY-MM-DD" (opcional, padrão hoje)}
+    Um UPDATE por tabela, numa única transação; devolve o resultado de cada item.
+    """
     permission_classes = [CanAccessFinance]
-    
-    def get(self, request, *args, **kwargs):
-        despesas_a_pagar = Despesa.objects.filter(status='A PAGAR')
-        custos_a_pagar = CustoFornecedorPedido.objects.filter(status='A PAGAR') \
-                                                    .select_related('fornecedor', 'pedido')
-        lista_formatada = []
-        
-        for d in despesas_a_pagar:
-            lista_formatada.append({
-                'id': f"d_{d.id}",
-                'tipo': 'Despesa Geral',
-                'descricao': f"{d.descricao} ({d.categoria or 'Sem categoria'})",
-                'valor': d.valor,
-                'data_vencimento': d.data, 
-                'status': d.status,
-                'endpoint_type': 'despesas-gerais',
-                'original_id': d.id
-            })
-            
-        for c in custos_a_pagar:
-            lista_formatada.append({
-                'id': f"c_{c.id}",
-                'tipo': 'Custo de Produção',
-                'descricao': f"{c.descricao} (Fornecedor: {c.fornecedor.nome}) - Pedido #{c.pedido.id}",
-                'valor': c.custo,
-                'data_vencimento': c.data_vencimento or c.data_criacao.date(), 
-                'status': c.status,
-                'endpoint_type': 'custos-pedido',
-                'original_id': c.id
-            })
 
-        lista_ordenada = sorted(lista_formatada, key=lambda x: x['data_vencimento'])
-        
-        serializer = ContasAPagarSerializer(lista_ordenada, many=True)
-        return Response(serializer.data)
+    def post(self, request, *args, **kwargs):
+        serializer = ContasAPagarPagarSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        data_pagamento = serializer.validated_data.get('data_pagamento') or timezone.now().date()
+
+        resultados = {}
+        por_tabela = {'d': {}, 'c': {}}
+        for chave in ids:
+            match = REGEX_ID_CONTA.match(chave)
+            if match:
+                por_tabela[match.group(1)][int(match.group(2))] = chave
+            else:
+                resultados[chave] = {'id': chave, 'pago': False, 'motivo': 'ID inválido.'}
+
+        with transaction.atomic():
+            for prefixo, modelo in (('d', Despesa), ('c', CustoFornecedorPedido)):
+                chaves = por_tabela[prefixo]
+                if not chaves:
+                    continue
+                atuais = dict(
+                    modelo.objects.select_for_update()
+                    .filter(id__in=chaves)
+                    .values_list('id', 'status')
+                )
+                a_pagar = []
+                for original_id, chave in chaves.items():
+                    if original_id not in atuais:
+                        resultados[chave] = {'id': chave, 'pago': False, 'motivo': 'Não encontrado.'}
+                    elif atuais[original_id] == 'PAGO':
+                        resultados[chave] = {'id': chave, 'pago': False, 'motivo': 'Já estava pago.'}
+                    else:
+                        a_pagar.append(original_id)
+                        resultados[chave] = {'id': chave, 'pago': True}
+
+                if a_pagar:
+                    modelo.objects.filter(id__in=a_pagar).update(status='PAGO', data_pagamento=data_pagamento)
+
+            # O update() não dispara o signal de CustoFornecedorPedido:
+            # recalcula uma vez o custo_producao de cada pedido afetado.
+            custos_pagos = [i for i, c in por_tabela['c'].items() if resultados[c]['pago']]
+            if custos_pagos:
+                total_custos = CustoFornecedorPedido.objects.filter(
+                    pedido=OuterRef('pk')
+                ).values('pedido').annotate(total=Sum('custo')).values('total')
+                Pedido.objects.filter(
+                    id__in=CustoFornecedorPedido.objects.filter(id__in=custos_pagos).values('pedido_id')
+                ).update(custo_producao=Coalesce(Subquery(total_custos), Value(0), output_field=DecimalField()))
+
+        itens = [resultados[chave] for chave in ids]
+        return Response({
+            'data_pagamento': data_pagamento,
+            'pagos': sum(1 for item in itens if item['pago']),
+            'resultados': itens,
+        })
 
 
 class DashboardStatsView(APIView):
     permission_classes = [CanAccessFinance]
+    authentication_classes = [JWTStatelessAuthentication]
     
     def get(self, request, *args, **kwargs):
         data_inicio, data_fim = get_date_range(request)
@@ -493,6 +711,7 @@ class PagamentoViewSet(viewsets.ModelViewSet):
 
 class VendasRecentesView(APIView):
     permission_classes = [CanAccessPedidos]
+    authentication_classes = [JWTStatelessAuthentication]
     
     def get(self, request, *args, **kwargs):
         ultimos_pedidos = Pedido.objects.all().order_by('-data_criacao')[:5]
@@ -502,6 +721,7 @@ class VendasRecentesView(APIView):
 
 class FaturamentoPorPagamentoView(APIView):
     permission_classes = [CanAccessFinance]
+    authentication_classes = [JWTStatelessAuthentication]
     
     def get(self, request, *args, **kwargs):
         data_inicio, data_fim = get_date_range(request)
@@ -611,10 +831,7 @@ class RelatorioFaturamentoView(APIView):
             'data_fim': data_fim.strftime('%d/%m/%Y'),
         }
         html_string = render_to_string('relatorios/faturamento.html', context)
-        pdf = HTML(string=html_string).write_pdf()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="relatorio_faturamento_{data_inicio_str}_a_{data_fim_str}.pdf"'
-        return response
+        return resposta_pdf(html_string, f"relatorio_faturamento_{data_inicio_str}_a_{data_fim_str}.pdf")
     
 
 class OrcamentoPDFView(APIView):
@@ -622,57 +839,31 @@ class OrcamentoPDFView(APIView):
     
     def get(self, request, pk, *args, **kwargs):
         orcamento = get_object_or_404(Orcamento, pk=pk)
-        empresa = Empresa.objects.first()
-        logo_url = None
-        if empresa and empresa.logo_orcamento_pdf:
-            logo_url = request.build_absolute_uri(empresa.logo_orcamento_pdf.url)
-        itens = orcamento.itens.all()
-        for item in itens:
-            if item.quantidade > 0:
-                item.valor_unitario = item.subtotal / item.quantidade
-            else:
-                item.valor_unitario = 0
-        context = {
-            'orcamento': orcamento,
-            'itens': itens,
-            'empresa': empresa,
-            'logo_url': logo_url
-        }
-        html_string = render_to_string('documentos/orcamento_pdf.html', context)
-        pdf = HTML(string=html_string).write_pdf()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="orcamento_{pk}.pdf"'
-        return response
+        html_string = html_documento('orcamento', orcamento, request)
+        return resposta_pdf(html_string, f"orcamento_{pk}.pdf")
 
 class PedidoPDFView(APIView):
     permission_classes = [CanAccessPedidos]
     
     def get(self, request, pk, *args, **kwargs):
         pedido = get_object_or_404(Pedido, pk=pk)
-        empresa = Empresa.objects.first()
-        logo_url = None
-        if empresa and empresa.logo_orcamento_pdf:
-            logo_url = request.build_absolute_uri(empresa.logo_orcamento_pdf.url)
-        itens = pedido.itens.all()
-        for item in itens:
-            if item.quantidade > 0:
-                item.valor_unitario = item.subtotal / item.quantidade
-            else:
-                item.valor_unitario = 0
+        html_string = html_documento('pedido', pedido, request)
+        return resposta_pdf(html_string, f"pedido_os_{pk}.pdf")
 
-        is_paid = pedido.status_pagamento == 'PAGO' 
 
-        context = {
-            'pedido': pedido,
-            'itens': itens,
-            'empresa': empresa,
-            'logo_url': logo_url,
-            'is_paid': is_paid, 
-        }
-        html_string = render_to_string('documentos/pedido_os_pdf.html', context)
-        pdf = HTML(string=html_string).write_pdf()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="pedido_os_{pk}.pdf"'
+class DocumentoPreviaView(APIView):
+    """
+    Pré-visualização em HTML do orçamento/OS (core/documentos.html_previa).
+    Aceita o token no cookie para abrir direto numa aba do navegador.
+    """
+    permission_classes = [CanAccessPedidos]
+    authentication_classes = [JWTVersionadoAuthentication, JWTCookieAuthentication, SessionAuthentication]
+    documento = None
+
+    def get(self, request, pk, *args, **kwargs):
+        objeto = get_object_or_404(DOCUMENTOS[self.documento].modelo, pk=pk)
+        response = HttpResponse(html_previa(self.documento, objeto, request), content_type='text/html; charset=utf-8')
+        response['Cache-Control'] = 'private, no-store'
         return response
 
 
@@ -681,31 +872,9 @@ class PedidoProducaoPDFView(APIView):
     
     def get(self, request, pk, *args, **kwargs):
         pedido = get_object_or_404(Pedido, pk=pk)
-        empresa = Empresa.objects.first()
-        logo_url = None
-        if empresa and empresa.logo_orcamento_pdf:
-            logo_url = request.build_absolute_uri(empresa.logo_orcamento_pdf.url)
-        
-        arte_url = None
-        if pedido.status_arte == Pedido.StatusArte.APROVADO:
-            arte = pedido.artes.order_by('-data_upload').first()
-            if arte and arte.layout:
-                arte_url = request.build_absolute_uri(arte.layout.url)
-        
-        context = {
-            'pedido': pedido,
-            'itens': pedido.itens.all(),
-            'empresa': empresa,
-            'logo_url': logo_url,
-            'arte_url': arte_url, 
-        }
-        
-        html_string = render_to_string('documentos/pedido_os_producao.html', context)
-        
-        pdf = HTML(string=html_string).write_pdf()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="os_producao_{pk}.pdf"'
-        return response
+        # Arte e logo já reduzidas para o tamanho na página (core/documentos.py)
+        html_string = html_documento('producao', pedido, request)
+        return resposta_pdf(html_string, f"os_producao_{pk}.pdf")
 
 
 class EmpresaSettingsView(APIView):
@@ -723,8 +892,7 @@ class EmpresaSettingsView(APIView):
         return super().get_permissions()
 
     def get(self, request, *args, **kwargs):
-        empresa, created = Empresa.objects.get_or_create(pk=1)
-        serializer = EmpresaSerializer(empresa)
+        serializer = EmpresaSerializer(obter_empresa())
         return Response(serializer.data)
     
     def put(self, request, *args, **kwargs):
@@ -774,49 +942,97 @@ class ChangePasswordView(APIView):
         return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
     
 
+class RevogarTokensView(APIView):
+    """
+    Encerra todas as sessões do usuário logado (revoga todos os tokens emitidos).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request, *args, **kwargs):
+        revogar_tokens_usuario(request.user.id)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+
+
+class MidiaView(APIView):
+    """
+    Entrega de /media/ com verificação de permissão (ver core/midia.py).
+    """
+    permission_classes = [AllowAny]
+    authentication_classes = [JWTVersionadoAuthentication, JWTCookieAuthentication, SessionAuthentication]
+
+    def get(self, request, nome, *args, **kwargs):
+        nome = normalizar_nome(nome)
+        if arquivo_publico(nome):
+            return resposta_midia(nome, publico=True)
+        token = request.query_params.get('token')
+        if request.user.is_authenticated or (token and arte_do_token(nome, token)):
+            return resposta_midia(nome)
+        self.permission_denied(request)
+
+
 class EmpresaPublicaView(APIView):
     permission_classes = [AllowAny]
+    authentication_classes = []
     def get(self, request, *args, **kwargs):
-        empresa, created = Empresa.objects.get_or_create(pk=1)
-        serializer = EmpresaPublicaSerializer(empresa)
-        return Response(serializer.data)
+        empresa = obter_empresa()
+        # O ETag é o carimbo de versão da Empresa: muda a cada save
+        etag = f'"{versao_empresa()}"'
+        if request.headers.get('If-None-Match') == etag:
+            response = Response(status=status.HTTP_304_NOT_MODIFIED)
+        else:
+            serializer = EmpresaPublicaSerializer(empresa)
+            response = Response(serializer.data)
+        response['ETag'] = etag
+        response['Cache-Control'] = 'public, max-age=300'
+        return response
     
 
-class ConsultaCNPJView(APIView):
-    permission_classes = [IsAuthenticated] 
+class ConsultaCNPJView(View):
+    """
+    View assíncrona (o DRF não suporta views async, por isso é uma View do
+    Django). Servida pelo worker ASGI (app/asgi.py), a espera pela API
+    externa não prende um worker síncrono.
+    """
+
+    async def get(self, request, cnpj, *args, **kwargs):
+        try:
+            autenticado = await sync_to_async(JWTStatelessAuthentication().authenticate)(request)
+        except AuthenticationFailed as e:
+            detalhe = e.detail if isinstance(e.detail, dict) else {"detail": e.detail}
+            return JsonResponse(detalhe, status=status.HTTP_401_UNAUTHORIZED)
+        if autenticado is None:
+            return JsonResponse(
+                {"detail": "As credenciais de autenticação não foram fornecidas."},
+                status=status.HTTP_401_UNAUTHORIZED
+            )
 
-    def get(self, request, cnpj, *args, **kwargs):
         cnpj_limpo = re.sub(r'\D', '', cnpj)
         if len(cnpj_limpo) != 14:
-            return Response(
+            return JsonResponse(
                 {"error": "CNPJ deve conter 14 dígitos."},
                 status=status.HTTP_400_BAD_REQUEST
             )
-        url = f"https://brasilapi.com.br/api/cnpj/v1/{cnpj_limpo}"
         try:
-            response = requests.get(url, timeout=5) 
-            if response.status_code == 200:
-                return Response(response.json(), status=status.HTTP_200_OK)
-            elif response.status_code == 404:
-                return Response(
-                    {"error": "CNPJ não encontrado na base de dados da Receita Federal."},
-                    status=status.HTTP_404_NOT_FOUND
-                )
-            else:
-                return Response(
-                    {"error": "Erro ao consultar a API externa."},
-                    status=status.HTTP_500_INTERNAL_SERVER_ERROR
-                )
-        except requests.exceptions.Timeout:
-            return Response(
+            status_code, dados, do_cache = await consultar_cnpj_async(cnpj_limpo)
+        except TimeoutConsultaCNPJ:
+            return JsonResponse(
                 {"error": "A consulta ao CNPJ demorou muito (timeout)."},
                 status=status.HTTP_408_REQUEST_TIMEOUT
             )
-        except requests.exceptions.RequestException as e:
-            return Response(
+        except ErroConsultaCNPJ as e:
+            return JsonResponse(
                 {"error": f"Erro de conexão ao consultar CNPJ: {e}"},
                 status=status.HTTP_500_INTERNAL_SERVER_ERROR
             )
+        if status_code == 404:
+            response = JsonResponse(
+                {"error": "CNPJ não encontrado na base de dados da Receita Federal."},
+                status=status.HTTP_404_NOT_FOUND
+            )
+        else:
+            response = JsonResponse(dados, status=status.HTTP_200_OK, safe=False)
+        response['X-Cache'] = 'HIT' if do_cache else 'MISS'
+        return response
 
 
 class UserManagementViewSet(viewsets.ModelViewSet):
@@ -841,6 +1057,7 @@ class GroupsView(APIView):
 
 class EvolucaoVendasView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         seis_meses_atras = now().date().replace(day=1) - datetime.timedelta(days=30*5)
         vendas = Pedido.objects.filter(
@@ -859,6 +1076,7 @@ class EvolucaoVendasView(APIView):
 
 class PedidosPorStatusView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         status_counts = Pedido.objects.values('status_producao').annotate(
             value=Count('id')
@@ -872,12 +1090,14 @@ class PedidosPorStatusView(APIView):
 
 class ProdutosMaisVendidosView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         today = datetime.date.today()
         start_of_month = today.replace(day=1)
-        produtos = ItemPedido.objects.filter(pedido__data_criacao__gte=start_of_month)\
+        produtos = VendaProdutoMensal.objects.filter(mes=start_of_month)\
             .values('produto__nome')\
             .annotate(total_vendido=Sum('quantidade'))\
+            .filter(total_vendido__gt=0)\
             .order_by('-total_vendido')[:5]
         data_formatada = [
             {"name": item['produto__nome'], "value": item['total_vendido']}
@@ -887,6 +1107,7 @@ class ProdutosMaisVendidosView(APIView):
 
 class ClientesMaisAtivosView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         clientes = Pedido.objects.values('cliente__nome')\
             .annotate(
@@ -907,6 +1128,7 @@ class ClientesMaisAtivosView(APIView):
 
 class RelatorioClientesView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         hoje = timezone.now().date()
         data_30_dias_atras = hoje - datetime.timedelta(days=30)
@@ -938,9 +1160,9 @@ class RelatorioClientesView(APIView):
 
 class RelatorioPedidosView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         hoje = timezone.now().date()
-        total_pedidos = Pedido.objects.count()
         pedidos_atrasados_query = Pedido.objects.filter(
             previsto_entrega__lt=hoje,
             status_producao__in=['Aguardando', 'Aguardando Arte', 'Em Produção']
@@ -950,102 +1172,111 @@ class RelatorioPedidosView(APIView):
                 output_field=fields.DurationField()
             )
         )
-        pedidos_atrasados_count = pedidos_atrasados_query.count()
-        lista_atrasados = RelatorioPedidosAtrasadosSerializer(pedidos_atrasados_query, many=True).data
-        lucro_medio = Pedido.objects.filter(status_pagamento='PAGO').aggregate(
-            lucro_avg=Avg(F('valor_total') - F('custo_producao'))
-        )['lucro_avg'] or 0
         pedidos_finalizados = Pedido.objects.filter(status_producao='Finalizado')
-        tempo_medio = pedidos_finalizados.annotate(
-            tempo_producao=ExpressionWrapper(F('data_producao') - F('data_criacao'), output_field=fields.DurationField())
-        ).aggregate(
-            avg_tempo=Avg('tempo_producao')
-        )['avg_tempo']
         pedidos_por_pagamento = Pagamento.objects.values('forma_pagamento').annotate(
             value=Count('id')
         ).order_by('-value')
-        pedidos_por_pagamento_data = FormaPagamentoAgrupadoSerializer(pedidos_por_pagamento, many=True).data
+
+        resultados, meta = executar_consultas({
+            'total_pedidos': lambda: Pedido.objects.count(),
+            'pedidos_atrasados_count': lambda: pedidos_atrasados_query.count(),
+            'lista_atrasados': lambda: RelatorioPedidosAtrasadosSerializer(pedidos_atrasados_query, many=True).data,
+            'lucro_medio': lambda: Pedido.objects.filter(status_pagamento='PAGO').aggregate(
+                lucro_avg=Avg(F('valor_total') - F('custo_producao'))
+            )['lucro_avg'] or 0,
+            'tempo_medio': lambda: pedidos_finalizados.annotate(
+                tempo_producao=ExpressionWrapper(F('data_producao') - F('data_criacao'), output_field=fields.DurationField())
+            ).aggregate(
+                avg_tempo=Avg('tempo_producao')
+            )['avg_tempo'],
+            'pedidos_por_pagamento': lambda: FormaPagamentoAgrupadoSerializer(pedidos_por_pagamento, many=True).data,
+        })
+        tempo_medio = resultados['tempo_medio']
         data = {
-            'total_pedidos': total_pedidos,
-            'pedidos_atrasados_count': pedidos_atrasados_count,
-            'lucro_medio_pedido': lucro_medio,
+            'total_pedidos': resultados['total_pedidos'],
+            'pedidos_atrasados_count': resultados['pedidos_atrasados_count'],
+            'lucro_medio_pedido': resultados['lucro_medio'],
             'tempo_medio_producao_dias': tempo_medio.days if tempo_medio else 0,
-            'lista_pedidos_atrasados': lista_atrasados,
-            'pedidos_por_forma_pagamento': pedidos_por_pagamento_data,
+            'lista_pedidos_atrasados': resultados['lista_atrasados'],
+            'pedidos_por_forma_pagamento': resultados['pedidos_por_pagamento'],
+            'meta': meta,
         }
         return Response(data)
 
 
 class RelatorioOrcamentosView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         orcamentos = Orcamento.objects.all()
-        total_orcamentos = orcamentos.count()
-        aprovados = orcamentos.filter(status='Aprovado').count()
-        recusados = orcamentos.filter(status='Rejeitado').count()
-        pendentes = orcamentos.filter(status='Em Aberto').count()
+        resultados, meta = executar_consultas({
+            # Contagens e somas por status numa única query
+            'agregados': lambda: orcamentos.aggregate(
+                total=Count('id'),
+                aprovados=Count('id', filter=Q(status='Aprovado')),
+                recusados=Count('id', filter=Q(status='Rejeitado')),
+                valor_total_orcado=Sum('valor_total'),
+                valor_total_aprovado=Sum('valor_total', filter=Q(status='Aprovado')),
+            ),
+            'status': lambda: StatusOrcamentoAgrupadoSerializer(
+                orcamentos.values('status').annotate(value=Count('id')), many=True
+            ).data,
+            'produtos': lambda: ProdutosOrcadosAgrupadoSerializer(
+                VendaProdutoMensal.objects.values('produto__nome').annotate(value=Sum('vezes_orcado'))
+                .filter(value__gt=0).order_by('-value')[:5], many=True
+            ).data,
+            'recentes': lambda: RelatorioOrcamentoRecenteSerializer(
+                orcamentos.order_by('-data_criacao')[:6], many=True
+            ).data,
+        })
+        agregados = resultados['agregados']
+        total_orcamentos = agregados['total']
+        aprovados = agregados['aprovados']
         taxa_conversao = (aprovados / total_orcamentos * 100) if total_orcamentos > 0 else 0
-        valor_total_orcado = orcamentos.aggregate(total=Sum('valor_total'))['total'] or 0
-        valor_total_aprovado = orcamentos.filter(status='Aprovado').aggregate(total=Sum('valor_total'))['total'] or 0
-        status_data = orcamentos.values('status').annotate(value=Count('id'))
-        status_serializer = StatusOrcamentoAgrupadoSerializer(status_data, many=True)
-        produtos_data = ItemOrcamento.objects.values('produto__nome').annotate(value=Count('id')).order_by('-value')[:5]
-        produtos_serializer = ProdutosOrcadosAgrupadoSerializer(produtos_data, many=True)
-        recentes_data = orcamentos.order_by('-data_criacao')[:6]
-        recentes_serializer = RelatorioOrcamentoRecenteSerializer(recentes_data, many=True)
         data = {
             'cards': {
                 'total_orcamentos': total_orcamentos,
                 'taxa_conversao': taxa_conversao,
                 'tempo_medio_resposta': "1.8 dias",
-                'valor_total_orcado': valor_total_orcado,
-                'valor_total_aprovado': valor_total_aprovado,
+                'valor_total_orcado': agregados['valor_total_orcado'] or 0,
+                'valor_total_aprovado': agregados['valor_total_aprovado'] or 0,
                 'aprovados_count': aprovados,
-                'recusados_count': recusados,
+                'recusados_count': agregados['recusados'],
             },
-            'grafico_status': status_serializer.data,
-            'grafico_produtos': produtos_serializer.data,
-            'tabela_recentes': recentes_serializer.data,
+            'grafico_status': resultados['status'],
+            'grafico_produtos': resultados['produtos'],
+            'tabela_recentes': resultados['recentes'],
+            'meta': meta,
         }
         return Response(data)
     
 
 class RelatorioProdutosView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         hoje = timezone.now().date()
         data_60_dias_atras = hoje - datetime.timedelta(days=60)
         start_of_month = hoje.replace(day=1)
-        agregados_produto = Produto.objects.aggregate(
-            total_produtos=Count('id'),
-            custo_medio=Avg('custo'),
-            preco_medio=Avg('preco')
-        )
         alertas_estoque_query = Produto.objects.filter(
             estoque_atual__isnull=False, 
             estoque_minimo__gt=0, 
             estoque_atual__lt=F('estoque_minimo')
         ).order_by('estoque_atual')
-        alertas_estoque_serializer = RelatorioProdutoAlertaEstoqueSerializer(alertas_estoque_query, many=True)
-        cards_data = {
-            "total_produtos": agregados_produto['total_produtos'] or 0,
-            "custo_medio": agregados_produto['custo_medio'] or 0,
-            "preco_medio_venda": agregados_produto['preco_medio'] or 0,
-            "alertas_estoque": alertas_estoque_query.count(),
-        }
-        produtos_vendidos = ItemPedido.objects.filter(pedido__data_criacao__gte=start_of_month)\
+        # Vendas, lucro e última venda vêm do rollup mensal (VendaProdutoMensal)
+        produtos_vendidos = VendaProdutoMensal.objects.filter(mes=start_of_month)\
             .values('produto__nome')\
             .annotate(total_vendido=Sum('quantidade'))\
+            .filter(total_vendido__gt=0)\
             .order_by('-total_vendido')[:5]
-        grafico_vendidos_serializer = RelatorioProdutoVendidoSerializer(produtos_vendidos, many=True)
-        produtos_lucrativos = ItemPedido.objects.filter(produto__custo__gt=0, produto__preco__gt=0)\
+        produtos_lucrativos = VendaProdutoMensal.objects.filter(produto__custo__gt=0, produto__preco__gt=0)\
             .values('produto__nome')\
             .annotate(
-                total_lucro=Sum(F('subtotal') - (F('produto__custo') * F('quantidade'))),
-                receita_total=Sum('subtotal'),
-                custo_total=Sum(F('produto__custo') * F('quantidade'))
+                receita_total=Sum('receita'),
+                custo_total=Sum('custo'),
             )\
             .annotate(
+                total_lucro=ExpressionWrapper(F('receita_total') - F('custo_total'), output_field=DecimalField()),
                 margem=Case(
                     When(receita_total=0, then=Value(0.0, output_field=DecimalField())),
                     default=ExpressionWrapper(
@@ -1055,9 +1286,8 @@ class RelatorioProdutosView(APIView):
                 )
             )\
             .order_by('-total_lucro')[:6]
-        lucrativos_serializer = RelatorioProdutoLucrativoSerializer(produtos_lucrativos, many=True)
         produtos_baixa_demanda = Produto.objects.annotate(
-            ultima_venda=Max('itempedido__pedido__data_criacao__date')
+            ultima_venda=Max('vendas_mensais__ultima_venda')
         ).filter(
             Q(ultima_venda__lt=data_60_dias_atras) | Q(ultima_venda__isnull=True)
         ).annotate(
@@ -1066,19 +1296,39 @@ class RelatorioProdutosView(APIView):
                 output_field=fields.DurationField()
             )
         ).order_by('ultima_venda')[:6]
-        baixa_demanda_serializer = RelatorioProdutoBaixaDemandaSerializer(produtos_baixa_demanda, many=True)
+
+        resultados, meta = executar_consultas({
+            'agregados_produto': lambda: Produto.objects.aggregate(
+                total_produtos=Count('id'),
+                custo_medio=Avg('custo'),
+                preco_medio=Avg('preco')
+            ),
+            'alertas_estoque': lambda: RelatorioProdutoAlertaEstoqueSerializer(alertas_estoque_query, many=True).data,
+            'mais_vendidos': lambda: RelatorioProdutoVendidoSerializer(produtos_vendidos, many=True).data,
+            'mais_lucrativos': lambda: RelatorioProdutoLucrativoSerializer(produtos_lucrativos, many=True).data,
+            'baixa_demanda': lambda: RelatorioProdutoBaixaDemandaSerializer(produtos_baixa_demanda, many=True).data,
+        })
+        agregados_produto = resultados['agregados_produto']
+        cards_data = {
+            "total_produtos": agregados_produto['total_produtos'] or 0,
+            "custo_medio": agregados_produto['custo_medio'] or 0,
+            "preco_medio_venda": agregados_produto['preco_medio'] or 0,
+            "alertas_estoque": len(resultados['alertas_estoque']),
+        }
         data = {
             'cards': cards_data,
-            'grafico_mais_vendidos': grafico_vendidos_serializer.data,
-            'lista_mais_lucrativos': lucrativos_serializer.data,
-            'tabela_baixa_demanda': baixa_demanda_serializer.data,
-            'lista_alertas_estoque': alertas_estoque_serializer.data,
+            'grafico_mais_vendidos': resultados['mais_vendidos'],
+            'lista_mais_lucrativos': resultados['mais_lucrativos'],
+            'tabela_baixa_demanda': resultados['baixa_demanda'],
+            'lista_alertas_estoque': resultados['alertas_estoque'],
+            'meta': meta,
         }
         return Response(data)
     
 
 class RelatorioFornecedoresView(APIView):
     permission_classes = [CanAccessReports]
+    authentication_classes = [JWTStatelessAuthentication]
     def get(self, request, *args, **kwargs):
         mais_gastos = CustoFornecedorPedido.objects.values(
             'fornecedor__nome'
@@ -1109,29 +1359,55 @@ class EtiquetaPortariaViewSet(viewsets.ModelViewSet):
     search_fields = ['nome_responsavel', 'bloco', 'apartamento']
     permission_classes = [IsAuthenticated]
 
+    def _resposta_termica(self, etiquetas, formato, nome):
+        content_type, extensao = FORMATOS[formato]
+        response = HttpResponse(gerar_etiquetas_termicas(etiquetas, formato), content_type=content_type)
+        response['Content-Disposition'] = f'attachment; filename="{nome}.{extensao}"'
+        return response
+
+    @action(detail=True, methods=['get'])
+    def termica(self, request, pk=None):
+        """
+        Etiqueta para impressora térmica. GET ?formato=zpl (padrão) ou escpos.
+        """
+        formato = request.query_params.get('formato', 'zpl')
+        if formato not in FORMATOS:
+            return Response({'formato': 'Use zpl ou escpos.'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._resposta_termica([self.get_object()], formato, f'etiqueta_{pk}')
+
+    @action(detail=False, methods=['post'], url_path='termica-lote')
+    def termica_lote(self, request):
+        """
+        Várias etiquetas num só arquivo para a impressora térmica.
+        POST {"ids": [1, 2, ...], "formato": "zpl" | "escpos"}
+        """
+        serializer = EtiquetaTermicaLoteSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        ids = list(dict.fromkeys(serializer.validated_data['ids']))
+        etiquetas = EtiquetaPortaria.objects.in_bulk(ids)
+        faltando = [pk for pk in ids if pk not in etiquetas]
+        if faltando:
+            return Response({'ids': f'Etiquetas não encontradas: {faltando}'}, status=status.HTTP_400_BAD_REQUEST)
+        return self._resposta_termica(
+            [etiquetas[pk] for pk in ids], serializer.validated_data['formato'], 'etiquetas'
+        )
+
 
 class EtiquetaPDFView(APIView):
     permission_classes = [IsAuthenticated]
     def get(self, request, pk, *args, **kwargs):
         etiqueta = get_object_or_404(EtiquetaPortaria, pk=pk)
-        empresa = Empresa.objects.first()
-        logo_url = None
-        if empresa and empresa.logo_orcamento_pdf:
-            logo_url = request.build_absolute_uri(empresa.logo_orcamento_pdf.url)
-        context = {
-            'etiqueta': etiqueta,
-            'empresa': empresa,
-            'logo_url': logo_url
-        }
-        html_string = render_to_string('documentos/etiqueta_a6.html', context)
-        pdf = HTML(string=html_string).write_pdf()
-        response = HttpResponse(pdf, content_type='application/pdf')
-        response['Content-Disposition'] = f'attachment; filename="etiqueta_{pk}.pdf"'
-        return response
+        if settings.ETIQUETA_PDF_DIRETO:
+            response = HttpResponse(renderizar_etiqueta(etiqueta), content_type='application/pdf')
+            response['Content-Disposition'] = f'attachment; filename="etiqueta_{pk}.pdf"'
+            return response
+        html_string = html_documento('etiqueta', etiqueta, request)
+        return resposta_pdf(html_string, f"etiqueta_{pk}.pdf")
     
 
 class PedidosKanbanView(APIView):
     permission_classes = [CanAccessKanban]
+    authentication_classes = [JWTStatelessAuthentication]
     STATUS_COLUNAS = [
         "Aguardando",
         "Aguardando Arte",
@@ -1148,4 +1424,86 @@ class PedidosKanbanView(APIView):
             status = pedido_data['status_producao']
             if status in resposta_agrupada:
                 resposta_agrupada[status].append(pedido_data)
-        return Response(resposta_agrupada)
\ No newline at end of file
+        return Response(resposta_agrupada)
+
+
+def mover_pedidos_kanban(ids, status_novo):
+    """
+    Move os pedidos para a coluna `status_novo` com um único UPDATE
+    (só status_producao e, ao finalizar, data_producao), sem passar pelo
+    PedidoSerializer / recalcular_total.
+    Retorna (movidos, ignorados), onde ignorados é uma lista de {id, motivo}.
+    """
+    colunas = PedidosKanbanView.STATUS_COLUNAS
+    ignorados = []
+
+    with transaction.atomic():
+        atuais = dict(
+            Pedido.objects.select_for_update()
+            .filter(id__in=ids)
+            .values_list('id', 'status_producao')
+        )
+
+        alteracoes = {}
+        for pedido_id in dict.fromkeys(ids):
+            status_atual = atuais.get(pedido_id)
+            if status_atual is None:
+                ignorados.append({'id': pedido_id, 'motivo': 'Pedido não encontrado.'})
+            elif status_atual not in colunas:
+                ignorados.append({'id': pedido_id, 'motivo': f"Pedido com status '{status_atual}' não está no Kanban."})
+            elif status_atual == status_novo:
+                ignorados.append({'id': pedido_id, 'motivo': f"Pedido já está em '{status_novo}'."})
+            else:
+                alteracoes[pedido_id] = status_atual
+
+        if alteracoes:
+            campos = {'status_producao': status_novo}
+            if status_novo == 'Finalizado':
+                campos['data_producao'] = Coalesce(
+                    F('data_producao'), Value(timezone.localdate(), output_field=fields.DateField())
+                )
+            Pedido.objects.filter(id__in=alteracoes).update(**campos)
+
+            transaction.on_commit(lambda: status_producao_alterado.send(
+                sender=Pedido, alteracoes=alteracoes, status_novo=status_novo
+            ))
+
+    return list(alteracoes), ignorados
+
+
+class PedidoKanbanMoverView(APIView):
+    """
+    POST pedidos-kanban/<pk>/mover/  {"status_producao": "..."}
+    POST pedidos-kanban/mover/       {"pedidos": [1, 2, 3], "status_producao": "..."}
+    """
+    permission_classes = [CanAccessKanban]
+
+    def post(self, request, pk=None, *args, **kwargs):
+        serializer = PedidoKanbanMoverSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        status_novo = serializer.validated_data['status_producao']
+
+        if status_novo not in PedidosKanbanView.STATUS_COLUNAS:
+            return Response(
+                {"status_producao": f"Status inválido. Use um de: {', '.join(PedidosKanbanView.STATUS_COLUNAS)}."},
+                status=status.HTTP_400_BAD_REQUEST
+            )
+
+        if pk is not None:
+            movidos, ignorados = mover_pedidos_kanban([pk], status_novo)
+            if not movidos:
+                motivo = ignorados[0]['motivo']
+                codigo = status.HTTP_404_NOT_FOUND if motivo == 'Pedido não encontrado.' else status.HTTP_400_BAD_REQUEST
+                return Response({"detail": motivo}, status=codigo)
+            return Response({'id': pk, 'status_producao': status_novo})
+
+        ids = serializer.validated_data.get('pedidos')
+        if not ids:
+            return Response({"pedidos": "Informe a lista de pedidos."}, status=status.HTTP_400_BAD_REQUEST)
+
+        movidos, ignorados = mover_pedidos_kanban(ids, status_novo)
+        return Response({
+            'status_producao': status_novo,
+            'movidos': movidos,
+            'ignorados': ignorados,
+        })
@@ -0,0 +1,131 @@
+from django.db import connections
+
+
+# --- Views SQL dos modelos somente leitura (managed=False) ---
+# LancamentoFinanceiro e EventoCliente são views (UNION ALL) sobre as
+# tabelas de despesas, custos, pedidos, orçamentos e pagamentos. SQL
+# compatível com Postgres e SQLite; os filtros descem para cada branch.
+#
+# Uma view prende as tabelas de que lê: o SQLite não consegue recriar a
+# tabela num AlterField e o Postgres não muda o tipo (ALTER COLUMN TYPE) de
+# uma coluna usada por ela. Por isso o migrate remove as views antes de
+# rodar as migrações (pre_migrate) e as cria de novo no final
+# (post_migrate), com o SQL daqui (ver CoreConfig.ready). Migração que
+# renomeia ou remove uma coluna usada abaixo precisa atualizar este SQL.
+
+VIEWS = {
+    # modelo: (tabela, SELECT)
+    'LancamentoFinanceiro': ('core_lancamentofinanceiro', """
+SELECT
+    'd_' || CAST(d.id AS VARCHAR(20)) AS chave,
+    'despesa' AS origem,
+    d.id AS original_id,
+    d.descricao AS descricao,
+    d.categoria AS categoria,
+    NULL AS fornecedor_nome,
+    NULL AS pedido_id,
+    NULL AS cliente_nome,
+    d.valor AS valor,
+    d.data AS data,
+    d.data_pagamento AS data_pagamento,
+    d.status AS status
+FROM core_despesa d
+UNION ALL
+SELECT
+    'c_' || CAST(c.id AS VARCHAR(20)),
+    'custo',
+    c.id,
+    c.descricao,
+    'Custo de Produção',
+    f.nome,
+    c.pedido_id,
+    NULL,
+    c.custo,
+    COALESCE(c.data_vencimento, DATE(c.data_criacao)),
+    c.data_pagamento,
+    c.status
+FROM core_custofornecedorpedido c
+INNER JOIN core_fornecedor f ON f.id = c.fornecedor_id
+UNION ALL
+SELECT
+    'p_' || CAST(p.id AS VARCHAR(20)),
+    'pedido',
+    p.id,
+    '',
+    'Custo de Produção',
+    NULL,
+    p.id,
+    cl.nome,
+    p.custo_producao,
+    DATE(p.data_criacao),
+    NULL,
+    NULL
+FROM core_pedido p
+INNER JOIN core_cliente cl ON cl.id = p.cliente_id
+WHERE p.custo_producao > 0
+"""),
+    'EventoCliente': ('core_eventocliente', """
+SELECT
+    'o_' || CAST(o.id AS VARCHAR(20)) AS chave,
+    'orcamento' AS tipo,
+    o.id AS original_id,
+    o.cliente_id AS cliente_id,
+    o.data_criacao AS data,
+    o.valor_total AS valor,
+    o.status AS status,
+    NULL AS status_pagamento,
+    NULL AS pedido_id,
+    NULL AS forma_pagamento
+FROM core_orcamento o
+UNION ALL
+SELECT
+    'p_' || CAST(p.id AS VARCHAR(20)),
+    'pedido',
+    p.id,
+    p.cliente_id,
+    p.data_criacao,
+    p.valor_total,
+    p.status_producao,
+    p.status_pagamento,
+    p.id,
+    NULL
+FROM core_pedido p
+UNION ALL
+SELECT
+    'g_' || CAST(g.id AS VARCHAR(20)),
+    'pagamento',
+    g.id,
+    p.cliente_id,
+    g.data,
+    g.valor,
+    NULL,
+    NULL,
+    g.pedido_id,
+    g.forma_pagamento
+FROM core_pagamento g
+INNER JOIN core_pedido p ON p.id = g.pedido_id
+"""),
+}
+
+
+def remover_views(using='default', **kwargs):
+    with connections[using].cursor() as cursor:
+        for tabela, _ in VIEWS.values():
+            cursor.execute(f'DROP VIEW IF EXISTS {tabela}')
+
+
+def criar_views(using='default', apps=None, **kwargs):
+    """
+    Cria (ou recria) as views dos modelos que existem no estado das
+    migrações aplicadas: depois de voltar para antes da 0020, por exemplo,
+    core_lancamentofinanceiro não é criada.
+    """
+    with connections[using].cursor() as cursor:
+        for modelo, (tabela, select) in VIEWS.items():
+            cursor.execute(f'DROP VIEW IF EXISTS {tabela}')
+            if apps is not None:
+                try:
+                    apps.get_model('core', modelo)
+                except LookupError:
+                    continue
+            cursor.execute(f'CREATE VIEW {tabela} AS{select}')
@@ -0,0 +1,102 @@
+# api-grafica/gunicorn.conf.py
+# Perfil de produção do gunicorn. Uso:
+#   gunicorn app.wsgi:application -c gunicorn.conf.py
+#   gunicorn app.asgi:application -c gunicorn.conf.py -k uvicorn_worker.UvicornWorker
+# Todos os valores podem ser sobrescritos por variáveis de ambiente.
+
+import multiprocessing
+import os
+import time
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:8000')
+
+# --- Workers ---
+# 2 x CPU + 1, limitado para não estourar as conexões do Postgres
+# (cada thread mantém sua própria conexão persistente).
+workers = int(os.environ.get(
+    'GUNICORN_WORKERS',
+    min(multiprocessing.cpu_count() * 2 + 1, 8)
+))
+
+# gthread: as threads atendem outras requisições enquanto uma espera
+# banco, disco ou o WeasyPrint. Para views async use -k uvicorn_worker.UvicornWorker.
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+# --- Relatórios ---
+# Cada worker tem seu próprio pool de sub-consultas (core/relatorios.py),
+# com uma conexão extra ao Postgres por thread. RELATORIOS_CONEXOES é o
+# total para todos os workers; o padrão por processo sai da divisão
+# (8 workers -> 2 cada). Um RELATORIOS_MAX_CONCORRENCIA explícito prevalece.
+_relatorios_conexoes = int(os.environ.get('RELATORIOS_CONEXOES', 16))
+os.environ.setdefault('RELATORIOS_MAX_CONCORRENCIA', str(max(_relatorios_conexoes // workers, 1)))
+
+# PDFs grandes podem demorar alguns segundos para renderizar
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = 30
+keepalive = 5
+
+# --- Reciclagem de workers ---
+# Reinicia cada worker depois de N requisições (o jitter evita que todos
+# reiniciem juntos), contendo o crescimento de memória do WeasyPrint.
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 1000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 100))
+
+# --- Preload ---
+# Carrega o Django uma vez no master; os workers nascem por fork já com
+# tudo importado (boot e reciclagem mais rápidos, memória compartilhada).
+preload_app = os.environ.get('GUNICORN_PRELOAD', 'True') == 'True'
+
+accesslog = '-'
+errorlog = '-'
+
+_inicio = None
+
+
+def on_starting(server):
+    global _inicio
+    _inicio = time.perf_counter()
+
+
+def _precarregar_pdf(server):
+    valor = os.environ.get('GUNICORN_PRECARREGAR_PDF')
+    if valor is not None:
+        return valor == 'True'
+    return 'uvicorn' not in server.cfg.worker_class_str.lower()
+
+
+def when_ready(server):
+    if _inicio is not None:
+        server.log.info("Aplicação carregada em %.2fs (preload=%s)", time.perf_counter() - _inicio, preload_app)
+
+    # O WeasyPrint é importado sob demanda (core/pdf.py). Com preload, vale
+    # carregá-lo uma vez no master: os workers (inclusive os reciclados)
+    # herdam por fork e não pagam a importação no primeiro PDF. O serviço
+    # ASGI (UvicornWorker) não gera PDFs: por padrão não pré-carrega.
+    if preload_app and _precarregar_pdf(server):
+        inicio_pdf = time.perf_counter()
+        from core.pdf import precarregar
+        precarregar()
+        server.log.info("WeasyPrint pré-carregado em %.2fs", time.perf_counter() - inicio_pdf)
+
+
+def pre_fork(server, worker):
+    """
+    Fecha no master qualquer conexão aberta durante o preload, para que
+    nenhum worker herde o mesmo socket do Postgres.
+    """
+    if not preload_app:
+        return
+    from django.db import connections
+    connections.close_all()
+
+
+def post_fork(server, worker):
+    """
+    Garante que o worker recém-criado comece sem conexões herdadas:
+    cada worker abre (e mantém, via CONN_MAX_AGE) as suas.
+    """
+    if not preload_app:
+        return
+    from django.db import connections
+    connections.close_all()
@@ -4,7 +4,7 @@
 "use client";
 
 import { useState, useEffect } from "react";
-import { Cliente, PedidoHistory, OrcamentoHistory } from "@/types"; // <-- 1. IMPORTAR TIPOS
+import { Cliente, PedidoHistory, OrcamentoHistory, EventoCliente } from "@/types"; // <-- 1. IMPORTAR TIPOS
 import { api } from "@/lib/api";
 import { toast } from "react-toastify";
 import Link from 'next/link';
@@ -82,14 +82,14 @@ export default function ViewClientModal({ isOpen, onClose, cliente }: ViewClient
               label="Pedidos"
               isActive={activeTab === 'pedidos'}
               onClick={() => setActiveTab('pedidos')}
-              count={data.pedidos?.length}
+              count={data.resumo?.total_pedidos ?? data.pedidos?.length}
             />
             <TabButton
               icon={FileText}
               label="Orçamentos"
               isActive={activeTab === 'orcamentos'}
               onClick={() => setActiveTab('orcamentos')}
-              count={data.orcamentos?.length}
+              count={data.resumo?.total_orcamentos ?? data.orcamentos?.length}
             />
           </nav>
         </div>
@@ -154,8 +154,11 @@ export default function ViewClientModal({ isOpen, onClose, cliente }: ViewClient
           {/* Painel de Pedidos */}
           <div className={activeTab === 'pedidos' ? 'block' : 'hidden'}>
             <HistoryTabContent
+              key={`pedidos-${cliente.id}-${isHistoryLoading}`}
+              clienteId={cliente.id}
               isLoading={isHistoryLoading}
               items={data.pedidos || []}
+              total={data.resumo?.total_pedidos}
               type="pedido"
               onCloseModal={onClose}
             />
@@ -164,8 +167,11 @@ export default function ViewClientModal({ isOpen, onClose, cliente }: ViewClient
           {/* Painel de Orçamentos */}
           <div className={activeTab === 'orcamentos' ? 'block' : 'hidden'}>
             <HistoryTabContent
+              key={`orcamentos-${cliente.id}-${isHistoryLoading}`}
+              clienteId={cliente.id}
               isLoading={isHistoryLoading}
               items={data.orcamentos || []}
+              total={data.resumo?.total_orcamentos}
               type="orcamento"
               onCloseModal={onClose}
             />
@@ -208,12 +214,51 @@ function TabButton({ icon: Icon, label, isActive, onClick, count }: any) {
   );
 }
 
-function HistoryTabContent({ isLoading, items, type, onCloseModal }: {
+// Evento da linha do tempo no formato do histórico do detalhe do cliente
+const eventoParaHistorico = (evento: EventoCliente, type: 'pedido' | 'orcamento') => ({
+  id: evento.original_id,
+  data_criacao: evento.data,
+  valor_total: evento.valor,
+  ...(type === 'pedido' ? { status_producao: evento.status ?? '' } : { status: evento.status ?? '' }),
+});
+
+function HistoryTabContent({ clienteId, isLoading, items: recentes, total, type, onCloseModal }: {
+  clienteId: number;
   isLoading: boolean;
   items: PedidoHistory[] | OrcamentoHistory[];
+  total?: number;
   type: 'pedido' | 'orcamento';
   onCloseModal: () => void;
 }) {
+  // O detalhe do cliente traz só os mais recentes; o restante vem da
+  // linha do tempo paginada por cursor.
+  const [items, setItems] = useState<(PedidoHistory | OrcamentoHistory)[]>(recentes);
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
+  const [usaLinhaDoTempo, setUsaLinhaDoTempo] = useState(false);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
+
+  const temMais = usaLinhaDoTempo ? !!nextUrl : (total ?? 0) > items.length;
+
+  const carregarMais = async () => {
+    setIsLoadingMore(true);
+    try {
+      const cursor = nextUrl ? new URL(nextUrl).searchParams.get('cursor') : undefined;
+      const response = await api.get(`/clientes/${clienteId}/linha-do-tempo/`, {
+        params: { tipo: type, cursor }
+      });
+      const novos = (response.data.results || []).map((e: EventoCliente) => eventoParaHistorico(e, type));
+      // A primeira página da linha do tempo já inclui os recentes: substitui
+      setItems(prev => (usaLinhaDoTempo ? [...prev, ...novos] : novos));
+      setUsaLinhaDoTempo(true);
+      setNextUrl(response.data.next);
+    } catch (err) {
+      console.error("Erro ao buscar histórico do cliente:", err);
+      toast.error("Falha ao carregar o histórico do cliente.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   const formatCurrency = (value: string | number) => new Intl.NumberFormat('pt-BR', { style: 'currency', currency: 'BRL' }).format(Number(value));
   const formatDate = (dateString: string) => new Date(dateString).toLocaleDateString('pt-BR');
 
@@ -281,6 +326,19 @@ function HistoryTabContent({ isLoading, items, type, onCloseModal }: {
           })}
         </tbody>
       </table>
+      {temMais && (
+        <div className="flex justify-center py-4">
+          <button
+            type="button"
+            onClick={carregarMais}
+            disabled={isLoadingMore}
+            className="text-blue-600 hover:underline font-medium disabled:text-gray-400 flex items-center gap-2"
+          >
+            {isLoadingMore && <Loader2 className="animate-spin" size={16} />}
+            Carregar mais
+          </button>
+        </div>
+      )}
     </div>
   );
 }
\ No newline at end of file
@@ -5,13 +5,13 @@
 import { useState, useEffect } from "react"; 
 import { useRouter } from "next/navigation";
 import { Orcamento, PaginatedResponse } from "@/types";
-import { Plus, Search, Edit2, Trash2, Eye, MessageSquare, Printer, ChevronLeft, ChevronRight, CheckCircle } from "lucide-react";
+import { Plus, Search, Edit2, Trash2, Eye, MessageSquare, Printer, FileSearch, ChevronLeft, ChevronRight, CheckCircle } from "lucide-react";
 import ViewQuoteModal from "./ViewQuoteModal";
 import DeleteQuoteModal from "./DeleteQuoteModal";
 import ApproveQuoteModal from "./ApproveQuoteModal";
 import { api } from "@/lib/api";
 import { useDebounce } from "@/hooks/useDebounce";
-import { handleDownloadPdf } from "@/utils/pdfDownloader";
+import { handleDownloadPdf, handlePreviewHtml } from "@/utils/pdfDownloader";
 import { toast } from "react-toastify";
 
 type QuoteListProps = {
@@ -73,6 +73,10 @@ export default function QuoteList({ initialData }: QuoteListProps) {
     handleDownloadPdf(`/orcamentos/${orcamentoId}/pdf/`, `orcamento_${orcamentoId}.pdf`);
   };
 
+  const handlePreview = (orcamentoId: number) => {
+    handlePreviewHtml(`/orcamentos/${orcamentoId}/previa/`);
+  };
+
   const handleDeleteConfirm = async () => {
     if (!quoteToDelete) return;
     setIsLoading(true);
@@ -178,6 +182,7 @@ export default function QuoteList({ initialData }: QuoteListProps) {
                                         <button onClick={() => handleOpenViewModal(orcamento)} className="hover:text-blue-500" title="Visualizar"><Eye size={18} /></button>
                                         <button onClick={() => handleEdit(orcamento.id)} className="hover:text-yellow-500" title="Editar"><Edit2 size={18} /></button>
                                         <button onClick={() => handleOpenDeleteModal(orcamento)} className="hover:text-red-500" title="Excluir"><Trash2 size={18} /></button>
+                                        <button onClick={() => handlePreview(orcamento.id)} className="hover:text-gray-700" title="Pré-visualizar"><FileSearch size={18} /></button>
                                         <button onClick={() => handlePrint(orcamento.id)} className="hover:text-gray-700" title="Imprimir"><Printer size={18} /></button>
                                     </div>
                                 </td>
@@ -218,6 +223,7 @@ export default function QuoteList({ initialData }: QuoteListProps) {
                   </div>
                   <div className="flex items-center gap-3 text-gray-500 mt-2">
                      <button onClick={() => handleOpenDeleteModal(orcamento)} className="hover:text-red-500" title="Excluir"><Trash2 size={18} /></button>
+                     <button onClick={() => handlePreview(orcamento.id)} className="hover:text-gray-700" title="Pré-visualizar"><FileSearch size={18} /></button>
                      <button onClick={() => handlePrint(orcamento.id)} className="hover:text-gray-700" title="Imprimir"><Printer size={18} /></button>
                   </div>
                 </div>
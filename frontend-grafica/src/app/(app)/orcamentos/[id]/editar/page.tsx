@@ -8,7 +8,8 @@ import { useRouter, useParams } from "next/navigation";
 import { Cliente, Produto, Orcamento } from "@/types"; // Importar Orcamento
 import { api } from "@/lib/api";
 import PageHeader from "@/components/layout/PageHeader";
-import { Plus, ArrowLeft, Trash2, Save, Square, FileText } from "lucide-react";
+import { Plus, ArrowLeft, Trash2, Save, Square, FileText, FileSearch } from "lucide-react";
+import { handlePreviewHtml } from "@/utils/pdfDownloader";
 import SelectProductModal from "../../novo/SelectProductModal";
 import AddMetricProductModal from "../../novo/AddMetricProductModal";
 import DescribeProductModal from "../../novo/DescribeProductModal";
@@ -454,6 +455,14 @@ export default function EditarOrcamentoPage() {
         >
           Voltar
         </button>
+        <button
+          onClick={() => handlePreviewHtml(`/orcamentos/${orcamentoId}/previa/`)}
+          className="bg-gray-200 text-zinc-800 font-bold py-2 px-6 rounded-lg hover:bg-gray-300 flex items-center gap-2"
+          title="Confere o layout com os dados já salvos"
+        >
+          <FileSearch size={18} />
+          Pré-visualizar
+        </button>
         <button
           onClick={handleUpdateOrcamento}
           disabled={isSaving}
@@ -3,10 +3,10 @@
 import { useState, useEffect } from "react";
 import { useRouter } from "next/navigation";
 import { Pedido, PaginatedResponse } from "@/types";
-import { Search, Edit2, Trash2, Eye, ChevronLeft, ChevronRight, Printer } from "lucide-react";
+import { Search, Edit2, Trash2, Eye, ChevronLeft, ChevronRight, Printer, FileSearch } from "lucide-react";
 import { api } from "@/lib/api";
 import { useDebounce } from "@/hooks/useDebounce";
-import { handleDownloadPdf } from "@/utils/pdfDownloader";
+import { handleDownloadPdf, handlePreviewHtml } from "@/utils/pdfDownloader";
 import { toast } from "react-toastify"; 
 import DeleteOrderModal from "./DeleteOrderModal";
 
@@ -73,6 +73,9 @@ export default function OrderList({ initialData }: OrderListProps) {
   const handlePrint = (pedidoId: number) => {
     handleDownloadPdf(`/pedidos/${pedidoId}/pdf/`, `pedido_os_${pedidoId}.pdf`);
   };
+  const handlePreview = (pedidoId: number) => {
+    handlePreviewHtml(`/pedidos/${pedidoId}/previa/`);
+  };
 
   // --- 4. ADICIONAR FUNÇÕES DO MODAL DE EXCLUSÃO ---
   const handleOpenDeleteModal = (pedido: Pedido) => {
@@ -318,6 +321,13 @@ export default function OrderList({ initialData }: OrderListProps) {
                           <Trash2 size={18} />
                         </button>
                         {/* ----------------------------------------------- */}
+                        <button
+                          onClick={() => handlePreview(pedido.id)}
+                          className="hover:text-gray-700"
+                          title="Pré-visualizar OS"
+                        >
+                          <FileSearch size={18} />
+                        </button>
                         <button
                           onClick={() => handlePrint(pedido.id)}
                           className="hover:text-gray-700"
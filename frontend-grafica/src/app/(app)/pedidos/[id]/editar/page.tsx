@@ -7,6 +7,7 @@ import { useState, useEffect, useCallback, ChangeEvent, FormEvent } from "react"
 import { useRouter, useParams } from "next/navigation";
 import { Cliente, Produto, Pedido, ArtePedido, Fornecedor, CustoFornecedorPedido } from "@/types"; 
 import { api } from "@/lib/api";
+import { enviarArteEmPartes } from "@/lib/uploadArte";
 import PageHeader from "@/components/layout/PageHeader";
 import { 
   Plus, ArrowLeft, Trash2, Save, Square, FileText, 
@@ -95,6 +96,7 @@ export default function EditarPedidoPage() {
   const [arteFile, setArteFile] = useState<File | null>(null);
   const [arteComentario, setArteComentario] = useState("");
   const [isUploading, setIsUploading] = useState(false);
+  const [uploadProgresso, setUploadProgresso] = useState(0);
   
   // Custos
   const [isAddingCusto, setIsAddingCusto] = useState(false);
@@ -319,17 +321,11 @@ export default function EditarPedidoPage() {
     if (!pedidoId) return;
 
     setIsUploading(true);
-    const formData = new FormData();
-    formData.append('pedido', pedidoId);
-    formData.append('layout', arteFile);
-    formData.append('comentarios_admin', arteComentario);
+    setUploadProgresso(0);
 
     try {
-      await api.post('/artes-pedido/', formData, {
-        headers: {
-          'Content-Type': 'multipart/form-data',
-        },
-      });
+      // Envio em partes: arquivos grandes não dependem de uma única requisição
+      await enviarArteEmPartes(arteFile, pedidoId, arteComentario, setUploadProgresso);
       toast.success("Arte enviada com sucesso!");
       setArteFile(null);
       setArteComentario("");
@@ -842,7 +838,7 @@ export default function EditarPedidoPage() {
                 className="w-full bg-blue-600 text-white font-bold py-2 px-4 rounded-lg flex items-center justify-center gap-2 hover:bg-blue-700 disabled:bg-blue-400"
               >
                 {isUploading ? <Loader2 className="animate-spin" size={18} /> : <UploadCloud size={18} />}
-                {isUploading ? "Enviando..." : "Enviar Arte"}
+                {isUploading ? `Enviando... ${uploadProgresso}%` : "Enviar Arte"}
               </button>
             </div>
 
@@ -865,7 +861,7 @@ export default function EditarPedidoPage() {
                     
                     <a href={arte.layout} target="_blank" rel="noopener noreferrer">
                       <Image 
-                        src={arte.layout} 
+                        src={arte.miniatura || arte.layout} 
                         alt="Layout do Pedido"
                         width={100}
                         height={100}
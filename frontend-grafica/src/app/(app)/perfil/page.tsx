@@ -130,7 +130,7 @@ export default function PerfilPage() {
               alt="Foto do Perfil"
               width={96}
               height={96}
-              unoptimized={!!profilePicFile} 
+              unoptimized
               className="rounded-full object-cover w-24 h-24 border bg-gray-100"
               onError={(e) => (e.currentTarget.src = 'data:image/gif;base64,R0lGODlhAQABAIAAAAAAAP///yH5BAEAAAAALAAAAAABAAEAAAIBRAA7')} 
             />
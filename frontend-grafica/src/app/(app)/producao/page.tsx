@@ -99,7 +99,7 @@ export default function ProducaoPage() {
     // --- Chamada para a API ---
     // Apenas chama a API se o status (coluna) realmente mudou
     if (startColumnId !== endColumnId) {
-      api.patch(`/pedidos/${pedidoId}/`, {
+      api.post(`/pedidos-kanban/${pedidoId}/mover/`, {
         status_producao: endColumnId,
       })
       .then(() => {
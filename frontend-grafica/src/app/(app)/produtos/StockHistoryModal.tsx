@@ -15,15 +15,19 @@ type StockHistoryModalProps = {
 export default function StockHistoryModal({ isOpen, onClose, produto }: StockHistoryModalProps) {
   const [movimentacoes, setMovimentacoes] = useState<MovimentacaoEstoque[]>([]);
   const [isLoading, setIsLoading] = useState(true);
+  const [nextUrl, setNextUrl] = useState<string | null>(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
 
   useEffect(() => {
     if (isOpen && produto) {
       setIsLoading(true);
+      setNextUrl(null);
       
-      // O endpoint de detalhe do produto agora retorna as movimentações
-      api.get(`/produtos/${produto.id}/`)
+      // Histórico completo (manuais, pedidos e cadastro), paginado por cursor
+      api.get(`/movimentacoes-estoque/?produto=${produto.id}`)
         .then(response => {
-          setMovimentacoes(response.data.movimentacoes || []);
+          setMovimentacoes(response.data.results || []);
+          setNextUrl(response.data.next);
         })
         .catch(err => {
           console.error("Erro ao buscar histórico:", err);
@@ -35,6 +39,24 @@ export default function StockHistoryModal({ isOpen, onClose, produto }: StockHis
     }
   }, [isOpen, produto]);
 
+  const carregarMais = async () => {
+    if (!nextUrl || !produto) return;
+    setIsLoadingMore(true);
+    try {
+      const cursor = new URL(nextUrl).searchParams.get('cursor');
+      const response = await api.get('/movimentacoes-estoque/', {
+        params: { produto: produto.id, cursor }
+      });
+      setMovimentacoes(prev => [...prev, ...(response.data.results || [])]);
+      setNextUrl(response.data.next);
+    } catch (err) {
+      console.error("Erro ao buscar histórico:", err);
+      toast.error("Falha ao carregar o histórico de estoque.");
+    } finally {
+      setIsLoadingMore(false);
+    }
+  };
+
   if (!isOpen || !produto) return null;
 
   const formatDate = (dateString: string) => 
@@ -74,8 +96,7 @@ export default function StockHistoryModal({ isOpen, onClose, produto }: StockHis
                 {movimentacoes.length === 0 ? (
                   <tr>
                     <td colSpan={4} className="text-center text-gray-500 py-10">
-                      Nenhuma movimentação manual encontrada.
-                      <p className="text-xs">(Movimentações de pedidos não aparecem aqui)</p>
+                      Nenhuma movimentação encontrada.
                     </td>
                   </tr>
                 ) : (
@@ -93,6 +114,19 @@ export default function StockHistoryModal({ isOpen, onClose, produto }: StockHis
               </tbody>
             </table>
           )}
+          {!isLoading && nextUrl && (
+            <div className="flex justify-center py-4">
+              <button
+                type="button"
+                onClick={carregarMais}
+                disabled={isLoadingMore}
+                className="text-blue-600 hover:underline font-medium disabled:text-gray-400 flex items-center gap-2"
+              >
+                {isLoadingMore && <Loader2 className="animate-spin" size={16} />}
+                Carregar mais
+              </button>
+            </div>
+          )}
         </div>
         
         <div className="flex items-center justify-end gap-4 pt-4 border-t mt-6">
@@ -141,7 +141,7 @@ export default function PaginaAprovacao() {
                 <div className="border rounded-lg p-4 bg-white">
                   <a href={arteMaisRecente.layout} target="_blank" rel="noopener noreferrer">
                     <Image
-                      src={arteMaisRecente.layout}
+                      src={arteMaisRecente.previa || arteMaisRecente.layout}
                       alt="Layout do Pedido"
                       width={800}
                       height={600}
@@ -0,0 +1,70 @@
+// src/lib/uploadArte.ts
+// Envio de arte em partes (API /uploads-arte/): cada parte vai num PATCH
+// com o offset; se uma parte falhar, consulta o offset no servidor e continua.
+// Com a mídia no S3, a API devolve url_envio e o arquivo vai direto ao bucket.
+import axios from 'axios';
+import { api } from '@/lib/api';
+import { ArtePedido } from '@/types';
+
+const TENTATIVAS_POR_PARTE = 3;
+
+async function sha256Hex(blob: Blob): Promise<string | undefined> {
+  // crypto.subtle só existe em contexto seguro (HTTPS/localhost)
+  if (typeof crypto === 'undefined' || !crypto.subtle) return undefined;
+  const hash = await crypto.subtle.digest('SHA-256', await blob.arrayBuffer());
+  return Array.from(new Uint8Array(hash)).map(b => b.toString(16).padStart(2, '0')).join('');
+}
+
+export async function enviarArteEmPartes(
+  arquivo: File,
+  pedidoId: string | number,
+  comentariosAdmin: string,
+  onProgresso?: (percentual: number) => void,
+): Promise<ArtePedido> {
+  const { data: upload } = await api.post('/uploads-arte/', {
+    pedido: pedidoId,
+    nome_arquivo: arquivo.name,
+    tamanho: arquivo.size,
+    // Obrigatório no envio direto ao S3; no local confere o arquivo no final
+    sha256: (await sha256Hex(arquivo)) ?? '',
+    comentarios_admin: comentariosAdmin,
+  });
+
+  if (upload.url_envio) {
+    // Sem o header Authorization da API: a URL já é assinada
+    await axios.put(upload.url_envio, arquivo, {
+      headers: upload.headers_envio,
+      onUploadProgress: (e) => e.total && onProgresso?.(Math.round((e.loaded / e.total) * 100)),
+    });
+    const { data: arte } = await api.post(`/uploads-arte/${upload.id}/concluir/`);
+    return arte;
+  }
+
+  let offset: number = upload.recebido;
+  let falhas = 0;
+  while (offset < arquivo.size) {
+    const parte = arquivo.slice(offset, offset + upload.parte_max);
+    try {
+      const checksum = await sha256Hex(parte);
+      const { data } = await api.patch(`/uploads-arte/${upload.id}/`, parte, {
+        headers: {
+          'Content-Type': 'application/offset+octet-stream',
+          'Upload-Offset': String(offset),
+          ...(checksum ? { 'Upload-Checksum': checksum } : {}),
+        },
+      });
+      offset = data.recebido;
+      falhas = 0;
+      onProgresso?.(Math.round((offset / arquivo.size) * 100));
+    } catch (err) {
+      falhas += 1;
+      if (falhas >= TENTATIVAS_POR_PARTE) throw err;
+      // Continua de onde o servidor parou
+      const { data } = await api.get(`/uploads-arte/${upload.id}/`);
+      offset = data.recebido;
+    }
+  }
+
+  const { data: arte } = await api.post(`/uploads-arte/${upload.id}/concluir/`);
+  return arte;
+}
@@ -66,6 +66,21 @@ export type OrcamentoHistory = {
 };
 
 
+// Evento da linha do tempo do cliente (EventoClienteSerializer),
+// GET /clientes/{id}/linha-do-tempo/?tipo=pedido|orcamento|pagamento
+export type EventoCliente = {
+  id: string;
+  tipo: 'orcamento' | 'pedido' | 'pagamento';
+  tipo_display: string;
+  original_id: number;
+  data: string;
+  valor: string;
+  status: string | null;
+  status_pagamento: string | null;
+  pedido_id: number | null;
+  forma_pagamento: string | null;
+};
+
 // --- NOVO TIPO: MovimentacaoEstoque ---
 // Baseado no MovimentacaoEstoqueReadSerializer do backend
 export type MovimentacaoEstoque = {
@@ -75,6 +90,7 @@ export type MovimentacaoEstoque = {
   tipo_display: string; // "Entrada (Compra)", "Saída (Ajuste Manual/Perda)"
   observacao: string | null;
   data: string; // Data como string ISO
+  pedido: number | null; // Pedido que gerou a movimentação (se houver)
 };
 
 // --- Cliente (ATUALIZADO) ---
@@ -94,9 +110,20 @@ export type Cliente = {
     estado?: string | null;
 
     // --- CAMPOS ADICIONADOS (Opcionais) ---
-    // Virão apenas do ClienteRetrieveSerializer
+    // Virão apenas do ClienteRetrieveSerializer (só os mais recentes;
+    // histórico completo em /clientes/{id}/linha-do-tempo/)
     pedidos?: PedidoHistory[];
     orcamentos?: OrcamentoHistory[];
+    resumo?: ClienteResumo;
+  };
+
+  export type ClienteResumo = {
+    total_pedidos: number;
+    total_orcamentos: number;
+    valor_total_pedidos: string | number;
+    total_pago: string | number;
+    saldo_aberto: string | number;
+    ultimo_pedido: string | null;
   };
   
   // Definição completa para o tipo Produto
@@ -112,6 +139,7 @@ export type Cliente = {
     // --- CAMPO ADICIONADO ---
     // Será preenchido ao buscar o detalhe do produto
     movimentacoes?: MovimentacaoEstoque[]; 
+    total_movimentacoes?: number;
 };
 
 // --- NOVO TIPO: Fornecedor ---
@@ -169,7 +197,9 @@ export type Orcamento = {
 
 export type ArtePedido = {
   id: number;
-  layout: string; // Isto será uma URL para a imagem
+  layout: string; // Isto será uma URL para a imagem (original, para download)
+  miniatura: string | null; // Versões reduzidas; nulas enquanto são geradas
+  previa: string | null;
   comentarios_admin: string | null;
   comentarios_cliente: string | null;
   data_upload: string;
@@ -21,4 +21,23 @@ export const handleDownloadPdf = async (apiUrl: string, filename: string) => {
     console.error(`Erro ao gerar o PDF de ${apiUrl}:`, error);
     alert('Não foi possível gerar o PDF.');
   }
-};
\ No newline at end of file
+};
+// Pré-visualização em HTML (orçamento/OS): abre o documento numa aba sem
+// gerar o PDF. A aba é aberta antes da requisição para não ser bloqueada.
+export const handlePreviewHtml = async (apiUrl: string) => {
+  const janela = window.open('', '_blank');
+  try {
+    const response = await api.get(apiUrl, { responseType: 'text' });
+    const url = window.URL.createObjectURL(new Blob([response.data], { type: 'text/html' }));
+    if (janela) {
+      janela.location.href = url;
+    } else {
+      window.location.href = url;
+    }
+    setTimeout(() => window.URL.revokeObjectURL(url), 60000);
+  } catch (error) {
+    janela?.close();
+    console.error(`Erro ao pré-visualizar ${apiUrl}:`, error);
+    alert('Não foi possível pré-visualizar o documento.');
+  }
+};